@@ -1,3 +1,53 @@
-from .aionui import AiOnUi
+import importlib
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["AiOnUi"]
+if TYPE_CHECKING:
+    from .aionui import AiOnUi
+    from .chat_chunk import ChatChunk
+    from .chat_result import ChatResult
+    from .event_loop_thread import EventLoopThread
+    from .page_pool import PagePool
+    from .primed_conversations import PrimedConversations
+    from .quota import QuotaManager
+    from .response_cache import ResponseCache
+    from .scheduler import ChatScheduler
+    from .sync_model import SyncModel
+
+__all__ = [
+    "AiOnUi",
+    "ChatChunk",
+    "ChatResult",
+    "ChatScheduler",
+    "EventLoopThread",
+    "PagePool",
+    "PrimedConversations",
+    "QuotaManager",
+    "ResponseCache",
+    "SyncModel",
+]
+
+# Imported on first access, so `import aionui` does not load Playwright and the providers up front
+_modules = {
+    "AiOnUi": ".aionui",
+    "ChatChunk": ".chat_chunk",
+    "ChatResult": ".chat_result",
+    "ChatScheduler": ".scheduler",
+    "EventLoopThread": ".event_loop_thread",
+    "PagePool": ".page_pool",
+    "PrimedConversations": ".primed_conversations",
+    "QuotaManager": ".quota",
+    "ResponseCache": ".response_cache",
+    "SyncModel": ".sync_model",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_modules[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -1,9 +1,23 @@
-from contextlib import asynccontextmanager, contextmanager
-from typing import Optional, overload, Union, Literal, Any, Generator, AsyncGenerator
-import subprocess
-import time
+from __future__ import annotations
+
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from collections import deque
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Optional,
+    overload,
+    Union,
+    Literal,
+    Any,
+    Generator,
+    AsyncGenerator,
+)
 import asyncio
-import nest_asyncio
+import math
+import time
 from playwright.async_api import (
     Playwright as AsyncPlaywright,
     Browser as AsyncBrowser,
@@ -18,17 +32,32 @@ from playwright.sync_api import (
     BrowserContext as SyncBrowserContext,
     sync_playwright,
 )
-from .config import Config
+from .chat_result import ChatResult
+from .config import Account, Config
+from .event_loop_thread import EventLoopThread
+from .launcher import ChromeLauncher
+from .page_pool import PagePool
+from .primed_conversations import PrimedConversations
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight
+from .sync_model import SyncModel
+from .utils.common import chat_key, read_supervisor_state
 from .utils.logger import get_logger
-from .models import GPT, Claude, Gemini, DeepSeek
-from .models_async import GPTAsync, ClaudeAsync, GeminiAsync, DeepSeekAsync
+from . import models, models_async
+
+if TYPE_CHECKING:
+    from .models import GPT, Claude, Gemini, DeepSeek
+    from .models_async import GPTAsync, ClaudeAsync, GeminiAsync, DeepSeekAsync
 
-nest_asyncio.apply()
 default_logger = get_logger()
 
+# Class names of the providers in `models`, the async ones add "Async"
+_model_classes = {"gpt": "GPT", "claude": "Claude", "gemini": "Gemini", "deep_seek": "DeepSeek"}
+
 
 class AiOnUi:
     config: Config
+    launcher: ChromeLauncher
     _playwright_sync: Optional[SyncPlaywright] = None
     _playwright_async: Optional[AsyncPlaywright] = None
     _browser_sync: Optional[SyncBrowser] = None
@@ -37,6 +66,21 @@ class AiOnUi:
     _context_async: Optional[AsyncBrowserContext] = None
     _page_sync: Optional[SyncPage] = None
     _page_async: Optional[AsyncPage] = None
+    _owns_playwright_sync: bool = False
+    _owns_playwright_async: bool = False
+    _page_pools: dict[str, PagePool]
+    _primed: dict[tuple[str, str], PrimedConversations]
+    _shards_sync: list[SyncBrowserContext]
+    _shards_async: list[AsyncBrowserContext]
+    _owned_sync: list[Union[SyncBrowser, SyncBrowserContext]]
+    _owned_async: list[Union[AsyncBrowser, AsyncBrowserContext]]
+    _opening: dict[int, int]
+    _latencies: dict[str, deque[float]]
+    _account_turns: dict[str, int]
+    _account_last_used: dict[tuple[str, str], float]
+    _response_cache: Optional[ResponseCache]
+    single_flight: SingleFlight
+    _event_loop: Optional[EventLoopThread]
 
     @overload
     def __init__(
@@ -88,6 +132,20 @@ class AiOnUi:
     ) -> None:
         self.logger = get_logger(self.__class__.__name__)
         self.config = Config(config_path)
+        self.launcher = ChromeLauncher(self.config)
+        self._shards_sync = []
+        self._shards_async = []
+        self._owned_sync = []
+        self._owned_async = []
+        self._opening = {}
+        self._latencies = {}
+        self._page_pools = {}
+        self._primed = {}
+        self._account_turns = {}
+        self._account_last_used = {}
+        self._response_cache = None
+        self.single_flight = SingleFlight()
+        self._event_loop = None
 
         if isinstance(playwright, AsyncPlaywright):
             self._playwright_async = playwright
@@ -115,167 +173,763 @@ class AiOnUi:
     # region Async Api
     @overload
     @asynccontextmanager
-    async def model_async(self, model: Literal["gpt"]) -> AsyncGenerator[GPTAsync, None]: ...
+    async def model_async(
+        self, model: Literal["gpt"], account: Optional[str] = None
+    ) -> AsyncGenerator[GPTAsync, None]: ...
 
     @overload
     @asynccontextmanager
-    async def model_async(self, model: Literal["claude"]) -> AsyncGenerator[ClaudeAsync, None]: ...
+    async def model_async(
+        self, model: Literal["claude"], account: Optional[str] = None
+    ) -> AsyncGenerator[ClaudeAsync, None]: ...
 
     @overload
     @asynccontextmanager
-    async def model_async(self, model: Literal["gemini"]) -> AsyncGenerator[GeminiAsync, None]: ...
+    async def model_async(
+        self, model: Literal["gemini"], account: Optional[str] = None
+    ) -> AsyncGenerator[GeminiAsync, None]: ...
 
     @overload
     @asynccontextmanager
-    async def model_async(self, model: Literal["deep_seek"]) -> AsyncGenerator[DeepSeekAsync, None]: ...
+    async def model_async(
+        self, model: Literal["deep_seek"], account: Optional[str] = None
+    ) -> AsyncGenerator[DeepSeekAsync, None]: ...
 
     @overload
     @asynccontextmanager
     async def model_async(
-        self, model: Literal["gpt", "claude", "gemini", "deep_seek"]
+        self, model: Literal["gpt", "claude", "gemini", "deep_seek"], account: Optional[str] = None
     ) -> AsyncGenerator[Union[GPTAsync, ClaudeAsync, GeminiAsync, DeepSeekAsync], None]: ...
 
     @asynccontextmanager
     async def model_async(
-        self, model: Literal["gpt", "claude", "gemini", "deep_seek"]
+        self, model: Literal["gpt", "claude", "gemini", "deep_seek"], account: Optional[str] = None
     ) -> AsyncGenerator[Union[GPTAsync, ClaudeAsync, GeminiAsync, DeepSeekAsync], None]:
-        async with self.get_page_async() as page:
-            if model == "gpt":
-                yield GPTAsync(self.config, page)
-            elif model == "claude":
-                yield ClaudeAsync(self.config, page)
-            elif model == "gemini":
-                yield GeminiAsync(self.config, page)
-            elif model == "deep_seek":
-                yield DeepSeekAsync(self.config, page)
+        """
+        Opens a page for the model and yields the model bound to it.
+
+        With `accounts` configured, the page is opened in the named account's Chrome instance, or in the account
+        picked by `config.account_routing` if none is named.
+
+        Args:
+            model (Literal["gpt", "claude", "gemini", "deep_seek"]): The model to use.
+            account (str, optional): The name of the account to chat from.
+        """
+        selected = self._select_account(model, account)
+        url = selected.urls.get(model) if selected is not None else None
+        page_pool = self._page_pools.get(selected.name if selected is not None else "default")
+        page_manager = page_pool.page(model) if page_pool is not None else self.get_page_async(selected)
+        async with page_manager as page:
+            instance = self._new_model_async(model, page, url)
+            instance.primed_conversations = self._primed.get(
+                (selected.name if selected is not None else "default", model)
+            )
+            yield self._use_response_cache(instance, model)
+
+    def _new_model_async(
+        self, model: Literal["gpt", "claude", "gemini", "deep_seek"], page: AsyncPage, url: Optional[str] = None
+    ) -> Union[GPTAsync, ClaudeAsync, GeminiAsync, DeepSeekAsync]:
+        if model not in _model_classes:
+            raise ValueError(f"Unknown model: {model}")
+        return getattr(models_async, f"{_model_classes[model]}Async")(self.config, page, url)
+
+    async def _prime_conversation(
+        self, model: Literal["gpt", "claude", "gemini", "deep_seek"], account: Optional[Account] = None
+    ) -> str:
+        """
+        Primes a conversation in a tab of its own and returns its address, for `PrimedConversations`.
+        """
+        async with self._open_page_async(self._account_context(self._shards_async, account)) as page:
+            instance = self._new_model_async(model, page, account.urls.get(model) if account is not None else None)
+            url = await instance.prime()
+        if url.rstrip("/") == instance.url.rstrip("/"):
+            raise ValueError(f"The {model} conversation has no address of its own")
+        return url
 
     @asynccontextmanager
-    async def get_page_async(self) -> AsyncGenerator[AsyncPage, None]:
+    async def get_page_async(self, account: Optional[Account] = None) -> AsyncGenerator[AsyncPage, None]:
         if self._page_async is not None:
             yield self._page_async
-        elif self._context_async is not None:
-            page = await self._context_async.new_page()
-            yield page
-            await page.close()
-        elif self._browser_async is not None:
-            context = self._browser_async.contexts[0]
-            page = await context.new_page()
-            yield page
-            await page.close()
+        elif self._shards_async or self._context_async is not None or self._browser_async is not None:
+            async with self._open_page_async(self._account_context(self._shards_async, account)) as page:
+                yield page
         elif self._playwright_async is not None:
+            context, owner = await self._attach_async(self._playwright_async, self._account_port(account))
             try:
-                browser = await self._playwright_async.chromium.connect_over_cdp(
-                    f"http://localhost:{self.config.debug_port}"
-                )
-            except:
-                subprocess.Popen([self.config.chrome_binary_path, f"--remote-debugging-port={self.config.debug_port}"])
-                await asyncio.sleep(3)
-                browser = await self._playwright_async.chromium.connect_over_cdp(
-                    f"http://localhost:{self.config.debug_port}"
-                )
-            context = browser.contexts[0]
-            page = await context.new_page()
-            yield page
-            await page.close()
-            await context.close()
-            await browser.close()
+                async with self._open_page_async(context) as page:
+                    yield page
+            finally:
+                await owner.close()
         else:
             async with async_playwright() as playwright:
+                context, owner = await self._attach_async(playwright, self._account_port(account))
                 try:
-                    browser = await playwright.chromium.connect_over_cdp(f"http://localhost:{self.config.debug_port}")
-                except:
-                    subprocess.Popen(
-                        [self.config.chrome_binary_path, f"--remote-debugging-port={self.config.debug_port}"]
+                    async with self._open_page_async(context) as page:
+                        yield page
+                finally:
+                    await owner.close()
+
+    @asynccontextmanager
+    async def _open_page_async(self, context: Optional[AsyncBrowserContext] = None) -> AsyncGenerator[AsyncPage, None]:
+        """
+        Opens a new tab and closes only that tab on exit, never the context itself.
+        """
+        page = await self._new_page_async(context)
+        try:
+            yield page
+        finally:
+            await page.close()
+
+    async def _new_page_async(self, context: Optional[AsyncBrowserContext] = None) -> AsyncPage:
+        """
+        Opens a new tab in the context, or in the least-loaded Chrome instance of the session if no context is given.
+        """
+        if context is None:
+            context = self._least_loaded_context(
+                self._shards_async or [self._context_async or self._browser_async.contexts[0]]
+            )
+        self._opening[id(context)] = self._opening.get(id(context), 0) + 1
+        try:
+            return await context.new_page()
+        finally:
+            self._opening[id(context)] -= 1
+
+    async def _attach_async(
+        self, playwright: AsyncPlaywright, port: int
+    ) -> tuple[AsyncBrowserContext, Union[AsyncBrowser, AsyncBrowserContext]]:
+        """
+        Gets a Chrome instance for `port` according to `config.launch_mode`.
+
+        Returns:
+            tuple: The context to open tabs in and the object to close when done with the instance.
+        """
+        if self.config.launch_mode == "cdp":
+            browser = await self._connect_async(playwright, port)
+            return browser.contexts[0], browser
+
+        context = await self.launcher.launch_persistent_async(playwright, port)
+        return context, context
+
+    async def _connect_async(self, playwright: AsyncPlaywright, port: Optional[int] = None) -> AsyncBrowser:
+        """
+        Connects to Chrome over CDP, launching it first if nothing listens on the debug port.
+
+        Ports owned by a running supervisor are never launched here, the supervisor's restart is awaited instead.
+        """
+        port = port or self.config.debug_port
+        try:
+            return await playwright.chromium.connect_over_cdp(f"http://localhost:{port}")
+        except Exception:
+            if self._is_supervised(port):
+                await self.launcher.wait_until_ready_async(port)
+            else:
+                await self.launcher.launch_async(port)
+            return await playwright.chromium.connect_over_cdp(f"http://localhost:{port}")
+
+    async def start_async(self) -> "AiOnUi":
+        """
+        Starts a long-lived async session.
+
+        The Playwright driver and the Chrome instances are attached once and reused by every `model_async` block
+        until `close_async` is called. Components passed to the constructor are used as they are. When
+        `config.page_pool` is enabled, the blocks take their tabs from a `PagePool`. With `config.primed_conversations`
+        set, `new_conversation` opens conversations primed in the background by `PrimedConversations`.
+
+        With several debug ports configured, one Chrome instance is attached per port and every new tab is
+        opened in the instance with the fewest open tabs.
+        """
+        if (
+            not self._shards_async
+            and self._page_async is None
+            and self._context_async is None
+            and self._browser_async is None
+        ):
+            if self._playwright_async is None:
+                self._playwright_async = await async_playwright().start()
+                self._owns_playwright_async = True
+            attached = await asyncio.gather(
+                *(self._attach_async(self._playwright_async, port) for port in self.config.get_debug_ports())
+            )
+            self._shards_async = [context for context, _ in attached]
+            self._owned_async = [owner for _, owner in attached]
+
+        if self.config.page_pool and not self._page_pools and self._page_async is None:
+            urls = {model: getattr(models_async, f"{name}Async").url for model, name in _model_classes.items()}
+            accounts = self.config.get_accounts()
+            if not accounts:
+                self._page_pools["default"] = PagePool(self._new_page_async, self.config, urls, self._new_model_async)
+            for account in accounts:
+                context = self._account_context(self._shards_async, account)
+                self._page_pools[account.name] = PagePool(
+                    partial(self._new_page_async, context), self.config, {**urls, **account.urls}, self._new_model_async
+                )
+            for page_pool in self._page_pools.values():
+                await page_pool.start(self.config.page_pool_warm_up)
+
+        if self.config.primed_conversations and not self._primed and self._page_async is None:
+            for account in self.config.get_accounts() or [None]:
+                for model in ("gpt", "claude", "gemini", "deep_seek"):
+                    prime = partial(self._prime_conversation, model, account)
+                    name = account.name if account is not None else "default"
+                    self._primed[(name, model)] = PrimedConversations(prime, self.config.primed_conversations)
+            for primed in self._primed.values():
+                primed.start()
+        return self
+
+    async def close_async(self) -> None:
+        """
+        Closes the async session started by `start_async`.
+
+        Only what the session attached is released: in `cdp` mode the user's Chrome keeps running, in `persistent`
+        and `headless` mode the launched instances are closed.
+        """
+        for page_pool in self._page_pools.values():
+            await page_pool.close()
+        self._page_pools = {}
+        for primed in self._primed.values():
+            await primed.close()
+        self._primed = {}
+        for owner in self._owned_async:
+            await owner.close()
+        self._owned_async = []
+        self._shards_async = []
+        if self._owns_playwright_async and self._playwright_async is not None:
+            await self._playwright_async.stop()
+            self._playwright_async = None
+            self._owns_playwright_async = False
+
+    async def chat_many(
+        self,
+        prompts: list[str],
+        model: Literal["gpt", "claude", "gemini", "deep_seek"] = "gpt",
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        concurrency: int = 4,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> list[Union[str, BaseException]]:
+        """
+        Sends every prompt to the model, spread over up to `concurrency` pages.
+
+        Args:
+            prompts (list[str]): The prompts to send, each one in a new conversation.
+            model (Literal["gpt", "claude", "gemini", "deep_seek"], optional): The model to use. Defaults to "gpt".
+            expected_result (Literal["text", "image", "code", "json"], optional): Passed to `chat`.
+            concurrency (int, optional): The number of pages working in parallel. Defaults to 4.
+            return_exceptions (bool, optional): Return failures in place of their response instead of raising the
+                first one. Defaults to False.
+            **kwargs: Passed to `chat`, e.g. `tools`.
+
+        Returns:
+            list[Union[str, BaseException]]: The responses in the order of `prompts`.
+        """
+        results: list[Union[str, BaseException]] = [None] * len(prompts)
+        chats = self.chat_as_completed(prompts, model, expected_result, concurrency, **kwargs)
+        try:
+            async for result in chats:
+                if not result.ok and not return_exceptions:
+                    raise result.error
+                results[result.index] = result.response if result.ok else result.error
+        finally:
+            await chats.aclose()
+        return results
+
+    async def chat_as_completed(
+        self,
+        prompts: list[str],
+        model: Literal["gpt", "claude", "gemini", "deep_seek"] = "gpt",
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        concurrency: int = 4,
+        **kwargs: Any,
+    ) -> AsyncGenerator[ChatResult, None]:
+        """
+        Sends every prompt to the model over up to `concurrency` pages and yields the results as they complete.
+
+        A failed chat is yielded as a `ChatResult` holding the error and its prompt, the other prompts keep going.
+        Pages are closed (or returned to the page pool) when the iteration ends, also when it is left early.
+
+        Args:
+            prompts (list[str]): The prompts to send, each one in a new conversation.
+            model (Literal["gpt", "claude", "gemini", "deep_seek"], optional): The model to use. Defaults to "gpt".
+            expected_result (Literal["text", "image", "code", "json"], optional): Passed to `chat`.
+            concurrency (int, optional): The number of pages working in parallel. Defaults to 4.
+            **kwargs: Passed to `chat`, e.g. `tools`.
+        """
+        pending: asyncio.Queue[tuple[int, str]] = asyncio.Queue()
+        for index, prompt in enumerate(prompts):
+            pending.put_nowait((index, prompt))
+        completed: asyncio.Queue[ChatResult] = asyncio.Queue()
+
+        async def worker() -> None:
+            async with AsyncExitStack() as stack:
+                instance = None
+                fresh = False
+                while not pending.empty():
+                    index, prompt = pending.get_nowait()
+                    try:
+                        if instance is None:
+                            instance = await stack.enter_async_context(self.model_async(model))
+                            fresh = True
+
+                        async def send() -> str:
+                            nonlocal fresh
+                            if not fresh:
+                                await instance.install_runtime()
+                                await instance.page.goto(instance.url)
+                                await instance.wait_until_ready()
+                            fresh = False
+                            return await instance.chat(prompt, expected_result, **kwargs)
+
+                        response = await self.coalesce(send, model, prompt, expected_result, **kwargs)
+                        completed.put_nowait(ChatResult(index, prompt, response=response, model=model))
+                    except Exception as e:
+                        completed.put_nowait(ChatResult(index, prompt, error=e, model=model))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(prompts)))]
+        try:
+            for _ in prompts:
+                yield await completed.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def coalesce(
+        self,
+        send: Callable[[], Awaitable[str]],
+        model: str,
+        message: str,
+        expected_result: str = "text",
+        **kwargs: Any,
+    ) -> str:
+        """
+        Runs a chat, or waits for an identical one that is already in flight and shares its response or error.
+
+        Chats are identical when provider, message, `expected_result`, tools and attachment contents match. Nothing
+        is shared with `config.coalesce_chats` off. The number of shared chats is in `single_flight.coalesced`.
+
+        Args:
+            send (Callable[[], Awaitable[str]]): Sends the chat and returns the response.
+            model (str): The provider name, e.g. "gpt".
+            message (str): The message of the chat.
+            expected_result (str, optional): Passed to `chat`. Defaults to "text".
+            **kwargs: Passed to `chat`, e.g. `tools` and `attachments`.
+        """
+        if not self.config.coalesce_chats:
+            return await send()
+        key = chat_key(model, message, expected_result, kwargs.get("tools", []), kwargs.get("attachments", []))
+        return await self.single_flight.do(key, send, model)
+
+    async def race(
+        self,
+        message: str,
+        providers: list[Literal["gpt", "claude", "gemini", "deep_seek"]] = ["gpt", "claude", "gemini"],
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        hedge_delay: Optional[float] = None,
+        hedge_percentile: Optional[float] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> ChatResult:
+        """
+        Sends the same message to several providers in parallel pages and returns the first valid response.
+
+        The other providers are stopped (their stop-generation button is pressed) and their pages released. A
+        failed or invalid response starts the next provider right away.
+
+        Args:
+            message (str): The message to send.
+            providers (list[str], optional): The providers to race, in order of preference.
+                Defaults to ["gpt", "claude", "gemini"].
+            expected_result (Literal["text", "image", "code", "json"], optional): Passed to `chat`.
+            hedge_delay (float, optional): Seconds to wait before starting the next provider. All providers start
+                at once if neither this nor `hedge_percentile` is set.
+            hedge_percentile (float, optional): Start the next provider once the running one is slower than this
+                percentile (0-100) of its past race latencies. Falls back to `hedge_delay` until 5 races were timed.
+            validate (Callable[[str], bool], optional): Rejects responses that should not win the race.
+
+        Returns:
+            ChatResult: The winning response, with `index` and `model` telling which provider answered.
+
+        Raises:
+            Exception: The first provider's error if no provider returned a valid response.
+        """
+        running: dict[asyncio.Task, int] = {}
+        failures: list[BaseException] = []
+
+        def start_next() -> None:
+            index = len(running) + len(failures)
+            running[asyncio.create_task(self._race_chat(providers[index], message, expected_result))] = index
+
+        start_next()
+        try:
+            while running:
+                delay = None
+                if len(running) + len(failures) < len(providers):
+                    delay = self._hedge_delay(
+                        providers[len(running) + len(failures) - 1], hedge_delay, hedge_percentile
                     )
-                    await asyncio.sleep(3)
-                    browser = await playwright.chromium.connect_over_cdp(f"http://localhost:{self.config.debug_port}")
-                context = browser.contexts[0]
-                page = await context.new_page()
-                yield page
-                await page.close()
-                await context.close()
-                await browser.close()
+                    if delay == 0:
+                        start_next()
+                        continue
+
+                done, _ = await asyncio.wait(running, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    start_next()
+                    continue
+
+                for task in done:
+                    index = running.pop(task)
+                    if task.exception() is None and (validate is None or validate(task.result())):
+                        return ChatResult(index, message, response=task.result(), model=providers[index])
+                    failures.append(task.exception() or ValueError(f"Invalid response from {providers[index]}"))
+                if not running and len(failures) < len(providers):
+                    start_next()
+            raise failures[0]
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+    def latency_percentile(self, model: str, percentile: float) -> Optional[float]:
+        """
+        Gets a percentile (0-100) of the response times the provider had in past races, None if never timed.
+        """
+        latencies = sorted(self._latencies.get(model, []))
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, math.ceil(percentile / 100 * len(latencies)) - 1)]
+
+    def _hedge_delay(
+        self, model: str, hedge_delay: Optional[float], hedge_percentile: Optional[float]
+    ) -> Optional[float]:
+        if hedge_percentile is not None and len(self._latencies.get(model, [])) >= 5:
+            return self.latency_percentile(model, hedge_percentile)
+        return hedge_delay or 0
+
+    async def _race_chat(
+        self,
+        model: Literal["gpt", "claude", "gemini", "deep_seek"],
+        message: str,
+        expected_result: Literal["text", "image", "code", "json"],
+    ) -> str:
+        async with self.model_async(model) as instance:
+            started = time.monotonic()
+            try:
+                response = await instance.chat(message, expected_result)
+            except asyncio.CancelledError:
+                try:
+                    await asyncio.wait_for(instance.stop_generation(), timeout=5)
+                except Exception as e:
+                    default_logger.warning(f"Could not stop {model}: {e}")
+                raise
+            self._latencies.setdefault(model, deque(maxlen=100)).append(time.monotonic() - started)
+            return response
+
+    async def __aenter__(self) -> "AiOnUi":
+        return await self.start_async()
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close_async()
 
     # endregion
 
+    def _least_loaded_context(
+        self, contexts: list[Union[SyncBrowserContext, AsyncBrowserContext]]
+    ) -> Union[SyncBrowserContext, AsyncBrowserContext]:
+        """
+        Picks the context of the Chrome instance with the fewest open or opening tabs.
+        """
+        if len(contexts) == 1:
+            return contexts[0]
+        return min(contexts, key=lambda context: len(context.pages) + self._opening.get(id(context), 0))
+
+    def pick_account(self, model: str, candidates: Optional[list[str]] = None) -> str:
+        """
+        Picks the account the next chat with the model is sent from, according to `config.account_routing`.
+
+        Args:
+            model (str): The provider name, e.g. "gpt".
+            candidates (list[str], optional): Names of the accounts to choose from, e.g. those not over quota.
+                Defaults to every configured account.
+
+        Returns:
+            str: The name of the account, "default" if no accounts are configured.
+        """
+        names = candidates or [account.name for account in self.config.get_accounts()] or ["default"]
+        if self.config.account_routing == "least_recently_used":
+            name = min(names, key=lambda name: self._account_last_used.get((model, name), -math.inf))
+        else:
+            turn = self._account_turns.get(model, 0)
+            self._account_turns[model] = turn + 1
+            name = names[turn % len(names)]
+        self._account_last_used[(model, name)] = time.monotonic()
+        return name
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        """
+        The cache `model_sync`/`model_async` models answer repeated chats from when `config.response_cache` is set.
+        """
+        if self._response_cache is None:
+            self._response_cache = ResponseCache(self.config)
+        return self._response_cache
+
+    def _use_response_cache(self, instance: Any, model: str) -> Any:
+        if self.config.response_cache:
+            instance.chat = self.response_cache.wrap(instance.chat, model)
+        return instance
+
+    def _select_account(self, model: str, name: Optional[str]) -> Optional[Account]:
+        """
+        Resolves the account a page for the model is opened for, None if no accounts are configured.
+        """
+        if not self.config.accounts:
+            if name not in (None, "default"):
+                raise ValueError(f"Unknown account: {name}")
+            return None
+        if name is None:
+            name = self.pick_account(model)
+        else:
+            self._account_last_used[(model, name)] = time.monotonic()
+        return self.config.get_account(name)
+
+    def _account_port(self, account: Optional[Account]) -> int:
+        return account.debug_port if account is not None else self.config.debug_port
+
+    def _account_context(
+        self, shards: list[Union[SyncBrowserContext, AsyncBrowserContext]], account: Optional[Account]
+    ) -> Optional[Union[SyncBrowserContext, AsyncBrowserContext]]:
+        """
+        Gets the context of the account's Chrome instance in a started session, None to use the least-loaded one.
+        """
+        if account is None or not shards:
+            return None
+        return shards[self.config.get_debug_ports().index(account.debug_port)]
+
+    def _is_supervised(self, port: int) -> bool:
+        """
+        Checks whether a running `python -m aionui.supervisor` owns the Chrome instance on `port`.
+        """
+        state = read_supervisor_state(self.config.get_supervisor_state_file())
+        return state is not None and port in state.get("ports", [])
+
     # region Sync Api
     @overload
     @contextmanager
-    def model_sync(self, model: Literal["gpt"]) -> Generator[GPT, None, None]: ...
+    def model_sync(self, model: Literal["gpt"], account: Optional[str] = None) -> Generator[GPT, None, None]: ...
 
     @overload
     @contextmanager
-    def model_sync(self, model: Literal["claude"]) -> Generator[Claude, None, None]: ...
+    def model_sync(self, model: Literal["claude"], account: Optional[str] = None) -> Generator[Claude, None, None]: ...
 
     @overload
     @contextmanager
-    def model_sync(self, model: Literal["gemini"]) -> Generator[Gemini, None, None]: ...
+    def model_sync(self, model: Literal["gemini"], account: Optional[str] = None) -> Generator[Gemini, None, None]: ...
 
     @overload
     @contextmanager
-    def model_sync(self, model: Literal["deep_seek"]) -> Generator[DeepSeek, None, None]: ...
+    def model_sync(
+        self, model: Literal["deep_seek"], account: Optional[str] = None
+    ) -> Generator[DeepSeek, None, None]: ...
 
     @overload
     @contextmanager
     def model_sync(
-        self, model: Literal["gpt", "claude", "gemini", "deep_seek"]
+        self, model: Literal["gpt", "claude", "gemini", "deep_seek"], account: Optional[str] = None
     ) -> Generator[Union[GPT, Claude, Gemini, DeepSeek], None, None]: ...
 
     @contextmanager
     def model_sync(
-        self, model: Literal["gpt", "claude", "gemini", "deep_seek"]
-    ) -> Generator[Union[GPT, Claude, Gemini, DeepSeek], None, None]:
-        with self.get_page_sync() as page:
-            if model == "gpt":
-                yield GPT(self.config, page)
-            elif model == "claude":
-                yield Claude(self.config, page)
-            elif model == "gemini":
-                yield Gemini(self.config, page)
-            elif model == "deep_seek":
-                yield DeepSeek(self.config, page)
+        self, model: Literal["gpt", "claude", "gemini", "deep_seek"], account: Optional[str] = None
+    ) -> Generator[Union[GPT, Claude, Gemini, DeepSeek, SyncModel], None, None]:
+        """
+        Opens a page for the model and yields the model bound to it.
+
+        With `accounts` configured, the page is opened in the named account's Chrome instance, or in the account
+        picked by `config.account_routing` if none is named. With `config.sync_bridge`, the model is a `SyncModel`
+        driving the async model on `event_loop`.
+
+        Args:
+            model (Literal["gpt", "claude", "gemini", "deep_seek"]): The model to use.
+            account (str, optional): The name of the account to chat from.
+        """
+        if self._bridged():
+            with self._model_bridged(model, account) as instance:
+                yield instance
+            return
+
+        selected = self._select_account(model, account)
+        url = selected.urls.get(model) if selected is not None else None
+        with self.get_page_sync(selected) as page:
+            instance = getattr(models, _model_classes[model])(self.config, page, url)
+            yield self._use_response_cache(instance, model)
+
+    @contextmanager
+    def _model_bridged(
+        self, model: Literal["gpt", "claude", "gemini", "deep_seek"], account: Optional[str] = None
+    ) -> Generator[SyncModel, None, None]:
+        """
+        Enters `model_async` on the event loop thread and yields a blocking front of the model.
+        """
+        manager = self.model_async(model, account)
+        instance = self.event_loop.run(manager.__aenter__())
+        try:
+            yield SyncModel(instance, self.event_loop)
+        except BaseException as e:
+            if not self.event_loop.run(manager.__aexit__(type(e), e, e.__traceback__)):
+                raise
+        else:
+            self.event_loop.run(manager.__aexit__(None, None, None))
+
+    @property
+    def event_loop(self) -> EventLoopThread:
+        """
+        The background event loop serving the sync API when `config.sync_bridge` is enabled.
+        """
+        if self._event_loop is None:
+            self._event_loop = EventLoopThread()
+        return self._event_loop
+
+    def _bridged(self) -> bool:
+        """
+        Checks whether the sync API is served by the async models, i.e. `config.sync_bridge` is enabled and no sync
+        Playwright components were passed to the constructor.
+        """
+        return (
+            self.config.sync_bridge
+            and self._playwright_sync is None
+            and self._browser_sync is None
+            and self._context_sync is None
+            and self._page_sync is None
+        )
 
     @contextmanager
-    def get_page_sync(self) -> Generator[SyncPage, None, None]:
+    def get_page_sync(self, account: Optional[Account] = None) -> Generator[SyncPage, None, None]:
         if self._page_sync is not None:
             yield self._page_sync
-        elif self._context_sync is not None:
-            page = self._context_sync.new_page()
-            yield page
-            page.close()
-        elif self._browser_sync is not None:
-            context = self._browser_sync.contexts[0]
-            page = context.new_page()
-            yield page
-            page.close()
+        elif self._shards_sync or self._context_sync is not None or self._browser_sync is not None:
+            with self._open_page_sync(self._account_context(self._shards_sync, account)) as page:
+                yield page
         elif self._playwright_sync is not None:
+            context, owner = self._attach_sync(self._playwright_sync, self._account_port(account))
             try:
-                browser = self._playwright_sync.chromium.connect_over_cdp(f"http://localhost:{self.config.debug_port}")
-            except:
-                subprocess.Popen([self.config.chrome_binary_path, f"--remote-debugging-port={self.config.debug_port}"])
-                time.sleep(3)
-                browser = self._playwright_sync.chromium.connect_over_cdp(f"http://localhost:{self.config.debug_port}")
-            context = browser.contexts[0]
-            page = context.new_page()
-            yield page
-            page.close()
-            context.close()
-            browser.close()
+                with self._open_page_sync(context) as page:
+                    yield page
+            finally:
+                owner.close()
         else:
             with sync_playwright() as playwright:
+                context, owner = self._attach_sync(playwright, self._account_port(account))
                 try:
-                    browser = playwright.chromium.connect_over_cdp(f"http://localhost:{self.config.debug_port}")
-                except:
-                    subprocess.Popen(
-                        [self.config.chrome_binary_path, f"--remote-debugging-port={self.config.debug_port}"]
-                    )
-                    time.sleep(3)
-                    browser = playwright.chromium.connect_over_cdp(f"http://localhost:{self.config.debug_port}")
-                context = browser.contexts[0]
-                page = context.new_page()
-                yield page
-                page.close()
-                context.close()
-                browser.close()
+                    with self._open_page_sync(context) as page:
+                        yield page
+                finally:
+                    owner.close()
+
+    @contextmanager
+    def _open_page_sync(self, context: Optional[SyncBrowserContext] = None) -> Generator[SyncPage, None, None]:
+        """
+        Opens a new tab and closes only that tab on exit, never the context itself.
+
+        Without a context, the tab is opened in the least-loaded Chrome instance of the session.
+        """
+        if context is None:
+            context = self._least_loaded_context(
+                self._shards_sync or [self._context_sync or self._browser_sync.contexts[0]]
+            )
+        page = context.new_page()
+        try:
+            yield page
+        finally:
+            page.close()
+
+    def _attach_sync(
+        self, playwright: SyncPlaywright, port: int
+    ) -> tuple[SyncBrowserContext, Union[SyncBrowser, SyncBrowserContext]]:
+        """
+        Gets a Chrome instance for `port` according to `config.launch_mode`.
+
+        Returns:
+            tuple: The context to open tabs in and the object to close when done with the instance.
+        """
+        if self.config.launch_mode == "cdp":
+            browser = self._connect_sync(playwright, port)
+            return browser.contexts[0], browser
+
+        context = self.launcher.launch_persistent(playwright, port)
+        return context, context
+
+    def _connect_sync(self, playwright: SyncPlaywright, port: Optional[int] = None) -> SyncBrowser:
+        """
+        Connects to Chrome over CDP, launching it first if nothing listens on the debug port.
+
+        Ports owned by a running supervisor are never launched here, the supervisor's restart is awaited instead.
+        """
+        port = port or self.config.debug_port
+        try:
+            return playwright.chromium.connect_over_cdp(f"http://localhost:{port}")
+        except Exception:
+            if self._is_supervised(port):
+                self.launcher.wait_until_ready(port)
+            else:
+                self.launcher.launch(port)
+            return playwright.chromium.connect_over_cdp(f"http://localhost:{port}")
+
+    def start(self) -> "AiOnUi":
+        """
+        Starts a long-lived sync session.
+
+        The Playwright driver and the Chrome instances are attached once and reused by every `model_sync` block
+        until `close` is called. Components passed to the constructor are used as they are.
+
+        With several debug ports configured, one Chrome instance is attached per port and every new tab is
+        opened in the instance with the fewest open tabs. With `config.sync_bridge`, this starts the async session
+        on `event_loop` instead.
+        """
+        if self._bridged():
+            self.event_loop.run(self.start_async())
+            return self
+
+        if (
+            self._shards_sync
+            or self._page_sync is not None
+            or self._context_sync is not None
+            or self._browser_sync is not None
+        ):
+            return self
+
+        if self._playwright_sync is None:
+            self._playwright_sync = sync_playwright().start()
+            self._owns_playwright_sync = True
+        attached = [self._attach_sync(self._playwright_sync, port) for port in self.config.get_debug_ports()]
+        self._shards_sync = [context for context, _ in attached]
+        self._owned_sync = [owner for _, owner in attached]
+        return self
+
+    def close(self) -> None:
+        """
+        Closes the sync session started by `start`.
+
+        Only what the session attached is released: in `cdp` mode the user's Chrome keeps running, in `persistent`
+        and `headless` mode the launched instances are closed. The event loop thread of `config.sync_bridge` is
+        stopped as well.
+        """
+        if self._event_loop is not None:
+            self._event_loop.run(self.close_async())
+            self._event_loop.close()
+            self._event_loop = None
+
+        for owner in self._owned_sync:
+            owner.close()
+        self._owned_sync = []
+        self._shards_sync = []
+        if self._owns_playwright_sync and self._playwright_sync is not None:
+            self._playwright_sync.stop()
+            self._playwright_sync = None
+            self._owns_playwright_sync = False
+
+    def __enter__(self) -> "AiOnUi":
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
 
     # endregion
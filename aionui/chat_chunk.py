@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ChatChunk:
+    """A piece of a response streamed by `chat_stream`."""
+
+    delta: str
+    """The characters rendered since the previous chunk, empty for the final chunk"""
+    text: str
+    """The response so far, the completed response in the final chunk"""
+    done: bool = False
+    """Whether this is the final chunk"""
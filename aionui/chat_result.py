@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class ChatResult:
+    """The outcome of one prompt sent through `AiOnUi.chat_as_completed` or `AiOnUi.race`."""
+
+    index: int
+    """Position of the prompt in the submitted list"""
+    prompt: str
+    """The prompt as submitted"""
+    response: Optional[str] = None
+    """The model's response, None if the chat failed"""
+    error: Optional[BaseException] = None
+    """The exception raised by the chat, None if it succeeded"""
+    model: Optional[str] = None
+    """The provider that handled the prompt"""
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
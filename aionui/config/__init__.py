@@ -1,3 +1,4 @@
+from .account import Account
 from .config import Config
 
-__all__ = ["Config"]
+__all__ = ["Account", "Config"]
@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class Account(BaseModel):
+    name: str
+    """Name the account is picked by, e.g. in `model_async("gpt", account="work")`"""
+    user_data_dir: Optional[str] = Field(default=None)
+    """Chrome profile the account is logged in with, defaults to `user_data_dir` suffixed with the debug port"""
+    debug_port: Optional[int] = Field(default=None)
+    """Debug port of the account's Chrome instance, defaults to consecutive ports starting at `debug_port`"""
+    urls: dict[str, str] = Field(default_factory=dict)
+    """Start page per provider for this account, e.g. `{"gemini": "https://gemini.google.com/u/1/app"}`"""
@@ -1,8 +1,10 @@
 import os
-from typing import Optional
+import tempfile
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 import yaml
 from aionui.enums.platform import Platform
+from .account import Account
 from ..utils.common import get_platform, get_user_data_dir, get_chrome_binary_path
 
 
@@ -15,12 +17,147 @@ class Config(BaseModel):
     """Chrome binary path"""
     debug_port: Optional[int] = Field(default=9222)
     """Debug port to connect over CDP (Chrome DevTools Protocol)"""
+    debug_ports: list[int] = Field(default_factory=list)
+    """Debug ports of several Chrome instances to spread pages across, overrides `debug_port` and `instances`"""
+    instances: int = Field(default=1, ge=1)
+    """Number of Chrome instances on consecutive debug ports starting at `debug_port`"""
+    accounts: list[Account] = Field(default_factory=list)
+    """Logged-in accounts, each in a Chrome instance of its own, overrides `debug_ports` and `instances`"""
+    account_routing: Literal["round_robin", "least_recently_used"] = Field(default="round_robin")
+    """How chats that do not name an account are spread across `accounts`"""
+    launch_mode: Literal["cdp", "persistent", "headless"] = Field(default="cdp")
+    """How to get a browser: attach over CDP, or launch Chrome directly with `user_data_dir` (headed or headless)"""
+    launch_timeout: float = Field(default=30, gt=0)
+    """Seconds to wait for a launched Chrome to accept CDP connections"""
+    response_timeout: float = Field(default=600, gt=0)
+    """Seconds to wait for a response to complete before giving up"""
+    response_capture: bool = Field(default=False)
+    """Read responses from the provider's network stream instead of the page, falling back to the page if none is
+    seen"""
+    inline_message_limit: int = Field(default=30000, ge=0)
+    """Messages longer than this many characters are attached as a file instead of typed, 0 to always type them"""
+    response_cache: bool = Field(default=False)
+    """Answer repeated chats of `model_sync`/`model_async` models from a `ResponseCache` instead of the page"""
+    response_cache_file: Optional[str] = Field(default=None)
+    """SQLite database of the response cache, defaults to `aionui-cache.sqlite3` in the temp directory"""
+    response_cache_ttl: Optional[float] = Field(default=None, gt=0)
+    """Seconds a cached response is used for, None to keep it until it is evicted"""
+    response_cache_max_entries: int = Field(default=10000, ge=1)
+    """Responses kept in the cache database, the least recently used ones are evicted beyond that"""
+    response_cache_memory_entries: int = Field(default=256, ge=0)
+    """Responses kept in memory in front of the cache database"""
+    sync_bridge: bool = Field(default=False)
+    """Serve `model_sync` from the async models on a background event loop thread, so several threads can chat at
+    the same time"""
+    coalesce_chats: bool = Field(default=False)
+    """Share one page and response between identical chats in flight at once through `ChatScheduler` and `chat_many`"""
+    provider_concurrency: dict[str, int] = Field(
+        default_factory=lambda: {"gpt": 4, "claude": 2, "gemini": 2, "deep_seek": 2}
+    )
+    """Maximum pages in flight per provider when chats go through `ChatScheduler`"""
+    quota_limits: dict[str, int] = Field(default_factory=dict)
+    """Messages allowed per provider and account within `quota_window`, providers not listed are not throttled"""
+    quota_window: float = Field(default=10800, gt=0)
+    """Length in seconds of the rolling window `quota_limits` apply to"""
+    quota_state_file: Optional[str] = Field(default=None)
+    """File the quota manager keeps its counts in, defaults to `aionui-quota.json` in the temp directory"""
+    supervisor_state_file: Optional[str] = Field(default=None)
+    """State file of `python -m aionui.supervisor`, defaults to `aionui-supervisor.json` in the temp directory"""
+    page_pool: bool = Field(default=False)
+    """Keep pre-navigated tabs per provider for `model_async` while a session is started"""
+    page_pool_min_size: int = Field(default=1, ge=0)
+    """Number of ready tabs the page pool keeps per provider"""
+    page_pool_max_size: int = Field(default=4, ge=1)
+    """Maximum number of tabs the page pool keeps per provider"""
+    page_pool_idle_ttl: float = Field(default=300, gt=0)
+    """Seconds an idle tab is kept above the minimum size before it is closed"""
+    page_pool_warm_up: list[Literal["gpt", "claude", "gemini", "deep_seek"]] = Field(default_factory=list)
+    """Providers to fill with ready tabs as soon as the session starts"""
+    primed_conversations: int = Field(default=0, ge=0)
+    """Conversations that already received the instructions to keep ready per provider while a session is started,
+    so `new_conversation` does not wait for them to be answered"""
 
     def __init__(self, config_path: Optional[str] = None, **kwargs):
         super().__init__(**kwargs)
         if config_path:
             self.load_config(config_path)
 
+    def get_debug_ports(self) -> list[int]:
+        """
+        Gets the debug port of every Chrome instance.
+        """
+        if self.accounts:
+            return [account.debug_port for account in self.get_accounts()]
+        if self.debug_ports:
+            return list(self.debug_ports)
+        return [self.debug_port + index for index in range(self.instances)]
+
+    def get_instance_user_data_dir(self, port: int) -> Optional[str]:
+        """
+        Gets the user data directory of the Chrome instance on `port`.
+
+        A single instance keeps Chrome's own choice, several instances each need a profile of their own.
+        """
+        account = self.get_account_by_port(port)
+        if account is not None and account.user_data_dir:
+            return account.user_data_dir
+        if len(self.get_debug_ports()) <= 1:
+            return None
+        base_dir = self.user_data_dir or os.path.join(tempfile.gettempdir(), "aionui-chrome")
+        return f"{base_dir}-{port}"
+
+    def get_accounts(self) -> list[Account]:
+        """
+        Gets the configured accounts, with consecutive debug ports from `debug_port` filled in where none is set.
+        """
+        accounts = []
+        for index, account in enumerate(self.accounts):
+            if account.debug_port is None:
+                account = account.model_copy(update={"debug_port": self.debug_port + index})
+            accounts.append(account)
+        return accounts
+
+    def get_account(self, name: str) -> Account:
+        """
+        Gets a configured account by its name.
+        """
+        for account in self.get_accounts():
+            if account.name == name:
+                return account
+        raise ValueError(f"Unknown account: {name}")
+
+    def get_account_by_port(self, port: int) -> Optional[Account]:
+        """
+        Gets the account whose Chrome instance listens on `port`, None if no account does.
+        """
+        return next((account for account in self.get_accounts() if account.debug_port == port), None)
+
+    def get_supervisor_state_file(self) -> str:
+        """
+        Gets the path of the state file shared with `python -m aionui.supervisor`.
+        """
+        return self.supervisor_state_file or os.path.join(tempfile.gettempdir(), "aionui-supervisor.json")
+
+    def get_quota_state_file(self) -> str:
+        """
+        Gets the path of the file the quota manager persists sent messages and parked accounts to.
+        """
+        return self.quota_state_file or os.path.join(tempfile.gettempdir(), "aionui-quota.json")
+
+    def get_response_cache_file(self) -> str:
+        """
+        Gets the path of the SQLite database the response cache is kept in.
+        """
+        return self.response_cache_file or os.path.join(tempfile.gettempdir(), "aionui-cache.sqlite3")
+
+    def get_profile_dir(self, port: int) -> str:
+        """
+        Gets the profile directory Chrome is launched with in `persistent` and `headless` mode.
+
+        An empty string lets Playwright create a temporary profile.
+        """
+        return self.get_instance_user_data_dir(port) or self.user_data_dir or ""
+
     def load_config(self, config_path: str) -> None:
         """
         Loads the config from a YAML file.
@@ -32,6 +169,6 @@ class Config(BaseModel):
         with open(config_path, "r") as file:
             config = yaml.safe_load(file)
             validated_data = self.model_validate(config)
-            for key, value in validated_data.model_dump().items():
-                if hasattr(self, key) and not self.model_fields[key].frozen:
-                    setattr(self, key, value)
+            for key in type(validated_data).model_fields:
+                if hasattr(self, key) and not type(self).model_fields[key].frozen:
+                    setattr(self, key, getattr(validated_data, key))
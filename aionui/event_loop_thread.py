@@ -0,0 +1,107 @@
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class EventLoopThread:
+    """
+    Runs an asyncio event loop in a daemon thread, so sync code in any thread can run coroutines on it.
+
+    Every coroutine shares the one loop: calls from several threads run concurrently on it, while each caller blocks
+    only until its own coroutine is done. The thread starts on first use.
+    """
+
+    name: str
+
+    def __init__(self, name: str = "aionui-event-loop"):
+        """
+        Args:
+            name (str, optional): The name of the thread. Defaults to "aionui-event-loop".
+        """
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        The event loop, started if it is not running yet.
+        """
+        self.start()
+        return self._loop
+
+    def is_running(self) -> bool:
+        """
+        Checks whether the loop thread is running.
+        """
+        return self._thread is not None
+
+    def start(self) -> None:
+        """
+        Starts the loop thread if it is not running yet.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            thread = threading.Thread(target=self._run, args=(loop, ready), name=self.name, daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop, self._thread = loop, thread
+
+    def run(self, coroutine: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Runs a coroutine on the loop and blocks until it is done.
+
+        Args:
+            coroutine (Coroutine): The coroutine to run.
+            timeout (float, optional): Seconds to wait at most, the coroutine is cancelled after that.
+
+        Returns:
+            T: The result of the coroutine.
+
+        Raises:
+            RuntimeError: If called from the loop thread itself, which would wait forever.
+        """
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("Cannot block the event loop thread on its own coroutine, await it instead")
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Timed out or interrupted, e.g. by Ctrl+C: stop the coroutine as well
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        """
+        Cancels what still runs on the loop, then stops the loop and its thread.
+        """
+        with self._lock:
+            if self._thread is None:
+                return
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
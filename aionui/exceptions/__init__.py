@@ -1,3 +1,5 @@
 from .bot_detected_exception import BotDetectedException
+from .chrome_launch_exception import ChromeLaunchException
+from .quota_exceeded_exception import QuotaExceededException
 
-__all__ = ["BotDetectedException"]
+__all__ = ["BotDetectedException", "ChromeLaunchException", "QuotaExceededException"]
@@ -0,0 +1,2 @@
+class ChromeLaunchException(Exception):
+    """Exception raised when a launched Chrome instance does not accept CDP connections in time."""
@@ -0,0 +1,17 @@
+from typing import Optional
+
+
+class QuotaExceededException(Exception):
+    """Exception raised when a provider reports that the account reached its message limit."""
+
+    def __init__(self, model: str, reset_at: float, account: Optional[str] = None):
+        """
+        Args:
+            model (str): The provider that hit the limit, e.g. "gpt".
+            reset_at (float): Unix timestamp at which the limit resets.
+            account (str, optional): The account that hit the limit, if known.
+        """
+        super().__init__(f"{model} limit reached, resets at {reset_at:.0f}")
+        self.model = model
+        self.reset_at = reset_at
+        self.account = account
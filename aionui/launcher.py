@@ -0,0 +1,212 @@
+import asyncio
+import subprocess
+import time
+from typing import Any, Optional
+
+
+from playwright.async_api import BrowserContext as AsyncBrowserContext, Playwright as AsyncPlaywright
+from playwright.sync_api import BrowserContext as SyncBrowserContext, Playwright as SyncPlaywright
+
+from .config import Config
+from .exceptions import ChromeLaunchException
+from .utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ChromeLauncher:
+    """
+    Launches Chrome instances and waits until their DevTools endpoint answers.
+
+    Readiness is probed on `http://localhost:{port}/json/version` with a short backoff, so a launch returns as
+    soon as Chrome is up instead of after a fixed sleep. A start that fails or exceeds `launch_timeout` is
+    terminated instead of being left behind.
+    """
+
+    config: Config
+    processes: dict[int, subprocess.Popen]
+    startup_latencies: dict[int, float]
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.processes = {}
+        self.startup_latencies = {}
+
+    def command(self, port: int) -> list[str]:
+        """
+        Builds the command line to launch the Chrome instance listening on `port`.
+        """
+        command = [self.config.chrome_binary_path, f"--remote-debugging-port={port}"]
+        user_data_dir = self.config.get_instance_user_data_dir(port)
+        if user_data_dir:
+            command.append(f"--user-data-dir={user_data_dir}")
+        return command
+
+    def is_ready(self, port: int) -> bool:
+        """
+        Checks whether the DevTools endpoint on `port` answers.
+        """
+        import requests
+
+        try:
+            return requests.get(f"http://localhost:{port}/json/version", timeout=1).status_code == 200
+        except requests.RequestException:
+            return False
+
+    async def is_ready_async(self, port: int) -> bool:
+        """
+        Checks whether the DevTools endpoint on `port` answers.
+        """
+        import aiohttp
+
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=1)) as session:
+                async with session.get(f"http://localhost:{port}/json/version") as response:
+                    return response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    def launch(self, port: int) -> float:
+        """
+        Launches Chrome on `port` and blocks until it accepts CDP connections.
+
+        Returns:
+            float: The measured startup latency in seconds.
+
+        Raises:
+            ChromeLaunchException: If Chrome exits or is not ready within `launch_timeout`.
+        """
+        self.processes[port] = subprocess.Popen(self.command(port))
+        return self.wait_until_ready(port)
+
+    async def launch_async(self, port: int) -> float:
+        """
+        Launches Chrome on `port` and waits until it accepts CDP connections.
+
+        Returns:
+            float: The measured startup latency in seconds.
+
+        Raises:
+            ChromeLaunchException: If Chrome exits or is not ready within `launch_timeout`.
+        """
+        self.processes[port] = subprocess.Popen(self.command(port))
+        return await self.wait_until_ready_async(port)
+
+    def wait_until_ready(self, port: int) -> float:
+        """
+        Blocks until the Chrome instance on `port` accepts CDP connections.
+
+        Returns:
+            float: The time waited in seconds.
+
+        Raises:
+            ChromeLaunchException: If the launched Chrome exits or is not ready within `launch_timeout`.
+        """
+        started = time.monotonic()
+        delay = 0.05
+        while not self.is_ready(port):
+            remaining = self._check_progress(port, started)
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+        return self._record(port, started)
+
+    async def wait_until_ready_async(self, port: int) -> float:
+        """
+        Waits until the Chrome instance on `port` accepts CDP connections.
+
+        Returns:
+            float: The time waited in seconds.
+
+        Raises:
+            ChromeLaunchException: If the launched Chrome exits or is not ready within `launch_timeout`.
+        """
+        started = time.monotonic()
+        delay = 0.05
+        while not await self.is_ready_async(port):
+            remaining = self._check_progress(port, started)
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+        return self._record(port, started)
+
+    def persistent_context_options(self, port: int) -> dict[str, Any]:
+        """
+        Builds the `launch_persistent_context` options for the instance on `port`.
+
+        Background throttling is disabled so that tabs which are not in front (pooled or parallel chats) keep
+        rendering at full speed. Headless instances also skip the GPU and `/dev/shm`, which are usually missing
+        or tiny on servers.
+        """
+        headless = self.config.launch_mode == "headless"
+        args = [
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-blink-features=AutomationControlled",
+            "--disable-background-timer-throttling",
+            "--disable-backgrounding-occluded-windows",
+            "--disable-renderer-backgrounding",
+        ]
+        if headless:
+            args += ["--disable-gpu", "--disable-dev-shm-usage"]
+
+        return {
+            "user_data_dir": self.config.get_profile_dir(port),
+            "executable_path": self.config.chrome_binary_path,
+            "headless": headless,
+            "args": args,
+            "ignore_default_args": ["--enable-automation"],
+            "no_viewport": not headless,
+        }
+
+    def launch_persistent(self, playwright: SyncPlaywright, port: int) -> SyncBrowserContext:
+        """
+        Launches Chrome with a persistent profile directly through Playwright, without CDP over TCP.
+        """
+        started = time.monotonic()
+        context = playwright.chromium.launch_persistent_context(**self.persistent_context_options(port))
+        self._record(port, started)
+        return context
+
+    async def launch_persistent_async(self, playwright: AsyncPlaywright, port: int) -> AsyncBrowserContext:
+        """
+        Launches Chrome with a persistent profile directly through Playwright, without CDP over TCP.
+        """
+        started = time.monotonic()
+        context = await playwright.chromium.launch_persistent_context(**self.persistent_context_options(port))
+        self._record(port, started)
+        return context
+
+    def terminate(self, port: Optional[int] = None) -> None:
+        """
+        Terminates the Chrome instance launched on `port`, or every launched instance if no port is given.
+        """
+        ports = [port] if port is not None else list(self.processes)
+        for port in ports:
+            process = self.processes.pop(port, None)
+            if process is None or process.poll() is not None:
+                continue
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def _check_progress(self, port: int, started: float) -> float:
+        """
+        Returns the time left before the deadline, or cleans up and raises if the launch failed.
+        """
+        process = self.processes.get(port)
+        if process is not None and process.poll() is not None:
+            self.processes.pop(port)
+            raise ChromeLaunchException(f"Chrome on port {port} exited with code {process.returncode}")
+
+        remaining = started + self.config.launch_timeout - time.monotonic()
+        if remaining <= 0:
+            self.terminate(port)
+            raise ChromeLaunchException(f"Chrome on port {port} not ready after {self.config.launch_timeout}s")
+        return remaining
+
+    def _record(self, port: int, started: float) -> float:
+        latency = time.monotonic() - started
+        self.startup_latencies[port] = latency
+        logger.info(f"Chrome for port {port} ready after {latency:.2f}s")
+        return latency
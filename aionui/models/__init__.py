@@ -1,7 +1,26 @@
-from .base import BaseModel
-from .claude import Claude
-from .gemini import Gemini
-from .gpt import GPT
-from .deep_seek import DeepSeek
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .base import BaseModel
+    from .claude import Claude
+    from .gemini import Gemini
+    from .gpt import GPT
+    from .deep_seek import DeepSeek
 
 __all__ = ["BaseModel", "Claude", "Gemini", "GPT", "DeepSeek"]
+
+# Providers are imported on first access, so using one does not load the others
+_modules = {"BaseModel": ".base", "Claude": ".claude", "Gemini": ".gemini", "GPT": ".gpt", "DeepSeek": ".deep_seek"}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_modules[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
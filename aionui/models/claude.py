@@ -1,109 +1,138 @@
-import time
-from pathlib import Path
-from typing import Literal, override
-from playwright.sync_api import Locator
+from typing import Literal, override, Optional, Union
+from playwright.sync_api import FilePayload, Locator
 from .base import BaseModel
-import pyperclip
+from ..utils.streams import parse_claude_stream
+
+
+RESPONSE_STATE = r"""
+(previous) => {
+    if (document.querySelectorAll(".font-claude-message").length <= previous) {
+        return null;
+    }
+    const streaming = document.querySelector('[data-is-streaming="true"]');
+    if (streaming || !document.querySelector('[data-is-streaming="false"]')) {
+        return null;
+    }
+    const turns = document.querySelectorAll("[data-test-render-count]");
+    const last = turns[turns.length - 1];
+    return last && last.querySelector(".font-claude-message") ? "done" : null;
+}
+"""
+
+
+RESPONSE_TEXT = r"""
+(previous) => {
+    const responses = document.querySelectorAll(".font-claude-message");
+    return responses.length > previous ? responses[responses.length - 1].innerText : null;
+}
+"""
+
+
+ATTACHMENTS_STATE = r"""
+(names) =>
+    names.every((name) => document.querySelector(`[data-testid="${CSS.escape(name)}"]`)) ? "attached" : null
+"""
 
 
 class Claude(BaseModel):
     url: str = "https://claude.ai/new"
+    response_selector: str = ".font-claude-message"
+    stream_url: str = r"/chat_conversations/[^/]+/completion"
+    response_state_script: str = RESPONSE_STATE
+    response_text_script: str = RESPONSE_TEXT
+    attachments_state_script: str = ATTACHMENTS_STATE
+    runtime_selectors: dict[str, str] = {
+        "input": '[contenteditable="true"]',
+        "send": '[aria-label="Send Message"]',
+        "stop": '[aria-label="Stop response"]',
+    }
 
     @override
     def get_input_field(self) -> Locator:
-        input_field = self.page.locator('[contenteditable="true"]')
-        if input_field.count() > 0:
-            return input_field.first
-        raise ValueError("Input field not found")
+        if not self.snapshot()["input_ready"]:
+            raise ValueError("Input field not found")
+        return self.page.locator(self.runtime_selectors["input"]).first
 
     @override
     def get_submit_button(self) -> Locator:
-        send_button = self.page.locator('[aria-label="Send Message"]')
-        if send_button.count() > 0:
-            return send_button.first
-
-        raise ValueError("Submit button not found")
+        if not self.snapshot()["send_found"]:
+            raise ValueError("Submit button not found")
+        return self.page.locator(self.runtime_selectors["send"]).first
 
     @override
     def get_text_response(self):
-        if self.page.locator(".font-claude-message").count() <= 0:
-            raise ValueError("No response found")
-
-        response = self.page.locator(".font-claude-message").last.inner_text()
-        if response == "":
+        response = self.snapshot()["last_response"]
+        if not response:
             raise ValueError("No response found")
 
         return response
 
     @override
     def get_code_block_response(self) -> str:
-        if self.page.locator(".font-claude-message").count() <= 0:
+        snapshot = self.snapshot()
+        if snapshot["responses"] <= 0:
             raise ValueError("No response found")
+        if not snapshot["code_blocks"]:
+            raise ValueError("Code block not found")
 
-        last_response = self.page.locator(".font-claude-message").last
-        copy_button = last_response.locator("button")
-        if copy_button.count() <= 0:
-            raise ValueError("Copy button not found")
-
-        pyperclip.copy("")
-        copy_button.click()
-        result = pyperclip.paste()
-
-        if result == "":
-            raise ValueError("No response found")
-
-        return result
+        return snapshot["code_blocks"][-1]
 
     @override
     def get_image_response(self) -> str:
         pass
 
     @override
-    def chat(
+    def prepare_message(
         self,
         message: str,
         expected_result: Literal["text", "image", "code", "json"] = "text",
-    ) -> str:
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> None:
         if "claude" not in self.page.url.lower():
+            self.install_runtime()
             self.page.goto(self.url)
-            time.sleep(3)
+            self.wait_until_ready()
+
+        message, attachments = self.route_message(message, attachments)
+        self.attach_files(attachments)
 
         if expected_result == "code" or expected_result == "json":
             if "return in code block" not in message.lower():
                 message += "\nReturn in code block."
         self.fill_message(message)
-        self.get_submit_button().click()
-        self.wait_for_response()
+
+    @override
+    def chat(
+        self,
+        message: str,
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> str:
+        self.prepare_message(message, expected_result, attachments=attachments)
+        previous_responses = self.count_responses()
+        if self.config.response_capture and expected_result != "image":
+            captured = self.submit_and_capture(self.get_submit_button())
+            if captured is not None:
+                return self.format_captured(captured, expected_result)
+        else:
+            self.get_submit_button().click()
+        self.wait_for_response(previous_responses)
         if expected_result == "code" or expected_result == "json":
             return self.get_code_block_response()
         else:
-            return self.get_text_response()
+            return self.strip_instruction_echo(self.get_text_response())
 
     @override
-    def attach_file(self, file_path: str):
-        path = Path(file_path)
-        file_name = path.name
-        file_input = self.page.locator('input[data-testid="file-upload"]')
-        file_input.set_input_files(file_path)
-        time.sleep(3)
-        if self.page.locator(f'[data-testid="{file_name}"]').count() <= 0:
-            raise ValueError("File could not be attached")
+    def get_file_input(self) -> Locator:
+        return self.page.locator('input[data-testid="file-upload"]')
 
     @override
-    def wait_for_response(self):
-        time.sleep(3)
-
-        if self.page.locator(".font-claude-message").count() <= 0:
-            return self.wait_for_response()
+    def parse_stream(self, body: str) -> Optional[str]:
+        return parse_claude_stream(body)
 
-        if self.page.locator('[data-is-streaming="true"]').count() > 0:
-            return self.wait_for_response()
-
-        if self.page.locator('[data-is-streaming="false"]').count() <= 0:
-            return self.wait_for_response()
-
-        if self.page.locator("[data-test-render-count]").last.locator(".font-claude-message").count() <= 0:
-            return self.wait_for_response()
+    @override
+    def wait_for_response(self, previous_responses: int = 0):
+        self.wait_for_state(RESPONSE_STATE, arg=previous_responses)
 
     @override
     def handle_on_error(self, error: Exception):
@@ -111,10 +140,4 @@ class Claude(BaseModel):
 
     @override
     def fill_message(self, message: str):
-        input_field = self.get_input_field()
-        input_field.fill("")
-        list_message = message.split("\n")
-        for message in list_message:
-            input_field.type(message)
-            input_field.press("Shift+Enter")
-        self.page.wait_for_timeout(3000)
+        self.paste_message(message)
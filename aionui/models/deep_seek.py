@@ -1,115 +1,140 @@
 import json
-import time
-from pathlib import Path
-from typing import Literal, override
-from playwright.sync_api import Locator
+from typing import Literal, override, Optional, Union
+from playwright.sync_api import FilePayload, Locator
 from .base import BaseModel
-import pyperclip
+from ..utils.streams import parse_deep_seek_stream
+
+
+RESPONSE_STATE = r"""
+(previous) => {
+    const responses = document.querySelectorAll(".f9bf7997.d7dc56a8.c05b5566");
+    const last = responses[responses.length - 1];
+    if (responses.length <= previous || !document.querySelector(".f9bf7997.c05b5566")) {
+        return null;
+    }
+    return last.querySelectorAll(".ds-icon-button").length >= 4 ? "done" : null;
+}
+"""
+
+
+RESPONSE_TEXT = r"""
+(previous) => {
+    const responses = document.querySelectorAll(".f9bf7997.d7dc56a8.c05b5566");
+    if (responses.length <= previous) {
+        return null;
+    }
+    const blocks = responses[responses.length - 1].querySelectorAll(".ds-markdown.ds-markdown--block");
+    return blocks.length ? blocks[blocks.length - 1].innerText : null;
+}
+"""
+
+
+ATTACHMENTS_STATE = r"""
+(names) => {
+    const files = [...document.querySelectorAll(".f3a54b52")].map((file) => file.innerText.toLowerCase());
+    return names.every((name) => files.some((file) => file.includes(name.toLowerCase()))) ? "attached" : null;
+}
+"""
 
 
 class DeepSeek(BaseModel):
     url: str = "https://chat.deepseek.com/"
+    response_selector: str = ".f9bf7997.d7dc56a8.c05b5566"
+    stream_url: str = r"/api/v0/chat/completion"
+    response_state_script: str = RESPONSE_STATE
+    response_text_script: str = RESPONSE_TEXT
+    attachments_state_script: str = ATTACHMENTS_STATE
+    runtime_selectors: dict[str, str] = {"input": 'textarea[id="chat-input"]', "send": '.f6d670[role="button"]'}
 
     @override
     def get_input_field(self) -> Locator:
-        input_field = self.page.locator('textarea[id="chat-input"]')
-        if input_field.count() > 0:
-            return input_field.first
-        raise ValueError("Input field not found")
+        if not self.snapshot()["input_ready"]:
+            raise ValueError("Input field not found")
+        return self.page.locator(self.runtime_selectors["input"]).first
 
     @override
     def get_submit_button(self) -> Locator:
-        send_button = self.page.locator('.f6d670[role="button"]')
-        if send_button.count() > 0:
-            return send_button.first
-
-        raise ValueError("Submit button not found")
+        if not self.snapshot()["send_found"]:
+            raise ValueError("Submit button not found")
+        return self.page.locator(self.runtime_selectors["send"]).first
 
     @override
     def get_text_response(self):
-        if self.page.locator(".f9bf7997.d7dc56a8.c05b5566").count() <= 0:
-            raise ValueError("No response found")
-
-        response = self.page.locator(".f9bf7997.d7dc56a8.c05b5566 .ds-markdown.ds-markdown--block").last.inner_text()
-        if response == "":
+        response = self.snapshot()["last_response"]
+        if not response:
             raise ValueError("No response found")
 
         return response
 
     @override
     def get_code_block_response(self) -> str:
-        if self.page.locator(".f9bf7997.d7dc56a8.c05b5566").count() <= 0:
+        snapshot = self.snapshot()
+        if snapshot["responses"] <= 0:
             raise ValueError("No response found")
+        if not snapshot["code_blocks"]:
+            raise ValueError("Code block not found")
 
-        last_response = self.page.locator(".f9bf7997.d7dc56a8.c05b5566").last
-        copy_button = last_response.locator(".ds-markdown-code-copy-button")
-        if copy_button.count() <= 0:
-            raise ValueError("Copy button not found")
-
-        pyperclip.copy("")
-        copy_button.click()
-        result = pyperclip.paste()
-
-        if result == "":
-            raise ValueError("No response found")
-
-        return result
+        return snapshot["code_blocks"][-1]
 
     @override
     def get_image_response(self) -> str:
         pass
 
     @override
-    def chat(
+    def prepare_message(
         self,
         message: str,
         expected_result: Literal["text", "image", "code", "json"] = "text",
         tools: list[Literal["search", "deep_think"]] = [],
-    ) -> str:
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> None:
         if "deepseek" not in self.page.url.lower():
+            self.install_runtime()
             self.page.goto(self.url)
-            time.sleep(3)
+            self.wait_until_ready()
+
+        message, attachments = self.route_message(message, attachments)
+        self.attach_files(attachments)
 
         if expected_result == "code" or expected_result == "json":
             if "return in code block" not in message.lower():
                 message += "\nReturn in code block."
         self.fill_message(message)
         self.activate_tools(tools)
-        self.get_submit_button().click()
-        self.wait_for_response()
+
+    @override
+    def chat(
+        self,
+        message: str,
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        tools: list[Literal["search", "deep_think"]] = [],
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> str:
+        self.prepare_message(message, expected_result, tools, attachments=attachments)
+        previous_responses = self.count_responses()
+        if self.config.response_capture and expected_result != "image":
+            captured = self.submit_and_capture(self.get_submit_button())
+            if captured is not None:
+                return self.format_captured(captured, expected_result)
+        else:
+            self.get_submit_button().click()
+        self.wait_for_response(previous_responses)
         if expected_result == "code" or expected_result == "json":
             return self.get_code_block_response()
         else:
-            return self.get_text_response()
+            return self.strip_instruction_echo(self.get_text_response())
 
     @override
-    def attach_file(self, file_path: str):
-        path = Path(file_path)
-        file_name = path.name
-        file_input = self.page.locator('input[type="file"]')
-        file_input.set_input_files(file_path)
-        time.sleep(3)
-        if self.page.locator(".f3a54b52").count() <= 0:
-            raise ValueError("File could not be attached")
-
-        if (
-            next((x for x in self.page.locator(".f3a54b52").all_inner_texts() if file_name.lower() in x.lower()), None)
-            is None
-        ):
-            raise ValueError("File could not be attached")
+    def get_file_input(self) -> Locator:
+        return self.page.locator('input[type="file"]')
 
     @override
-    def wait_for_response(self):
-        time.sleep(3)
+    def parse_stream(self, body: str) -> Optional[str]:
+        return parse_deep_seek_stream(body)
 
-        if self.page.locator(".f9bf7997.d7dc56a8.c05b5566").count() <= 0:
-            return self.wait_for_response()
-
-        if self.page.locator(".f9bf7997.c05b5566").count() <= 0:
-            return self.wait_for_response()
-
-        if self.page.locator(".f9bf7997.d7dc56a8.c05b5566").last.locator(".ds-icon-button").count() < 4:
-            return self.wait_for_response()
+    @override
+    def wait_for_response(self, previous_responses: int = 0):
+        self.wait_for_state(RESPONSE_STATE, arg=previous_responses)
 
     @override
     def handle_on_error(self, error: Exception):
@@ -117,13 +142,7 @@ class DeepSeek(BaseModel):
 
     @override
     def fill_message(self, message: str):
-        input_field = self.get_input_field()
-        input_field.fill("")
-        list_message = message.split("\n")
-        for message in list_message:
-            input_field.type(message)
-            input_field.press("Shift+Enter")
-        self.page.wait_for_timeout(3000)
+        self.paste_message(message)
 
     def activate_tools(self, tools: list[Literal["search", "deep_think"]]):
         need_click_search = False
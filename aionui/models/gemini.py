@@ -1,26 +1,61 @@
 import time
-from pathlib import Path
-from typing import Literal, override
-from playwright.sync_api import Locator
+from typing import Literal, override, Optional, Union
+from playwright.sync_api import FilePayload, Locator
 from .base import BaseModel
-import pyperclip
+from ..utils.streams import parse_gemini_stream
+
+
+RESPONSE_STATE = r"""
+(previous) => {
+    const responses = document.querySelectorAll("model-response");
+    const last = responses[responses.length - 1];
+    if (responses.length <= previous) {
+        return null;
+    }
+    return last.querySelector("sensitive-memories-banner") ? "done" : null;
+}
+"""
+
+
+RESPONSE_TEXT = r"""
+(previous) => {
+    const responses = document.querySelectorAll("model-response");
+    return responses.length > previous ? responses[responses.length - 1].innerText : null;
+}
+"""
+
+
+ATTACHMENTS_STATE = r"""
+(names) =>
+    names.every((name) => document.querySelector(`[data-test-id="file-name"][title="${CSS.escape(name)}"]`))
+        ? "attached"
+        : null
+"""
 
 
 class Gemini(BaseModel):
     url: str = "https://gemini.google.com/u/3/app"
+    response_selector: str = "model-response"
+    stream_url: str = r"/StreamGenerate"
+    response_state_script: str = RESPONSE_STATE
+    response_text_script: str = RESPONSE_TEXT
+    attachments_state_script: str = ATTACHMENTS_STATE
+    runtime_selectors: dict[str, str] = {
+        "input": '[contenteditable="true"]',
+        "send": ".send-button:not(.stop)",
+        "stop": ".send-button.stop",
+    }
 
     @override
     def get_input_field(self) -> Locator:
-        input_field = self.page.locator('[contenteditable="true"]')
-        if input_field.count() > 0:
-            return input_field.first
-        raise ValueError("Input field not found")
+        if not self.snapshot()["input_ready"]:
+            raise ValueError("Input field not found")
+        return self.page.locator(self.runtime_selectors["input"]).first
 
     @override
     def get_submit_button(self) -> Locator:
-        send_button = self.page.locator(".send-button")
-        if send_button.count() > 0:
-            return send_button.first
+        if self.snapshot()["send_found"]:
+            return self.page.locator(self.runtime_selectors["send"]).first
 
         speech_button = self.page.locator("speech_dictation_mic_button")
         if speech_button.count() > 0:
@@ -30,33 +65,21 @@ class Gemini(BaseModel):
 
     @override
     def get_text_response(self):
-        if self.page.locator("model-response").count() <= 0:
-            raise ValueError("No response found")
-
-        response = self.page.locator("model-response").last.inner_text()
-        if response == "":
+        response = self.snapshot()["last_response"]
+        if not response:
             raise ValueError("No response found")
 
         return response
 
     @override
     def get_code_block_response(self) -> str:
-        if self.page.locator("model-response").count() <= 0:
-            raise ValueError("No response found")
-
-        last_response = self.page.locator("model-response").last
-        copy_button = last_response.locator(".copy-button")
-        if copy_button.count() <= 0:
-            raise ValueError("Copy button not found")
-
-        pyperclip.copy("")
-        copy_button.click()
-        result = pyperclip.paste()
-
-        if result == "":
+        snapshot = self.snapshot()
+        if snapshot["responses"] <= 0:
             raise ValueError("No response found")
+        if not snapshot["code_blocks"]:
+            raise ValueError("Code block not found")
 
-        return result
+        return snapshot["code_blocks"][-1]
 
     @override
     def get_image_response(self) -> str:
@@ -79,35 +102,52 @@ class Gemini(BaseModel):
         return src
 
     @override
-    def chat(
+    def prepare_message(
         self,
         message: str,
         expected_result: Literal["text", "image", "code", "json"] = "text",
-    ) -> str:
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> None:
         if "gemini" not in self.page.url.lower():
+            self.install_runtime()
             self.page.goto(self.url)
-            time.sleep(2)
+            self.wait_until_ready()
+
+        message, attachments = self.route_message(message, attachments)
+        self.attach_files(attachments)
 
         if expected_result == "code" or expected_result == "json":
             if "return in code block" not in message.lower():
                 message += "\nReturn in code block."
 
         self.fill_message(message)
-        self.get_submit_button().click()
-        self.wait_for_response()
+
+    @override
+    def chat(
+        self,
+        message: str,
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> str:
+        self.prepare_message(message, expected_result, attachments=attachments)
+        previous_responses = self.count_responses()
+        if self.config.response_capture and expected_result != "image":
+            captured = self.submit_and_capture(self.get_submit_button())
+            if captured is not None:
+                return self.format_captured(captured, expected_result)
+        else:
+            self.get_submit_button().click()
+        self.wait_for_response(previous_responses)
 
         if expected_result == "image":
             return self.get_image_response()
         elif expected_result == "code" or expected_result == "json":
             return self.get_code_block_response()
         else:
-            return self.get_text_response()
+            return self.strip_instruction_echo(self.get_text_response())
 
     @override
-    def attach_file(self, file_path: str):
-        path = Path(file_path)
-        file_name = path.name
-
+    def get_file_input(self) -> Locator:
         if self.page.locator('input[name="Filedata"]').count() <= 0:
 
             self.page.on("filechooser", lambda file_chooser: file_chooser)
@@ -120,22 +160,15 @@ class Gemini(BaseModel):
                 raise ValueError("File uploader not found")
             self.page.locator("#file-uploader-local").click()
 
-        file_input = self.page.locator('input[name="Filedata"]').first
-        file_input.set_input_files(file_path)
-
-        time.sleep(2)
-        if self.page.locator(f'[data-test-id="file-name"][title="{file_name}"]').count() <= 0:
-            raise ValueError("File could not be attached")
+        return self.page.locator('input[name="Filedata"]').first
 
     @override
-    def wait_for_response(self):
-        time.sleep(3)
+    def parse_stream(self, body: str) -> Optional[str]:
+        return parse_gemini_stream(body)
 
-        if self.page.locator("model-response").count() <= 0:
-            return self.wait_for_response()
-
-        if self.page.locator("model-response").last.locator("sensitive-memories-banner").count() <= 0:
-            return self.wait_for_response()
+    @override
+    def wait_for_response(self, previous_responses: int = 0):
+        self.wait_for_state(RESPONSE_STATE, arg=previous_responses)
 
     @override
     def handle_on_error(self, error: Exception):
@@ -143,11 +176,4 @@ class Gemini(BaseModel):
 
     @override
     def fill_message(self, message: str):
-        input_field = self.get_input_field()
-        input_field.fill("")
-        list_message = message.split("\n")
-        for message in list_message:
-            input_field.type(message)
-            input_field.press("Shift+Enter")
-
-        self.page.wait_for_timeout(3000)
+        self.paste_message(message)
@@ -1,17 +1,16 @@
 import re
 import time
-from datetime import datetime, timedelta
-from typing import Literal, override
-from pathlib import Path
+from typing import Literal, override, Optional, Union
 
-import pyperclip
-from playwright.sync_api import Locator
-from tenacity import retry, stop_after_attempt, wait_exponential, RetryCallState
+from playwright.sync_api import FilePayload, Locator
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential, RetryCallState
 
 from .base import BaseModel
 from ..enums import Platform, KeyboardCommand
 from ..utils.logger import get_logger
-from ..utils.common import clean_text
+from ..exceptions import QuotaExceededException
+from ..utils.common import clean_text, parse_reset_time
+from ..utils.streams import parse_gpt_stream
 
 logger = get_logger(__name__)
 
@@ -22,15 +21,87 @@ def handle_reload(state: RetryCallState):
     time.sleep(3)
 
 
+RESPONSE_STATE = r"""
+(previous) => {
+    const continueButton = [...document.querySelectorAll("button")].find((button) =>
+        button.textContent.includes("Continue generating")
+    );
+    if (continueButton) {
+        return "continue";
+    }
+
+    // Only ChatGPT's own notices count, never a conversation turn or the draft in the composer
+    const limit = /usage cap|(?:reached|hit) (?:the|our|your) (?:\w+ )*limit/i;
+    const notices = document.querySelectorAll('form, [role="alert"], [data-testid*="limit"], [class*="banner"]');
+    for (const notice of notices) {
+        if (notice.closest("article, [data-message-author-role]")) {
+            continue;
+        }
+        let text = notice.textContent;
+        const skipped = '[contenteditable="true"], textarea, article, [data-message-author-role]';
+        for (const element of notice.querySelectorAll(skipped)) {
+            text = text.replace(element.textContent, "");
+        }
+        if (limit.test(text)) {
+            return "limit";
+        }
+    }
+
+    const articles = document.querySelectorAll("article");
+    const last = articles[articles.length - 1];
+    if (articles.length <= previous) {
+        return null;
+    }
+    const labels = last.querySelectorAll(".sr-only");
+    if (labels.length && labels[labels.length - 1].textContent === "You said:") {
+        return null;
+    }
+    const copyButtons = last.querySelectorAll('[data-testid="copy-turn-action-button"]');
+    const copyButton = copyButtons[copyButtons.length - 1];
+    return copyButton && copyButton.getClientRects().length > 0 ? "done" : null;
+}
+"""
+
+
+RESPONSE_TEXT = r"""
+(previous) => {
+    const articles = document.querySelectorAll("article");
+    const last = articles[articles.length - 1];
+    if (articles.length <= previous || !last) {
+        return null;
+    }
+    const markdown = last.querySelectorAll(".markdown");
+    return markdown.length ? markdown[markdown.length - 1].innerText : null;
+}
+"""
+
+
+ATTACHMENTS_STATE = r"""
+(names) => {
+    const text = document.body.innerText;
+    return names.every((name) => text.includes(name)) ? "attached" : null;
+}
+"""
+
+
 class GPT(BaseModel):
     url: str = "https://chatgpt.com"
+    response_selector: str = "article"
+    stream_url: str = r"/backend-api/(?:f/)?conversation(?:\?|$)"
+    response_state_script: str = RESPONSE_STATE
+    response_text_script: str = RESPONSE_TEXT
+    attachments_state_script: str = ATTACHMENTS_STATE
+    runtime_selectors: dict[str, str] = {
+        "input": "#prompt-textarea",
+        "send": '[data-testid="send-button"]',
+        "stop": '[data-testid="stop-button"]',
+    }
 
     @override
     def get_input_field(self) -> Locator:
-        input_field = self.page.locator("#prompt-textarea")
-        if input_field.count() > 0:
-            return input_field.first
-        raise ValueError("Input field not found")
+        if not self.snapshot()["input_ready"]:
+            raise ValueError("Input field not found")
+        return self.page.locator(self.runtime_selectors["input"]).first
 
     @override
     def fill_message(self, message: str):
@@ -39,9 +110,8 @@ class GPT(BaseModel):
 
     @override
     def get_submit_button(self):
-        send_button = self.page.locator('[data-testid="send-button"]:not([disabled])')
-        if send_button.count() > 0:
-            return send_button.first
+        if self.snapshot()["send_found"]:
+            return self.page.locator(self.runtime_selectors["send"]).first
 
         speech_button = self.page.locator('[data-testid="composer-speech-button"]')
         if speech_button.count() > 0:
@@ -52,28 +122,17 @@ class GPT(BaseModel):
     @override
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=4, max=15))
     def get_text_response(self):
-        pyperclip.copy("")
         # self.page.keyboard.press(self.get_key_board_shortcut(KeyboardCommand.CopyLastArticle))
         self.page.wait_for_selector('[data-testid="copy-turn-action-button"]')
-        self.page.locator('[data-testid="copy-turn-action-button"]').last.click(
-            force=True,
-            no_wait_after=True,
-        )
-        time.sleep(1)
-        result = pyperclip.paste()
-        if result == "":
-            raise ValueError("No response found")
+        copy_button = self.page.locator('[data-testid="copy-turn-action-button"]').last
+        result = self.read_copied(lambda: copy_button.click(force=True, no_wait_after=True))
         return clean_text(result)
 
     @override
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=4, max=15))
     def get_code_block_response(self):
-        pyperclip.copy("")
-        self.page.keyboard.press(self.get_key_board_shortcut(KeyboardCommand.CopyLastCode))
-        result = pyperclip.paste()
-        if result == "":
-            raise ValueError("No response found")
-        return result
+        shortcut = self.get_key_board_shortcut(KeyboardCommand.CopyLastCode)
+        return self.read_copied(lambda: self.page.keyboard.press(shortcut))
 
     @override
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=4, max=15))
@@ -88,75 +147,93 @@ class GPT(BaseModel):
         return src
 
     @override
-    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=4, max=15), before_sleep=handle_reload)
-    def chat(
+    def prepare_message(
         self,
         message: str,
         expected_result: Literal["text", "image", "code", "json"] = "text",
         tools: list[Literal["search_the_web"]] = [],
-    ):
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> None:
         if "gpt" not in self.page.url.lower():
+            self.install_runtime()
             self.page.goto(self.url)
-            time.sleep(3)
+            self.wait_until_ready()
+
+        message, attachments = self.route_message(message, attachments)
+        self.attach_files(attachments)
 
         if expected_result == "code" or expected_result == "json":
             if "return in code block" not in message.lower():
                 message += "\nReturn in code block."
-        self.get_input_field()
-        self.get_submit_button()
         self.fill_message(message)
         self.activate_tools(tools)
-        self.get_submit_button().click()
-        self.wait_for_response()
+
+    @override
+    @retry(
+        stop=stop_after_attempt(5),
+        wait=wait_exponential(multiplier=1, min=4, max=15),
+        retry=retry_if_not_exception_type(QuotaExceededException),
+        before_sleep=handle_reload,
+    )
+    def chat(
+        self,
+        message: str,
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        tools: list[Literal["search_the_web"]] = [],
+        attachments: list[Union[str, FilePayload]] = [],
+    ):
+        self.prepare_message(message, expected_result, tools, attachments=attachments)
+        previous_responses = self.count_responses()
+        if self.config.response_capture and expected_result != "image":
+            captured = self.submit_and_capture(self.get_submit_button())
+            if captured is not None:
+                return self.format_captured(captured, expected_result)
+        else:
+            self.get_submit_button().click()
+        self.wait_for_response(previous_responses)
         if expected_result == "image":
             return self.get_image_response()
         elif expected_result == "code" or expected_result == "json":
             return self.get_code_block_response()
         else:
-            return self.get_text_response()
+            return self.strip_instruction_echo(self.get_text_response())
 
     @override
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=15))
-    def attach_file(self, file_path: str):
-        path = Path(file_path)
-        file_name = path.name
-        file_input = self.page.locator('input[type="file"]').first
-        file_input.set_input_files(file_path)
-        time.sleep(3)
-        if Path(file_input.input_value()).name != file_name:
-            raise ValueError("File could not be attached")
+    def get_file_input(self) -> Locator:
+        return self.page.locator('input[type="file"]').first
 
     @override
-    def wait_for_response(self):
-        time.sleep(3)
-        if self.page.locator("text=Continue generating").count() > 0:
-            self.page.click("text=Continue generating")
-            logger.info("Continuing generation...")
-            return self.wait_for_response()
-
-        if self.page.locator("article").count() <= 0:
-            return self.wait_for_response()
+    def parse_stream(self, body: str) -> Optional[str]:
+        return parse_gpt_stream(body)
 
-        if self.page.locator('[data-testid="copy-turn-action-button"]').count() <= 0:
-            return self.wait_for_response()
-
-        last_article = self.page.locator("article").last
-        if last_article.locator(".sr-only").last.text_content() == "You said:":
-            return self.wait_for_response()
-
-        if last_article.locator('[data-testid="copy-turn-action-button"]').count() <= 0:
-            return self.wait_for_response()
+    @override
+    def wait_for_response(self, previous_responses: int = 0):
+        deadline = time.monotonic() + self.config.response_timeout
+        while True:
+            state = self.wait_for_state(RESPONSE_STATE, deadline - time.monotonic(), previous_responses)
+            if self.handle_response_state(state):
+                return
 
-        if not last_article.locator('[data-testid="copy-turn-action-button"]').last.is_visible():
-            return self.wait_for_response()
+    @override
+    def handle_response_state(self, state: str) -> bool:
+        if state == "continue":
+            self.page.locator("text=Continue generating").first.click()
+            logger.info("Continuing generation...")
+            return False
+        if state == "limit":
+            self.handle_on_error()
+        return state == "done"
 
     @override
     def handle_on_error(self):
+        """Raises `QuotaExceededException` with the reset time shown on the page, instead of waiting for it."""
         self.page.reload()
+        reset_at = time.time() + self.config.quota_window
         if self.page.locator(r"text=/[0-9]{1,2}:[0-9]{2}\s(?:AM|PM)/").count() > 0:
-            text = self.page.locator(r"text=/[0-9]{1,2}:[0-9]{2}\s(?:AM|PM)/").inner_text()
+            text = self.page.locator(r"text=/[0-9]{1,2}:[0-9]{2}\s(?:AM|PM)/").first.inner_text()
             time_reset = re.search(r"([0-9]{1,2}:[0-9]{2}\s(?:AM|PM))", text).group(1)
-            self.sleep_until_time(time_reset)
+            reset_at = parse_reset_time(time_reset).timestamp()
+        raise QuotaExceededException("gpt", reset_at)
 
     def get_key_board_shortcut(self, command: KeyboardCommand):
         MACOS = {
@@ -180,28 +257,3 @@ class GPT(BaseModel):
         if "search_the_web" in tools:
             if self.page.locator('[aria-label="Search the web"][aria-pressed="false"]').count() > 0:
                 self.page.locator('[aria-label="Search the web"][aria-pressed="false"]').first.click()
-
-    def sleep_until_time(self, time_str: str):
-        """Sleep until specified time"""
-        now = datetime.now()
-        time_format = "%I:%M %p"
-        reset_datetime = datetime.strptime(time_str, time_format)
-
-        reset_datetime = now.replace(
-            hour=reset_datetime.time().hour,
-            minute=reset_datetime.time().minute,
-            second=0,
-            microsecond=0,
-        )
-
-        if reset_datetime.time() < now.time():
-            reset_datetime += timedelta(days=1)
-
-        reset_datetime += timedelta(minutes=5)
-
-        sleep_time = (reset_datetime - now).total_seconds()
-        if sleep_time < 0:
-            sleep_time = -sleep_time
-
-        logger.info(f"Waiting {sleep_time} seconds for limit reset")
-        time.sleep(sleep_time)
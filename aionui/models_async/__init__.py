@@ -1,8 +1,33 @@
-from .base_async import BaseAsyncModel
-from .gpt_async import GPTAsync
-from .claude_async import ClaudeAsync
-from .gemini_async import GeminiAsync
-from .deep_seek_async import DeepSeekAsync
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .base_async import BaseAsyncModel
+    from .gpt_async import GPTAsync
+    from .claude_async import ClaudeAsync
+    from .gemini_async import GeminiAsync
+    from .deep_seek_async import DeepSeekAsync
 
 
 __all__ = ["BaseAsyncModel", "GPTAsync", "ClaudeAsync", "GeminiAsync", "DeepSeekAsync"]
+
+# Providers are imported on first access, so using one does not load the others
+_modules = {
+    "BaseAsyncModel": ".base_async",
+    "GPTAsync": ".gpt_async",
+    "ClaudeAsync": ".claude_async",
+    "GeminiAsync": ".gemini_async",
+    "DeepSeekAsync": ".deep_seek_async",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_modules[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -1,43 +1,112 @@
 from abc import ABC, abstractmethod
-from typing import Literal
+import asyncio
+import re
+import time
+from typing import Any, AsyncGenerator, Awaitable, Callable, Literal, Optional, Union
 
-from playwright.async_api import Locator, Page
+from playwright.async_api import Error, FilePayload, Locator, Page, Response
+from ..chat_chunk import ChatChunk
 from ..config.config import Config
+from ..primed_conversations import PrimedConversations
+from ..utils.scripts import (
+    CAPTURE_CLIPBOARD,
+    COPIED_TEXT,
+    INPUT_HAS_TEXT,
+    INPUT_READY,
+    PASTE_TEXT,
+    SNAPSHOT,
+    runtime_script,
+    stream_delta_script,
+    wait_for_state_script,
+)
+from ..utils.common import INSTRUCTIONS, attachment_name, strip_echo, text_file_payload
+from ..utils.streams import extract_code_block
 from ..exceptions import BotDetectedException
-import os
-import codecs
+import weakref
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 
+# The runtimes added to each page as init scripts, by model name
+_page_runtimes: weakref.WeakKeyDictionary[Page, set[str]] = weakref.WeakKeyDictionary()
+
+# Pages showing a conversation started with `priming="lazy"` that did not get the instructions yet
+_unprimed_pages: weakref.WeakSet[Page] = weakref.WeakSet()
+
+
 class BaseAsyncModel(ABC):
     url: str
+    response_selector: str
+    stream_url: Optional[str] = None
+    response_state_script: str
+    response_text_script: str
+    attachments_state_script: str
+    runtime_selectors: dict[str, str] = {}
     page: Page
     config: Config
+    primed_conversations: Optional[PrimedConversations] = None
 
-    def __init__(self, config: Config, page: Page):
+    def __init__(self, config: Config, page: Page, url: Optional[str] = None):
+        """
+        Args:
+            config (Config): The config.
+            page (Page): The page to chat in.
+            url (str, optional): Start page overriding the provider's default, e.g. for another account.
+        """
         self.config = config
         self.page = page
+        self._echo_pending = False
+        if url:
+            self.url = url
 
-    async def new_conversation(self):
+    async def new_conversation(self, priming: Literal["eager", "lazy"] = "eager"):
         """
         Starts a new conversation.
+
+        With `priming="eager"` the instructions are sent as a turn of their own, or, with `primed_conversations` set,
+        a conversation that already received them is opened if one is ready. With `priming="lazy"` they are
+        prepended to the first message sent with `chat` instead, which saves a turn for one-shot chats.
+
+        Args:
+            priming (Literal["eager", "lazy"], optional): When to send the instructions. Defaults to "eager".
         """
+        _unprimed_pages.discard(self.page)
+        self._echo_pending = False
+        url = self.url
+        if priming == "eager":
+            url = self.primed_conversations.take() if self.primed_conversations is not None else None
+            if url is None:
+                await self.prime()
+                return
+
+        await self.install_runtime()
+        await self.page.goto(url)
+        if "just a moment" in (await self.page.title()).lower():
+            raise BotDetectedException("Cloudflare detected")
+        await self.wait_until_ready()
+        if priming == "lazy":
+            _unprimed_pages.add(self.page)
+
+    async def prime(self) -> str:
+        """
+        Starts a conversation and sends the instructions.
+
+        Returns:
+            str: The address of the primed conversation, to open it again later.
+        """
+        await self.install_runtime()
         await self.page.goto(self.url)
-        await self.page.wait_for_timeout(3000)
         if "just a moment" in (await self.page.title()).lower():
             raise BotDetectedException("Cloudflare detected")
+        await self.wait_until_ready()
         await self.init_instructions()
+        return self.page.url
 
     async def init_instructions(self):
         """
         Initializes the instructions for the AI model.
         """
-        template = "For my requests, please proceed as follows:\n"
-        template += "- Only respond to what is requested, do not add any descriptions or explanations.\n"
-        template += "- Return in a code block for JSON and code, while text remains in normal format.\n"
-        template += "- For JSON, use double quotes for keys and values, and ensure the JSON is valid.\n"
-        template += "- Search for any additional information on the internet if needed.\n"
-        await self.chat(template)
+        # Priming has to reach the page, so it goes past a response cache set on the instance
+        await type(self).chat(self, INSTRUCTIONS)
 
     async def fill_message(self, message: str):
         """
@@ -46,25 +115,44 @@ class BaseAsyncModel(ABC):
         input_field = await self.get_input_field()
         await input_field.fill(message)
 
-    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=4, max=15))
-    async def text_as_file(self, text: str, file_name: str = "attachment.txt"):
+    async def paste_message(self, message: str, timeout: float = 10):
         """
-        Converts text to a file and attaches it.
+        Puts the whole message into the input field in one operation, for editors that `fill` cannot type into.
+
+        The message is pasted with a synthetic paste event, or inserted like an IME commit when the editor ignores
+        the paste, so the time taken does not grow with the length of the message.
 
         Args:
-            text (str): The text content to write to the file
-            file_name (str, optional): The name of the file to create. Defaults to "attachment.txt"
+            message (str): The message to put into the input field.
+            timeout (float, optional): Seconds to wait for the editor to show the message. Defaults to 10.
+
+        Raises:
+            ValueError: If the input field does not hold the message in time.
         """
-        path = os.path.abspath(file_name)
+        input_field = await self.get_input_field()
+        await input_field.fill("")
+        if not await input_field.evaluate(PASTE_TEXT, message):
+            await self.page.keyboard.insert_text(message)
+        try:
+            await self.wait_for_state(INPUT_HAS_TEXT, timeout, [self.runtime_selectors["input"], message])
+        except TimeoutError:
+            raise ValueError("Message could not be filled")
 
-        if os.path.exists(path):
-            os.remove(path)
+    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=4, max=15))
+    async def text_as_file(self, text: str, file_name: str = "attachment.txt") -> str:
+        """
+        Attaches text as a file, uploaded from memory without touching the filesystem.
 
-        with codecs.open(path, "w", encoding="utf-8") as file:
-            file.write(text)
+        Args:
+            text (str): The text content of the file
+            file_name (str, optional): The name of the file, made unique per call. Defaults to "attachment.txt"
 
-        await self.attach_file(path)
-        os.remove(path)
+        Returns:
+            str: The name the file was attached under, e.g. "attachment-1a2b3c4d.txt".
+        """
+        payload = text_file_payload(text, file_name)
+        await self.attach_file(payload)
+        return payload["name"]
 
     @abstractmethod
     async def get_input_field(self) -> Locator:
@@ -105,7 +193,30 @@ class BaseAsyncModel(ABC):
         pass
 
     @abstractmethod
-    async def chat(self, message: str, expected_result: Literal["text", "image", "code", "json"] = "text") -> str:
+    async def prepare_message(
+        self,
+        message: str,
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> None:
+        """
+        Opens the provider if needed, attaches the files and types the message, ready to be submitted.
+
+        Args:
+            message (str): The message to send to the AI model, attached as a file if it is longer than
+                `config.inline_message_limit`.
+            expected_result (Literal["text", "image", "code", "json"], optional): The expected result type.
+            attachments (list[Union[str, FilePayload]], optional): Paths or in-memory files to attach.
+        """
+        pass
+
+    @abstractmethod
+    async def chat(
+        self,
+        message: str,
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> str:
         """
         Sends a message to the AI model and returns the response.
 
@@ -113,6 +224,8 @@ class BaseAsyncModel(ABC):
             message (str): The message to send to the AI model.
             expected_result (Literal["text", "image", "code", "json"], optional): The expected result type.
                 Can be "text", "image", "code", or "json". Defaults to "text".
+            attachments (list[Union[str, FilePayload]], optional): Paths or in-memory files to attach, all uploaded
+                at once. A message longer than `config.inline_message_limit` is attached as a file too.
 
         Returns:
             str: The response from the AI model. The format depends on expected_result:
@@ -126,20 +239,309 @@ class BaseAsyncModel(ABC):
         """
         pass
 
-    @abstractmethod
-    async def attach_file(self, file_path: str):
+    async def chat_stream(
+        self, message: str, expected_result: Literal["text", "image", "code", "json"] = "text", **kwargs: Any
+    ) -> AsyncGenerator[ChatChunk, None]:
+        """
+        Sends a message to the AI model and yields the response while it is being rendered.
+
+        The new characters are computed in the page, so only they are transferred. The page is read again only
+        when the consumer asks for the next chunk: a slow consumer gets larger chunks instead of a backlog.
+
+        Args:
+            message (str): The message to send to the AI model.
+            expected_result (Literal["text", "image", "code", "json"], optional): The expected result type.
+            **kwargs: Passed to `prepare_message`, e.g. `tools`.
+
+        Yields:
+            ChatChunk: The rendered deltas, then a final chunk holding the completed response as `chat` returns it.
+        """
+        await self.prepare_message(message, expected_result, **kwargs)
+        submit_button = await self.get_submit_button()
+        previous_responses = await self.count_responses()
+        await submit_button.click()
+
+        script = stream_delta_script(self.response_text_script, self.response_state_script)
+        deadline = time.monotonic() + self.config.response_timeout
+        text = ""
+        while True:
+            update = await self.wait_for_state(script, deadline - time.monotonic(), [previous_responses, len(text)])
+            if update["delta"]:
+                text += update["delta"]
+                yield ChatChunk(update["delta"], text)
+            if update["state"] and await self.handle_response_state(update["state"]):
+                break
+
+        yield ChatChunk("", await self.get_response(expected_result), done=True)
+
+    async def get_response(self, expected_result: Literal["text", "image", "code", "json"] = "text") -> str:
+        """
+        Gets the completed response in the format `chat` returns for `expected_result`.
+        """
+        if expected_result == "image":
+            return await self.get_image_response()
+        elif expected_result == "code" or expected_result == "json":
+            return await self.get_code_block_response()
+        else:
+            return self.strip_instruction_echo(await self.get_text_response())
+
+    async def attach_file(self, file_path: Union[str, FilePayload]):
         """
         Attaches a file to the AI model.
 
         Args:
-            file_path (str): The path to the file to attach.
+            file_path (Union[str, FilePayload]): The path to the file to attach, or an in-memory file.
+        """
+        await self.attach_files([file_path])
+
+    async def attach_files(self, files: list[Union[str, FilePayload]], timeout: float = 30):
+        """
+        Attaches files in a single upload and waits until the page shows every one of them.
+
+        Args:
+            files (list[Union[str, FilePayload]]): Paths or in-memory files to attach.
+            timeout (float, optional): Seconds to wait for the files to show up. Defaults to 30.
+
+        Raises:
+            ValueError: If not every file shows up in time.
+        """
+        if not files:
+            return
+
+        file_input = await self.get_file_input()
+        if len(files) > 1 and await file_input.get_attribute("multiple") is None:
+            for file in files:
+                await file_input.set_input_files(file)
+        else:
+            await file_input.set_input_files(files)
+
+        try:
+            await self.wait_for_state(self.attachments_state_script, timeout, [attachment_name(file) for file in files])
+        except TimeoutError:
+            raise ValueError("File could not be attached")
+
+    @abstractmethod
+    async def get_file_input(self) -> Locator:
+        """
+        Gets the file input of the page, opening the upload menu if the provider needs it.
         """
         pass
 
+    def route_message(
+        self, message: str, attachments: list[Union[str, FilePayload]] = []
+    ) -> tuple[str, list[Union[str, FilePayload]]]:
+        """
+        Moves a message longer than `config.inline_message_limit` into an attached file, so it is not typed.
+
+        The first message of a conversation started with `priming="lazy"` gets the instructions prepended.
+
+        Returns:
+            tuple[str, list[Union[str, FilePayload]]]: The message to type and the files to attach.
+        """
+        if self.page in _unprimed_pages:
+            _unprimed_pages.discard(self.page)
+            message = f"{INSTRUCTIONS}\n{message}"
+            self._echo_pending = True
+
+        limit = self.config.inline_message_limit
+        if not limit or len(message) <= limit:
+            return message, list(attachments)
+
+        payload = text_file_payload(message, "message.txt")
+        return f'My request is in the attached file "{payload["name"]}", follow it.', [*attachments, payload]
+
     @abstractmethod
-    async def wait_for_response(self):
+    async def wait_for_response(self, previous_responses: int = 0):
         """
         Waits until the response is complete.
+
+        Args:
+            previous_responses (int, optional): The `count_responses` taken before the message was sent, so that
+                the previous response is not mistaken for a completed one.
+        """
+        pass
+
+    async def count_responses(self) -> int:
+        """
+        Counts the responses on the page, taken before sending so `wait_for_response` can tell the new one apart.
+        """
+        return (await self.snapshot())["responses"]
+
+    async def submit_and_capture(self, submit_button: Locator) -> Optional[str]:
+        """
+        Clicks the submit button while listening for the provider's streaming response, and assembles the message
+        from the wire once the stream closes.
+
+        Args:
+            submit_button (Locator): The button sending the message.
+
+        Returns:
+            str: The message, None if no stream was seen or it could not be parsed. The message was sent either way.
+        """
+        clicked = False
+        try:
+            async with self.page.expect_response(
+                self.is_stream_response, timeout=min(30, self.config.response_timeout) * 1000
+            ) as info:
+                await submit_button.click()
+                clicked = True
+            response = await info.value
+            body = await asyncio.wait_for(response.text(), self.config.response_timeout)
+        except (Error, asyncio.TimeoutError):
+            if not clicked:
+                raise
+            return None
+        return self.parse_stream(body)
+
+    def is_stream_response(self, response: Response) -> bool:
+        """
+        Checks whether a response is the provider's stream of the message being answered.
+        """
+        return (
+            self.stream_url is not None
+            and response.request.method == "POST"
+            and re.search(self.stream_url, response.url) is not None
+        )
+
+    def parse_stream(self, body: str) -> Optional[str]:
+        """
+        Assembles the message from the body of the provider's stream, None if it holds no message.
+        """
+        return None
+
+    def format_captured(self, message: str, expected_result: Literal["text", "image", "code", "json"] = "text") -> str:
+        """
+        Turns a message read from the wire into the result `chat` returns, i.e. its last code block for code and JSON.
+        """
+        if expected_result == "code" or expected_result == "json":
+            return extract_code_block(message) or message.strip()
+        return self.strip_instruction_echo(message.strip())
+
+    def strip_instruction_echo(self, response: str) -> str:
+        """
+        Removes the instructions from the start of the first response of a conversation started with
+        `priming="lazy"`, in case the model repeated them.
+        """
+        if not self._echo_pending:
+            return response
+        self._echo_pending = False
+        return strip_echo(response, INSTRUCTIONS)
+
+    async def install_runtime(self) -> None:
+        """
+        Adds the provider's in-page runtime to the page, so every document it loads can answer `snapshot` at once.
+        """
+        installed = _page_runtimes.setdefault(self.page, set())
+        if type(self).__name__ not in installed:
+            await self.page.add_init_script(self.get_runtime_script())
+            installed.add(type(self).__name__)
+
+    def get_runtime_script(self) -> str:
+        """
+        Gets the provider's in-page runtime, see `runtime_script`.
+        """
+        selectors = {"response": self.response_selector, **self.runtime_selectors}
+        return runtime_script(type(self).__name__, selectors, self.response_state_script, self.response_text_script)
+
+    async def snapshot(self, previous_responses: int = 0) -> dict[str, Any]:
+        """
+        Reads the state of the chat from the page in a single call.
+
+        Args:
+            previous_responses (int, optional): The responses on the page before sending, as in `wait_for_response`.
+
+        Returns:
+            dict[str, Any]: "input_ready", "send_found", "send_enabled", "streaming", "state", "responses",
+                "last_response", "code_blocks" and "attachments", see `runtime_script`.
+        """
+        await self.install_runtime()
+        arg = [type(self).__name__, previous_responses]
+        snapshot = await self.page.evaluate(SNAPSHOT, arg)
+        if snapshot is None:
+            # The document was loaded before the runtime was added
+            await self.page.evaluate(self.get_runtime_script())
+            snapshot = await self.page.evaluate(SNAPSHOT, arg)
+        return snapshot
+
+    async def wait_until_ready(self, timeout: float = 30) -> None:
+        """
+        Waits until a freshly loaded page accepts a message, instead of sleeping for a fixed time.
+
+        Args:
+            timeout (float, optional): Seconds to wait at most. Defaults to 30.
+        """
+        await self.install_runtime()
+        await self.wait_for_state(INPUT_READY, timeout, type(self).__name__)
+
+    async def read_copied(self, copy: Callable[[], Awaitable[Any]], timeout: float = 5) -> str:
+        """
+        Runs a copy action of the page and returns the copied text, without touching the system clipboard.
+
+        The page's clipboard API and copy events are intercepted in the page itself, so any number of pages can copy
+        at the same time without reading each other's text.
+
+        Args:
+            copy (Callable): Triggers the copy, e.g. the click of a copy button.
+            timeout (float, optional): Seconds to wait for the copied text. Defaults to 5.
+
+        Returns:
+            str: The copied text.
+
+        Raises:
+            ValueError: If the page copied nothing in time.
+        """
+        await self.page.evaluate(CAPTURE_CLIPBOARD)
+        await copy()
+        try:
+            return await self.wait_for_state(COPIED_TEXT, timeout)
+        except TimeoutError:
+            raise ValueError("No response found")
+
+    async def handle_response_state(self, state: str) -> bool:
+        """
+        Acts on a state reported by `response_state_script`.
+
+        Returns:
+            bool: Whether the response is complete.
+        """
+        return state == "done"
+
+    async def wait_for_state(self, predicate: str, timeout: Optional[float] = None, arg: Any = None) -> str:
+        """
+        Waits until an in-page predicate reports a state, re-checking it whenever the DOM changes.
+
+        Args:
+            predicate (str): A JavaScript function expression returning a state string, e.g. "done", or a falsy
+                value while the page has nothing to report.
+            timeout (float, optional): Seconds to wait at most. Defaults to `config.response_timeout`.
+            arg (Any, optional): Passed to the predicate.
+
+        Returns:
+            str: The state reported by the predicate.
+
+        Raises:
+            TimeoutError: If the predicate reported nothing in time.
+        """
+        timeout = timeout if timeout is not None else self.config.response_timeout
+        deadline = time.monotonic() + timeout
+        script = wait_for_state_script(predicate)
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                state = await self.page.evaluate(script, [min(remaining, 30) * 1000, arg])
+            except Error:
+                if self.page.is_closed():
+                    raise
+                # The page navigated while waiting, check again in the new document
+                await self.page.wait_for_timeout(500)
+                continue
+            if state:
+                return state
+        raise TimeoutError(f"No response within {timeout:.0f} seconds")
+
+    @abstractmethod
+    async def stop_generation(self):
+        """
+        Stops the response that is being generated, if any.
         """
         pass
 
@@ -1,75 +1,100 @@
 import json
-from pathlib import Path
-from typing import Literal, override
-from playwright.sync_api import Locator
+from typing import Literal, override, Optional, Union
+from playwright.sync_api import FilePayload, Locator
 from .base_async import BaseAsyncModel
-import pyperclip
+from ..utils.streams import parse_deep_seek_stream
+
+
+RESPONSE_STATE = r"""
+(previous) => {
+    const responses = document.querySelectorAll(".f9bf7997.d7dc56a8.c05b5566");
+    const last = responses[responses.length - 1];
+    if (responses.length <= previous || !document.querySelector(".f9bf7997.c05b5566")) {
+        return null;
+    }
+    return last.querySelectorAll(".ds-icon-button").length >= 4 ? "done" : null;
+}
+"""
+
+
+RESPONSE_TEXT = r"""
+(previous) => {
+    const responses = document.querySelectorAll(".f9bf7997.d7dc56a8.c05b5566");
+    if (responses.length <= previous) {
+        return null;
+    }
+    const blocks = responses[responses.length - 1].querySelectorAll(".ds-markdown.ds-markdown--block");
+    return blocks.length ? blocks[blocks.length - 1].innerText : null;
+}
+"""
+
+
+ATTACHMENTS_STATE = r"""
+(names) => {
+    const files = [...document.querySelectorAll(".f3a54b52")].map((file) => file.innerText.toLowerCase());
+    return names.every((name) => files.some((file) => file.includes(name.toLowerCase()))) ? "attached" : null;
+}
+"""
 
 
 class DeepSeekAsync(BaseAsyncModel):
     url: str = "https://chat.deepseek.com/"
+    response_selector: str = ".f9bf7997.d7dc56a8.c05b5566"
+    stream_url: str = r"/api/v0/chat/completion"
+    response_state_script: str = RESPONSE_STATE
+    response_text_script: str = RESPONSE_TEXT
+    attachments_state_script: str = ATTACHMENTS_STATE
+    runtime_selectors: dict[str, str] = {"input": 'textarea[id="chat-input"]', "send": '.f6d670[role="button"]'}
 
     @override
     async def get_input_field(self) -> Locator:
-        input_field = self.page.locator('textarea[id="chat-input"]')
-        if await input_field.count() > 0:
-            return input_field.first
-        raise ValueError("Input field not found")
+        if not (await self.snapshot())["input_ready"]:
+            raise ValueError("Input field not found")
+        return self.page.locator(self.runtime_selectors["input"]).first
 
     @override
     async def get_submit_button(self) -> Locator:
-        send_button = self.page.locator('.f6d670[role="button"]')
-        if await send_button.count() > 0:
-            return send_button.first
-
-        raise ValueError("Submit button not found")
+        if not (await self.snapshot())["send_found"]:
+            raise ValueError("Submit button not found")
+        return self.page.locator(self.runtime_selectors["send"]).first
 
     @override
     async def get_text_response(self):
-        if await self.page.locator(".f9bf7997.d7dc56a8.c05b5566").count() <= 0:
-            raise ValueError("No response found")
-
-        response = await self.page.locator(
-            ".f9bf7997.d7dc56a8.c05b5566 .ds-markdown.ds-markdown--block"
-        ).last.inner_text()
-        if response == "":
+        response = (await self.snapshot())["last_response"]
+        if not response:
             raise ValueError("No response found")
 
         return response
 
     @override
     async def get_code_block_response(self) -> str:
-        if await self.page.locator(".f9bf7997.d7dc56a8.c05b5566").count() <= 0:
-            raise ValueError("No response found")
-
-        last_response = self.page.locator(".f9bf7997.d7dc56a8.c05b5566").last
-        copy_button = last_response.locator(".ds-markdown-code-copy-button")
-        if await copy_button.count() <= 0:
-            raise ValueError("Copy button not found")
-
-        pyperclip.copy("")
-        await copy_button.click()
-        result = pyperclip.paste()
-
-        if result == "":
+        snapshot = await self.snapshot()
+        if snapshot["responses"] <= 0:
             raise ValueError("No response found")
+        if not snapshot["code_blocks"]:
+            raise ValueError("Code block not found")
 
-        return result
+        return snapshot["code_blocks"][-1]
 
     @override
     async def get_image_response(self) -> str:
         pass
 
     @override
-    async def chat(
+    async def prepare_message(
         self,
         message: str,
         expected_result: Literal["text", "image", "code", "json"] = "text",
         tools: list[Literal["search", "deep_think"]] = [],
-    ) -> str:
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> None:
         if "deepseek" not in self.page.url.lower():
+            await self.install_runtime()
             await self.page.goto(self.url)
-            await self.page.wait_for_timeout(3000)
+            await self.wait_until_ready()
+
+        message, attachments = self.route_message(message, attachments)
+        await self.attach_files(attachments)
 
         if expected_result == "code" or expected_result == "json":
             if "return in code block" not in message.lower():
@@ -77,46 +102,52 @@ class DeepSeekAsync(BaseAsyncModel):
 
         await self.fill_message(message)
         await self.activate_tools(tools)
+
+    @override
+    async def chat(
+        self,
+        message: str,
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        tools: list[Literal["search", "deep_think"]] = [],
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> str:
+        await self.prepare_message(message, expected_result, tools, attachments=attachments)
         submit_button = await self.get_submit_button()
-        await submit_button.click()
+        previous_responses = await self.count_responses()
+        if self.config.response_capture and expected_result != "image":
+            captured = await self.submit_and_capture(submit_button)
+            if captured is not None:
+                return self.format_captured(captured, expected_result)
+        else:
+            await submit_button.click()
 
-        await self.wait_for_response()
+        await self.wait_for_response(previous_responses)
         if expected_result == "code" or expected_result == "json":
             return await self.get_code_block_response()
         else:
-            return await self.get_text_response()
+            return self.strip_instruction_echo(await self.get_text_response())
 
     @override
-    async def attach_file(self, file_path: str):
-        path = Path(file_path)
-        file_name = path.name
-        file_input = self.page.locator('input[type="file"]')
-        await file_input.set_input_files(file_path)
-        await self.page.wait_for_timeout(3000)
-        if await self.page.locator(".f3a54b52").count() <= 0:
-            raise ValueError("File could not be attached")
-
-        if (
-            next(
-                (x for x in await self.page.locator(".f3a54b52").all_inner_texts() if file_name.lower() in x.lower()),
-                None,
-            )
-            is None
-        ):
-            raise ValueError("File could not be attached")
+    async def get_file_input(self) -> Locator:
+        return self.page.locator('input[type="file"]')
 
     @override
-    async def wait_for_response(self):
-        await self.page.wait_for_timeout(3000)
-
-        if await self.page.locator(".f9bf7997.d7dc56a8.c05b5566").count() <= 0:
-            return await self.wait_for_response()
+    def parse_stream(self, body: str) -> Optional[str]:
+        return parse_deep_seek_stream(body)
 
-        if await self.page.locator(".f9bf7997.c05b5566").count() <= 0:
-            return await self.wait_for_response()
+    @override
+    async def wait_for_response(self, previous_responses: int = 0):
+        await self.wait_for_state(RESPONSE_STATE, arg=previous_responses)
 
-        if await self.page.locator(".f9bf7997.d7dc56a8.c05b5566").last.locator(".ds-icon-button").count() < 4:
-            return await self.wait_for_response()
+    @override
+    async def stop_generation(self):
+        responses = self.page.locator(".f9bf7997.d7dc56a8.c05b5566")
+        # The send button turns into the stop button while the last response is streaming
+        if await responses.count() <= 0 or await responses.last.locator(".ds-icon-button").count() >= 4:
+            return
+        send_button = self.page.locator('.f6d670[role="button"]')
+        if await send_button.count() > 0:
+            await send_button.first.click()
 
     @override
     async def handle_on_error(self, error: Exception):
@@ -124,13 +155,7 @@ class DeepSeekAsync(BaseAsyncModel):
 
     @override
     async def fill_message(self, message: str):
-        input_field = await self.get_input_field()
-        await input_field.fill("")
-        list_message = message.split("\n")
-        for message in list_message:
-            await input_field.type(message)
-            await input_field.press("Shift+Enter")
-        await self.page.wait_for_timeout(3000)
+        await self.paste_message(message)
 
     async def activate_tools(self, tools: list[Literal["search", "deep_think"]]):
         need_click_search = False
@@ -1,25 +1,60 @@
-from pathlib import Path
-from typing import Literal, override
-from playwright.async_api import Locator
+from typing import Literal, override, Optional, Union
+from playwright.async_api import FilePayload, Locator
 from .base_async import BaseAsyncModel
-import pyperclip
+from ..utils.streams import parse_gemini_stream
+
+
+RESPONSE_STATE = r"""
+(previous) => {
+    const responses = document.querySelectorAll("model-response");
+    const last = responses[responses.length - 1];
+    if (responses.length <= previous) {
+        return null;
+    }
+    return last.querySelector("sensitive-memories-banner") ? "done" : null;
+}
+"""
+
+
+RESPONSE_TEXT = r"""
+(previous) => {
+    const responses = document.querySelectorAll("model-response");
+    return responses.length > previous ? responses[responses.length - 1].innerText : null;
+}
+"""
+
+
+ATTACHMENTS_STATE = r"""
+(names) =>
+    names.every((name) => document.querySelector(`[data-test-id="file-name"][title="${CSS.escape(name)}"]`))
+        ? "attached"
+        : null
+"""
 
 
 class GeminiAsync(BaseAsyncModel):
     url: str = "https://gemini.google.com/u/3/app"
+    response_selector: str = "model-response"
+    stream_url: str = r"/StreamGenerate"
+    response_state_script: str = RESPONSE_STATE
+    response_text_script: str = RESPONSE_TEXT
+    attachments_state_script: str = ATTACHMENTS_STATE
+    runtime_selectors: dict[str, str] = {
+        "input": '[contenteditable="true"]',
+        "send": ".send-button:not(.stop)",
+        "stop": ".send-button.stop",
+    }
 
     @override
     async def get_input_field(self) -> Locator:
-        input_field = self.page.locator('[contenteditable="true"]')
-        if await input_field.count() > 0:
-            return input_field.first
-        raise ValueError("Input field not found")
+        if not (await self.snapshot())["input_ready"]:
+            raise ValueError("Input field not found")
+        return self.page.locator(self.runtime_selectors["input"]).first
 
     @override
     async def get_submit_button(self) -> Locator:
-        send_button = self.page.locator(".send-button")
-        if await send_button.count() > 0:
-            return send_button.first
+        if (await self.snapshot())["send_found"]:
+            return self.page.locator(self.runtime_selectors["send"]).first
 
         speech_button = self.page.locator("speech_dictation_mic_button")
         if await speech_button.count() > 0:
@@ -29,33 +64,21 @@ class GeminiAsync(BaseAsyncModel):
 
     @override
     async def get_text_response(self) -> str:
-        if await self.page.locator("model-response").count() <= 0:
-            raise ValueError("No response found")
-
-        response = await self.page.locator("model-response").last.inner_text()
-        if response == "":
+        response = (await self.snapshot())["last_response"]
+        if not response:
             raise ValueError("No response found")
 
         return response
 
     @override
     async def get_code_block_response(self) -> str:
-        if await self.page.locator("model-response").count() <= 0:
-            raise ValueError("No response found")
-
-        last_response = self.page.locator("model-response").last
-        copy_button = last_response.locator(".copy-button")
-        if await copy_button.count() <= 0:
-            raise ValueError("Copy button not found")
-
-        pyperclip.copy("")
-        await copy_button.click()
-        result = pyperclip.paste()
-
-        if result == "":
+        snapshot = await self.snapshot()
+        if snapshot["responses"] <= 0:
             raise ValueError("No response found")
+        if not snapshot["code_blocks"]:
+            raise ValueError("Code block not found")
 
-        return result
+        return snapshot["code_blocks"][-1]
 
     @override
     async def get_image_response(self) -> str:
@@ -78,36 +101,53 @@ class GeminiAsync(BaseAsyncModel):
         return src
 
     @override
-    async def chat(
+    async def prepare_message(
         self,
         message: str,
         expected_result: Literal["text", "image", "code", "json"] = "text",
-    ) -> str:
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> None:
         if "gemini" not in self.page.url.lower():
+            await self.install_runtime()
             await self.page.goto(self.url)
-            await self.page.wait_for_timeout(2000)
+            await self.wait_until_ready()
+
+        message, attachments = self.route_message(message, attachments)
+        await self.attach_files(attachments)
 
         if expected_result == "code" or expected_result == "json":
             if "return in code block" not in message.lower():
                 message += "\nReturn in code block."
 
         await self.fill_message(message)
+
+    @override
+    async def chat(
+        self,
+        message: str,
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> str:
+        await self.prepare_message(message, expected_result, attachments=attachments)
         submit_button = await self.get_submit_button()
-        await submit_button.click()
-        await self.wait_for_response()
+        previous_responses = await self.count_responses()
+        if self.config.response_capture and expected_result != "image":
+            captured = await self.submit_and_capture(submit_button)
+            if captured is not None:
+                return self.format_captured(captured, expected_result)
+        else:
+            await submit_button.click()
+        await self.wait_for_response(previous_responses)
 
         if expected_result == "image":
             return await self.get_image_response()
         elif expected_result == "code" or expected_result == "json":
             return await self.get_code_block_response()
         else:
-            return await self.get_text_response()
+            return self.strip_instruction_echo(await self.get_text_response())
 
     @override
-    async def attach_file(self, file_path: str):
-        path = Path(file_path)
-        file_name = path.name
-
+    async def get_file_input(self) -> Locator:
         if await self.page.locator('input[name="Filedata"]').count() <= 0:
 
             self.page.on("filechooser", lambda file_chooser: file_chooser)
@@ -120,22 +160,21 @@ class GeminiAsync(BaseAsyncModel):
                 raise ValueError("File uploader not found")
             await self.page.locator("#file-uploader-local").click()
 
-        file_input = self.page.locator('input[name="Filedata"]').first
-        await file_input.set_input_files(file_path)
-
-        await self.page.wait_for_timeout(2000)
-        if await self.page.locator(f'[data-test-id="file-name"][title="{file_name}"]').count() <= 0:
-            raise ValueError("File could not be attached")
+        return self.page.locator('input[name="Filedata"]').first
 
     @override
-    async def wait_for_response(self):
-        await self.page.wait_for_timeout(3000)
+    def parse_stream(self, body: str) -> Optional[str]:
+        return parse_gemini_stream(body)
 
-        if await self.page.locator("model-response").count() <= 0:
-            return await self.wait_for_response()
+    @override
+    async def wait_for_response(self, previous_responses: int = 0):
+        await self.wait_for_state(RESPONSE_STATE, arg=previous_responses)
 
-        if await self.page.locator("model-response").last.locator("sensitive-memories-banner").count() <= 0:
-            return await self.wait_for_response()
+    @override
+    async def stop_generation(self):
+        stop_button = self.page.locator(".send-button.stop")
+        if await stop_button.count() > 0:
+            await stop_button.first.click()
 
     @override
     async def handle_on_error(self, error: Exception):
@@ -143,11 +182,4 @@ class GeminiAsync(BaseAsyncModel):
 
     @override
     async def fill_message(self, message: str):
-        input_field = await self.get_input_field()
-        await input_field.fill("")
-        list_message = message.split("\n")
-        for message in list_message:
-            await input_field.type(message)
-            await input_field.press("Shift+Enter")
-
-        await self.page.wait_for_timeout(3000)
+        await self.paste_message(message)
@@ -1,34 +1,104 @@
-import asyncio
-from typing import Literal
+from typing import Literal, Optional, Union
 import re
-from datetime import datetime, timedelta
-from pathlib import Path
+import time
 
-import pyperclip
-from playwright.async_api import Locator
-from tenacity import retry, stop_after_attempt, wait_exponential
+from playwright.async_api import FilePayload, Locator
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 
 from ..enums import Platform, KeyboardCommand
 from ..utils.logger import get_logger
-from ..utils.common import clean_text
+from ..exceptions import QuotaExceededException
+from ..utils.common import clean_text, parse_reset_time
 from .base_async import BaseAsyncModel
+from ..utils.streams import parse_gpt_stream
 
 logger = get_logger(__name__)
 
 
+RESPONSE_STATE = r"""
+(previous) => {
+    const continueButton = [...document.querySelectorAll("button")].find((button) =>
+        button.textContent.includes("Continue generating")
+    );
+    if (continueButton) {
+        return "continue";
+    }
+
+    // Only ChatGPT's own notices count, never a conversation turn or the draft in the composer
+    const limit = /usage cap|(?:reached|hit) (?:the|our|your) (?:\w+ )*limit/i;
+    const notices = document.querySelectorAll('form, [role="alert"], [data-testid*="limit"], [class*="banner"]');
+    for (const notice of notices) {
+        if (notice.closest("article, [data-message-author-role]")) {
+            continue;
+        }
+        let text = notice.textContent;
+        const skipped = '[contenteditable="true"], textarea, article, [data-message-author-role]';
+        for (const element of notice.querySelectorAll(skipped)) {
+            text = text.replace(element.textContent, "");
+        }
+        if (limit.test(text)) {
+            return "limit";
+        }
+    }
+
+    const articles = document.querySelectorAll("article");
+    const last = articles[articles.length - 1];
+    if (articles.length <= previous) {
+        return null;
+    }
+    const labels = last.querySelectorAll(".sr-only");
+    if (labels.length && labels[labels.length - 1].textContent === "You said:") {
+        return null;
+    }
+    const copyButtons = last.querySelectorAll('[data-testid="copy-turn-action-button"]');
+    const copyButton = copyButtons[copyButtons.length - 1];
+    return copyButton && copyButton.getClientRects().length > 0 ? "done" : null;
+}
+"""
+
+
+RESPONSE_TEXT = r"""
+(previous) => {
+    const articles = document.querySelectorAll("article");
+    const last = articles[articles.length - 1];
+    if (articles.length <= previous || !last) {
+        return null;
+    }
+    const markdown = last.querySelectorAll(".markdown");
+    return markdown.length ? markdown[markdown.length - 1].innerText : null;
+}
+"""
+
+
+ATTACHMENTS_STATE = r"""
+(names) => {
+    const text = document.body.innerText;
+    return names.every((name) => text.includes(name)) ? "attached" : null;
+}
+"""
+
+
 class GPTAsync(BaseAsyncModel):
     url: str = "https://chatgpt.com"
+    response_selector: str = "article"
+    stream_url: str = r"/backend-api/(?:f/)?conversation(?:\?|$)"
+    response_state_script: str = RESPONSE_STATE
+    response_text_script: str = RESPONSE_TEXT
+    attachments_state_script: str = ATTACHMENTS_STATE
+    runtime_selectors: dict[str, str] = {
+        "input": "#prompt-textarea",
+        "send": '[data-testid="send-button"]',
+        "stop": '[data-testid="stop-button"]',
+    }
 
     async def get_input_field(self) -> Locator:
-        input_field = self.page.locator("#prompt-textarea")
-        if (await input_field.count()) > 0:
-            return input_field.first
-        raise ValueError("Input field not found")
+        if not (await self.snapshot())["input_ready"]:
+            raise ValueError("Input field not found")
+        return self.page.locator(self.runtime_selectors["input"]).first
 
     async def get_submit_button(self) -> Locator:
-        send_button = self.page.locator('[data-testid="send-button"]:not([disabled])')
-        if await send_button.count() > 0:
-            return send_button.first
+        if (await self.snapshot())["send_found"]:
+            return self.page.locator(self.runtime_selectors["send"]).first
 
         speech_button = self.page.locator('[data-testid="composer-speech-button"]')
         if await speech_button.count() > 0:
@@ -38,29 +108,16 @@ class GPTAsync(BaseAsyncModel):
 
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=4, max=15))
     async def get_text_response(self) -> str:
-        pyperclip.copy("")
         # await self.page.keyboard.press(self.get_key_board_shortcut(KeyboardCommand.CopyLastArticle))
         await self.page.wait_for_selector('[data-testid="copy-turn-action-button"]')
-        await self.page.locator('[data-testid="copy-turn-action-button"]').last.click(
-            force=True,
-            no_wait_after=True,
-        )
-        await self.page.wait_for_timeout(1000)
-
-        result = pyperclip.paste()
-        if result == "":
-            raise ValueError("No response found")
+        copy_button = self.page.locator('[data-testid="copy-turn-action-button"]').last
+        result = await self.read_copied(lambda: copy_button.click(force=True, no_wait_after=True))
         return clean_text(result)
 
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=4, max=15))
     async def get_code_block_response(self) -> str:
-        pyperclip.copy("")
-        await self.page.keyboard.press(self.get_key_board_shortcut(KeyboardCommand.CopyLastCode))
-        await self.page.wait_for_timeout(200)
-        result = pyperclip.paste()
-        if result == "":
-            raise ValueError("No response found")
-        return result
+        shortcut = self.get_key_board_shortcut(KeyboardCommand.CopyLastCode)
+        return await self.read_copied(lambda: self.page.keyboard.press(shortcut))
 
     async def get_image_response(self) -> str:
         src = await self.page.locator("article").last.locator("img").first.get_attribute("src")
@@ -68,81 +125,97 @@ class GPTAsync(BaseAsyncModel):
             raise Exception("Image generation failed")
         return src
 
-    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=4, max=15))
-    async def chat(
+    async def prepare_message(
         self,
         message: str,
         expected_result: Literal["text", "image", "code", "json"] = "text",
         tools: list[Literal["search_the_web"]] = [],
-    ) -> str:
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> None:
         if "gpt" not in self.page.url.lower():
+            await self.install_runtime()
             await self.page.goto(self.url)
-            await self.page.wait_for_timeout(3000)
+            await self.wait_until_ready()
+
+        message, attachments = self.route_message(message, attachments)
+        await self.attach_files(attachments)
 
         if expected_result == "code" or expected_result == "json":
             if "return in code block" not in message.lower():
                 message += "\nReturn in code block."
 
-        await self.get_input_field()
-        await self.get_submit_button()
         await self.fill_message(message)
         await self.activate_tools(tools)
 
+    @retry(
+        stop=stop_after_attempt(5),
+        wait=wait_exponential(multiplier=1, min=4, max=15),
+        retry=retry_if_not_exception_type(QuotaExceededException),
+    )
+    async def chat(
+        self,
+        message: str,
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        tools: list[Literal["search_the_web"]] = [],
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> str:
+        await self.prepare_message(message, expected_result, tools, attachments=attachments)
         submit_button = await self.get_submit_button()
-        await submit_button.click()
+        previous_responses = await self.count_responses()
+        if self.config.response_capture and expected_result != "image":
+            captured = await self.submit_and_capture(submit_button)
+            if captured is not None:
+                return self.format_captured(captured, expected_result)
+        else:
+            await submit_button.click()
 
-        await self.wait_for_response()
+        await self.wait_for_response(previous_responses)
 
         if expected_result == "image":
             return await self.get_image_response()
         elif expected_result == "code" or expected_result == "json":
             return await self.get_code_block_response()
         else:
-            return await self.get_text_response()
+            return self.strip_instruction_echo(await self.get_text_response())
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=15))
-    async def attach_file(self, file_path: str):
-        path = Path(file_path)
-        file_name = path.name
-        file_input = self.page.locator('input[type="file"]').first
-        await file_input.set_input_files(file_path)
-        await self.page.wait_for_timeout(3000)
+    async def get_file_input(self) -> Locator:
+        return self.page.locator('input[type="file"]').first
 
-        if Path(await file_input.input_value()).name != file_name:
-            raise ValueError("File could not be attached")
+    def parse_stream(self, body: str) -> Optional[str]:
+        return parse_gpt_stream(body)
 
-    async def wait_for_response(self):
-        await self.page.wait_for_timeout(3000)
+    async def wait_for_response(self, previous_responses: int = 0):
+        deadline = time.monotonic() + self.config.response_timeout
+        while True:
+            state = await self.wait_for_state(RESPONSE_STATE, deadline - time.monotonic(), previous_responses)
+            if await self.handle_response_state(state):
+                return
 
-        continue_btn = self.page.locator("text=Continue generating")
-        if await continue_btn.count() > 0:
-            await continue_btn.click()
+    async def handle_response_state(self, state: str) -> bool:
+        if state == "continue":
+            await self.page.locator("text=Continue generating").first.click()
             logger.info("Continuing generation...")
-            return await self.wait_for_response()
-
-        articles = self.page.locator("article").last
-        if await articles.count() <= 0:
-            return await self.wait_for_response()
-
-        copy_btn = self.page.locator('[data-testid="copy-turn-action-button"]')
-        if await copy_btn.count() <= 0:
-            return await self.wait_for_response()
-
-        last_article = articles.last
-        if await last_article.locator(".sr-only").last.text_content() == "You said:":
-            return await self.wait_for_response()
+            return False
+        if state == "limit":
+            await self.handle_on_error()
+        return state == "done"
 
-        if await last_article.locator('[data-testid="copy-turn-action-button"]').count() <= 0:
-            return await self.wait_for_response()
+    async def stop_generation(self):
+        stop_button = self.page.locator('[data-testid="stop-button"]')
+        if await stop_button.count() > 0:
+            await stop_button.first.click()
 
     async def handle_on_error(self):
+        """Raises `QuotaExceededException` with the reset time shown on the page, instead of waiting for it."""
         await self.page.reload()
         time_element = self.page.locator(r"text=/[0-9]{1,2}:[0-9]{2}\s(?:AM|PM)/")
 
+        reset_at = time.time() + self.config.quota_window
         if await time_element.count() > 0:
-            text = await time_element.inner_text()
+            text = await time_element.first.inner_text()
             time_reset = re.search(r"([0-9]{1,2}:[0-9]{2}\s(?:AM|PM))", text).group(1)
-            await self.sleep_until_time(time_reset)
+            reset_at = parse_reset_time(time_reset).timestamp()
+        raise QuotaExceededException("gpt", reset_at)
 
     def get_key_board_shortcut(self, command: KeyboardCommand) -> str:
         MACOS = {
@@ -167,28 +240,3 @@ class GPTAsync(BaseAsyncModel):
             search_btn = self.page.locator('[aria-label="Search the web"][aria-pressed="false"]')
             if await search_btn.count() > 0:
                 await search_btn.first.click()
-
-    async def sleep_until_time(self, time_str: str):
-        """Sleep until specified time"""
-        now = datetime.now()
-        time_format = "%I:%M %p"
-        reset_datetime = datetime.strptime(time_str, time_format)
-
-        reset_datetime = now.replace(
-            hour=reset_datetime.time().hour,
-            minute=reset_datetime.time().minute,
-            second=0,
-            microsecond=0,
-        )
-
-        if reset_datetime.time() < now.time():
-            reset_datetime += timedelta(days=1)
-
-        reset_datetime += timedelta(minutes=5)
-
-        sleep_time = (reset_datetime - now).total_seconds()
-        if sleep_time < 0:
-            sleep_time = -sleep_time
-
-        logger.info(f"Waiting {sleep_time} seconds for limit reset")
-        await self.page.wait_for_timeout(sleep_time * 1000)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncGenerator, Awaitable, Callable, Optional
+
+from playwright.async_api import Page
+
+from .config import Config
+from .utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from .models_async.base_async import BaseAsyncModel
+
+logger = get_logger(__name__)
+
+
+class PagePool:
+    """
+    Keeps pre-navigated tabs per provider so that `model_async` can start typing right away.
+
+    Pages are checked out with `page(model)` and handed back when the block exits. Returned pages are navigated
+    back to the provider in the background before they are reused, idle pages older than `page_pool_idle_ttl`
+    are closed and every provider that was used once is refilled up to `page_pool_min_size` ready tabs.
+    """
+
+    new_page: Callable[[], Awaitable[Page]]
+    config: Config
+    urls: dict[str, str]
+    new_model: Optional[Callable[[str, Page, str], BaseAsyncModel]]
+
+    def __init__(
+        self,
+        new_page: Callable[[], Awaitable[Page]],
+        config: Config,
+        urls: dict[str, str],
+        new_model: Optional[Callable[[str, Page, str], BaseAsyncModel]] = None,
+    ):
+        """
+        Args:
+            new_page (Callable[[], Awaitable[Page]]): Opens a new tab, e.g. `context.new_page`.
+            config (Config): The config holding the pool sizes and idle TTL.
+            urls (dict[str, str]): The start page of every provider the pool serves.
+            new_model (Callable[[str, Page, str], BaseAsyncModel], optional): Builds the provider's model for a page
+                and address, so a navigated page is only pooled once it accepts a message. Without it, pages are
+                pooled as soon as they loaded.
+        """
+        self.new_page = new_page
+        self.config = config
+        self.urls = urls
+        self.new_model = new_model
+        self._idle: dict[str, list[tuple[Page, float]]] = {model: [] for model in urls}
+        self._pending: dict[str, int] = {model: 0 for model in urls}
+        self._preparing: set[Page] = set()
+        self._refill_tasks: dict[str, asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def start(self, models: Optional[list[str]] = None) -> None:
+        """
+        Starts the idle eviction loop and warms up the given providers in the background.
+
+        Args:
+            models (list[str], optional): Providers to fill up to the minimum size right away.
+        """
+        if self._maintenance_task is None:
+            self._maintenance_task = asyncio.create_task(self._maintain())
+        for model in models or []:
+            self._schedule_refill(model)
+
+    @asynccontextmanager
+    async def page(self, model: str) -> AsyncGenerator[Page, None]:
+        """
+        Checks out a ready page for the provider and returns it to the pool on exit.
+
+        Args:
+            model (str): The provider name, e.g. "gpt".
+        """
+        page = await self.checkout(model)
+        try:
+            yield page
+        finally:
+            await self.checkin(model, page)
+
+    async def checkout(self, model: str) -> Page:
+        """
+        Takes a ready page from the pool, or opens and navigates a new one if none is idle.
+
+        Args:
+            model (str): The provider name, e.g. "gpt".
+        """
+        self.evict_idle()
+        page: Optional[Page] = None
+        while self._idle[model]:
+            candidate, _ = self._idle[model].pop()
+            if not candidate.is_closed():
+                page = candidate
+                break
+
+        if page is None:
+            page = await self.new_page()
+            try:
+                await self._navigate(page, model)
+            except BaseException:
+                await page.close()
+                raise
+
+        self._schedule_refill(model)
+        return page
+
+    async def checkin(self, model: str, page: Page) -> None:
+        """
+        Hands a page back to the pool. The page is reset to the provider in the background.
+
+        Args:
+            model (str): The provider name, e.g. "gpt".
+            page (Page): The page returned by `checkout`.
+        """
+        if page.is_closed():
+            return
+        if self._closed or self._size(model) >= self.config.page_pool_max_size:
+            await page.close()
+            return
+
+        self._pending[model] += 1
+        self._preparing.add(page)
+        self._spawn(self._recycle(model, page))
+
+    def evict_idle(self) -> None:
+        """
+        Closes pages that stayed idle longer than `page_pool_idle_ttl`, keeping at least the minimum size.
+        """
+        deadline = time.monotonic() - self.config.page_pool_idle_ttl
+        for model, idle in self._idle.items():
+            while idle and idle[0][1] < deadline and self._size(model) > self.config.page_pool_min_size:
+                page, _ = idle.pop(0)
+                self._spawn(page.close())
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Returns the number of idle and pending pages per provider.
+        """
+        return {model: {"idle": len(self._idle[model]), "pending": self._pending[model]} for model in self.urls}
+
+    async def close(self) -> None:
+        """
+        Stops the background work and closes every page held by the pool.
+        """
+        self._closed = True
+        preparing = list(self._preparing)
+        tasks = [*self._tasks, *self._refill_tasks.values()]
+        if self._maintenance_task is not None:
+            tasks.append(self._maintenance_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        pages = [*preparing, *(page for idle in self._idle.values() for page, _ in idle)]
+        self._preparing.clear()
+        for idle in self._idle.values():
+            idle.clear()
+        for page in pages:
+            if not page.is_closed():
+                await page.close()
+
+    def _size(self, model: str) -> int:
+        return len(self._idle[model]) + self._pending[model]
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _schedule_refill(self, model: str) -> None:
+        if self._closed or self._size(model) >= self.config.page_pool_min_size:
+            return
+        task = self._refill_tasks.get(model)
+        if task is None or task.done():
+            self._refill_tasks[model] = asyncio.create_task(self._refill(model))
+
+    async def _refill(self, model: str) -> None:
+        while not self._closed and self._size(model) < self.config.page_pool_min_size:
+            self._pending[model] += 1
+            page: Optional[Page] = None
+            try:
+                page = await self.new_page()
+                self._preparing.add(page)
+                await self._navigate(page, model)
+                self._idle[model].append((page, time.monotonic()))
+            except Exception as e:
+                logger.warning(f"Could not prepare a {model} page: {e}")
+                if page is not None and not page.is_closed():
+                    await page.close()
+                return
+            finally:
+                self._pending[model] -= 1
+                self._preparing.discard(page)
+
+    async def _recycle(self, model: str, page: Page) -> None:
+        try:
+            await self._navigate(page, model)
+            self._idle[model].append((page, time.monotonic()))
+        except Exception as e:
+            logger.warning(f"Could not reset a {model} page: {e}")
+            if not page.is_closed():
+                await page.close()
+        finally:
+            self._pending[model] -= 1
+            self._preparing.discard(page)
+
+    async def _navigate(self, page: Page, model: str) -> None:
+        if self.new_model is None:
+            await page.goto(self.urls[model])
+            return
+        instance = self.new_model(model, page, self.urls[model])
+        await instance.install_runtime()
+        await page.goto(self.urls[model])
+        await instance.wait_until_ready()
+
+    async def _maintain(self) -> None:
+        interval = max(1.0, min(self.config.page_pool_idle_ttl / 2, 30.0))
+        while not self._closed:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+            for model in self.urls:
+                if self._refill_tasks.get(model) is not None:
+                    self._schedule_refill(model)
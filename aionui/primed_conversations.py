@@ -0,0 +1,81 @@
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from .utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PrimedConversations:
+    """
+    Keeps conversations of one provider that already received the instructions, so `new_conversation` only has to
+    open one instead of waiting for the instructions to be answered.
+
+    The providers cannot branch a conversation, so every primed conversation is handed out once. `start` fills the
+    pool in the background and every `take` refills it, one conversation at a time, up to `size` ready ones.
+    """
+
+    prime: Callable[[], Awaitable[str]]
+    size: int
+
+    def __init__(self, prime: Callable[[], Awaitable[str]], size: int):
+        """
+        Args:
+            prime (Callable[[], Awaitable[str]]): Starts a conversation in a page of its own, sends the instructions
+                and returns the address of the conversation.
+            size (int): The number of primed conversations to keep ready.
+        """
+        self.prime = prime
+        self.size = size
+        self._urls: deque[str] = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def start(self) -> None:
+        """
+        Starts filling the pool in the background, so the first `take` can already find a primed conversation.
+        """
+        self._schedule_refill()
+
+    def take(self) -> Optional[str]:
+        """
+        Takes the address of a primed conversation and refills the pool in the background.
+
+        Returns:
+            Optional[str]: The address, None if no primed conversation is ready yet.
+        """
+        url = self._urls.popleft() if self._urls else None
+        self._schedule_refill()
+        return url
+
+    def ready(self) -> int:
+        """
+        Gets the number of primed conversations ready to be taken.
+        """
+        return len(self._urls)
+
+    async def close(self) -> None:
+        """
+        Stops refilling and forgets the primed conversations.
+        """
+        self._closed = True
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            await asyncio.gather(self._refill_task, return_exceptions=True)
+            self._refill_task = None
+        self._urls.clear()
+
+    def _schedule_refill(self) -> None:
+        if self._closed or len(self._urls) >= self.size:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self) -> None:
+        while not self._closed and len(self._urls) < self.size:
+            try:
+                self._urls.append(await self.prime())
+            except Exception as e:
+                logger.warning(f"Could not prime a conversation: {e}")
+                return
@@ -0,0 +1,168 @@
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .config import Config
+from .utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class QuotaManager:
+    """
+    Counts messages per provider and account in a rolling window and parks accounts that hit a limit.
+
+    The counts and parked accounts are kept in `quota_state_file`, so a new run knows what earlier runs used. Every
+    save merges what other processes wrote in the meantime, under a lock file next to the state file.
+    Nothing waits for a reset here: callers ask `wait_time` and send their work elsewhere until it is 0.
+    """
+
+    config: Config
+    state_file: str
+
+    def __init__(self, config: Config, state_file: Optional[str] = None):
+        """
+        Args:
+            config (Config): The config holding `quota_limits` and `quota_window`.
+            state_file (str, optional): Where to persist the counts. Defaults to `config.get_quota_state_file()`.
+        """
+        self.config = config
+        self.state_file = state_file or config.get_quota_state_file()
+        self._sent: dict[str, list[float]] = {}
+        self._parked: dict[str, float] = {}
+        self._load()
+
+    def record(self, model: str, account: str = "default") -> None:
+        """
+        Counts a message sent from the account.
+
+        Args:
+            model (str): The provider name, e.g. "gpt".
+            account (str, optional): The account the message was sent from. Defaults to "default".
+        """
+        key = self._key(model, account)
+        self._sent[key] = [*self._recent(key), time.time()]
+        self._save()
+
+    def park(self, model: str, reset_at: float, account: str = "default") -> None:
+        """
+        Marks the account as unusable for the provider until the limit resets.
+
+        Args:
+            model (str): The provider name, e.g. "gpt".
+            reset_at (float): Unix timestamp at which the limit resets.
+            account (str, optional): The account that hit the limit. Defaults to "default".
+        """
+        key = self._key(model, account)
+        self._parked[key] = max(reset_at, self._parked.get(key, 0.0))
+        logger.info(f"Parked {key} for {max(0.0, reset_at - time.time()):.0f} seconds")
+        self._save()
+
+    def parked_until(self, model: str, account: str = "default") -> Optional[float]:
+        """
+        Gets the reset timestamp of a parked account, None if it is not parked.
+        """
+        reset_at = self._parked.get(self._key(model, account))
+        if reset_at is None or reset_at <= time.time():
+            return None
+        return reset_at
+
+    def usage(self, model: str, account: str = "default") -> int:
+        """
+        Gets the number of messages sent from the account within the window.
+        """
+        return len(self._recent(self._key(model, account)))
+
+    def wait_time(self, model: str, account: str = "default") -> float:
+        """
+        Gets the seconds until the account can send the next message, 0 if it can send right away.
+        """
+        now = time.time()
+        wait = max(0.0, (self.parked_until(model, account) or now) - now)
+        limit = self.config.quota_limits.get(model)
+        if limit is not None:
+            sent = self._recent(self._key(model, account))
+            if len(sent) >= limit:
+                wait = max(wait, sent[len(sent) - limit] + self.config.quota_window - now)
+        return wait
+
+    def available(self, model: str, account: str = "default") -> bool:
+        """
+        Checks whether the account can send a message to the provider right now.
+        """
+        return self.wait_time(model, account) <= 0
+
+    def _key(self, model: str, account: str) -> str:
+        return f"{model}/{account}"
+
+    def _recent(self, key: str) -> list[float]:
+        start = time.time() - self.config.quota_window
+        return [sent_at for sent_at in self._sent.get(key, []) if sent_at > start]
+
+    def _load(self) -> None:
+        self._sent, self._parked = self._read()
+
+    def _read(self) -> tuple[dict[str, list[float]], dict[str, float]]:
+        try:
+            with open(self.state_file, "r") as file:
+                state = json.load(file)
+            sent = {key: [float(sent_at) for sent_at in sent] for key, sent in state.get("sent", {}).items()}
+            parked = {key: float(reset_at) for key, reset_at in state.get("parked", {}).items()}
+            return sent, parked
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable quota state {self.state_file}: {e}")
+        return {}, {}
+
+    def _merge(self, sent: dict[str, list[float]], parked: dict[str, float]) -> None:
+        for key, timestamps in sent.items():
+            self._sent[key] = sorted({*self._sent.get(key, []), *timestamps})
+        for key, reset_at in parked.items():
+            self._parked[key] = max(reset_at, self._parked.get(key, 0.0))
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(f"{self.state_file}.lock", "a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _save(self) -> None:
+        try:
+            with self._locked():
+                self._merge(*self._read())
+                now = time.time()
+                state = {
+                    "sent": {key: sent for key in self._sent if (sent := self._recent(key))},
+                    "parked": {key: reset_at for key, reset_at in self._parked.items() if reset_at > now},
+                }
+                directory, name = os.path.split(os.path.abspath(self.state_file))
+                with tempfile.NamedTemporaryFile("w", dir=directory, prefix=f"{name}.", delete=False) as file:
+                    json.dump(state, file)
+                try:
+                    os.replace(file.name, self.state_file)
+                except OSError:
+                    os.unlink(file.name)
+                    raise
+        except OSError as e:
+            logger.warning(f"Could not save quota state to {self.state_file}: {e}")
@@ -0,0 +1,189 @@
+import functools
+import inspect
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Union
+
+from playwright.sync_api import FilePayload
+
+from .config import Config
+from .utils.common import chat_key
+
+
+class ResponseCache:
+    """
+    Keeps chat responses by provider, message, expected result, tools and attachment contents.
+
+    Lookups go to an in-memory LRU first and then to a SQLite database in WAL mode, which several processes can share.
+    Entries expire after `response_cache_ttl` seconds, and the least recently used ones are evicted above
+    `response_cache_max_entries`.
+
+    A cached response is returned without sending anything, so the conversation on the page does not get that turn:
+    cache prompts that stand on their own.
+    """
+
+    config: Config
+    path: str
+    hits: int
+    misses: int
+
+    def __init__(self, config: Config, path: Optional[str] = None):
+        """
+        Args:
+            config (Config): The config holding the `response_cache_*` settings.
+            path (str, optional): The SQLite database file. Defaults to `config.get_response_cache_file()`.
+        """
+        self.config = config
+        self.path = path or config.get_response_cache_file()
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def key(
+        self,
+        model: str,
+        message: str,
+        expected_result: str = "text",
+        tools: list[str] = [],
+        attachments: list[Union[str, FilePayload]] = [],
+    ) -> str:
+        """
+        Builds the cache key of a chat.
+
+        The message is compared with its whitespace collapsed, and attachments by the hash of their contents, so a
+        regenerated file with the same contents hits the cache.
+        """
+        return chat_key(model, message, expected_result, tools, attachments)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Gets a cached response, None if there is none or it expired.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[1], now):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            row = self._db.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or self._expired(row[1], now):
+                self._memory.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._remember(key, row[0], row[1])
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, response: str) -> None:
+        """
+        Caches a response, evicting expired and least recently used entries.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._remember(key, response, now)
+            self._evict(now)
+
+    def clear(self) -> None:
+        """
+        Removes every cached response.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """
+        Closes the database.
+        """
+        with self._lock:
+            self._db.close()
+
+    def wrap(self, chat: Callable[..., Any], model: str) -> Callable[..., Any]:
+        """
+        Wraps the `chat` method of a model so it answers from the cache when it can.
+
+        Image responses are not cached, their URLs expire.
+
+        Args:
+            chat (Callable): The bound `chat` method, sync or async.
+            model (str): The provider name, e.g. "gpt".
+        """
+        signature = inspect.signature(chat)
+
+        def cache_key(args: tuple, kwargs: dict) -> Optional[str]:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            if arguments.get("expected_result") == "image":
+                return None
+            return self.key(
+                model,
+                arguments["message"],
+                arguments.get("expected_result", "text"),
+                arguments.get("tools", []),
+                arguments.get("attachments", []),
+            )
+
+        if inspect.iscoroutinefunction(chat):
+
+            @functools.wraps(chat)
+            async def cached_chat_async(*args: Any, **kwargs: Any) -> str:
+                key = cache_key(args, kwargs)
+                if key is not None and (response := self.get(key)) is not None:
+                    return response
+                response = await chat(*args, **kwargs)
+                if key is not None:
+                    self.set(key, response)
+                return response
+
+            return cached_chat_async
+
+        @functools.wraps(chat)
+        def cached_chat(*args: Any, **kwargs: Any) -> str:
+            key = cache_key(args, kwargs)
+            if key is not None and (response := self.get(key)) is not None:
+                return response
+            response = chat(*args, **kwargs)
+            if key is not None:
+                self.set(key, response)
+            return response
+
+        return cached_chat
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        ttl = self.config.response_cache_ttl
+        return ttl is not None and created_at + ttl <= now
+
+    def _remember(self, key: str, response: str, created_at: float) -> None:
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.response_cache_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float) -> None:
+        ttl = self.config.response_cache_ttl
+        if ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created_at <= ?", (now - ttl,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY accessed_at DESC LIMIT ?)",
+            (self.config.response_cache_max_entries,),
+        )
@@ -0,0 +1,245 @@
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any, Literal, Optional
+
+from .exceptions import QuotaExceededException
+from .quota import QuotaManager
+from .utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from .aionui import AiOnUi
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _Job:
+    model: str
+    message: str
+    expected_result: str
+    kwargs: dict[str, Any]
+    tenant: str
+    priority: int
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+    task: Optional[asyncio.Task] = None
+    account: Optional[str] = None
+
+
+class ChatScheduler:
+    """
+    Queues chat jobs in front of `AiOnUi.model_async` with per-provider concurrency limits.
+
+    Jobs with a lower `priority` value run first. Among jobs of the same priority, tenants share a provider by
+    weighted fair queuing: each job gets a virtual finish time of `1 / weight` after its tenant's previous job,
+    so a tenant submitting a large batch cannot starve the others.
+
+    With a `QuotaManager`, jobs are only dispatched to accounts that are neither over their rolling quota nor
+    parked after hitting a limit, and a provider with no such account waits until one can send again. Jobs that
+    hit the limit are queued again instead of failing.
+    """
+
+    aionui: "AiOnUi"
+    limits: dict[str, int]
+    weights: dict[str, float]
+    quota: Optional[QuotaManager]
+
+    def __init__(
+        self,
+        aionui: "AiOnUi",
+        limits: Optional[dict[str, int]] = None,
+        weights: Optional[dict[str, float]] = None,
+        quota: Optional[QuotaManager] = None,
+    ):
+        """
+        Args:
+            aionui (AiOnUi): The instance providing the pages, ideally with a started session.
+            limits (dict[str, int], optional): Maximum pages in flight per provider.
+                Defaults to `config.provider_concurrency`.
+            weights (dict[str, float], optional): Share of every tenant, tenants not listed weigh 1.
+            quota (QuotaManager, optional): Counts the sent messages and parks providers that hit their limit.
+        """
+        self.aionui = aionui
+        self.limits = limits if limits is not None else dict(aionui.config.provider_concurrency)
+        self.weights = weights or {}
+        self.quota = quota
+        self._queues: dict[str, list[tuple[int, float, int, _Job]]] = {}
+        self._virtual_time: dict[str, float] = {}
+        self._tenant_tags: dict[tuple[str, str], float] = {}
+        self._in_flight: dict[str, int] = {}
+        self._completed: dict[str, int] = {}
+        self._total_wait: dict[str, float] = {}
+        self._sequence = itertools.count()
+        self._running: set[asyncio.Task] = set()
+        self._wake_ups: dict[str, asyncio.TimerHandle] = {}
+        self._closed = False
+
+    async def submit(
+        self,
+        message: str,
+        model: Literal["gpt", "claude", "gemini", "deep_seek"] = "gpt",
+        expected_result: Literal["text", "image", "code", "json"] = "text",
+        priority: int = 0,
+        tenant: str = "default",
+        **kwargs: Any,
+    ) -> str:
+        """
+        Queues a chat and waits for its response.
+
+        Args:
+            message (str): The message to send.
+            model (Literal["gpt", "claude", "gemini", "deep_seek"], optional): The provider. Defaults to "gpt".
+            expected_result (Literal["text", "image", "code", "json"], optional): Passed to `chat`.
+            priority (int, optional): Lower values run first. Defaults to 0.
+            tenant (str, optional): Who the job is run for, used for fair queuing. Defaults to "default".
+            **kwargs: Passed to `chat`, e.g. `tools`.
+
+        Returns:
+            str: The response of the model, shared with identical jobs in flight (see `AiOnUi.coalesce`).
+        """
+        if self._closed:
+            raise RuntimeError("Scheduler is closed")
+
+        send = partial(self._submit, message, model, expected_result, priority, tenant, kwargs)
+        return await self.aionui.coalesce(send, model, message, expected_result, **kwargs)
+
+    async def _submit(
+        self, message: str, model: str, expected_result: str, priority: int, tenant: str, kwargs: dict[str, Any]
+    ) -> str:
+        job = _Job(
+            model, message, expected_result, kwargs, tenant, priority, asyncio.get_running_loop().create_future()
+        )
+        tag = max(self._virtual_time.get(model, 0.0), self._tenant_tags.get((model, tenant), 0.0))
+        tag += 1 / self.weights.get(tenant, 1.0)
+        self._tenant_tags[(model, tenant)] = tag
+        heapq.heappush(self._queues.setdefault(model, []), (priority, tag, next(self._sequence), job))
+        self._dispatch(model)
+
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            job.future.cancel()
+            if job.task is not None:
+                job.task.cancel()
+            raise
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Returns the queue depth, pages in flight, limit, completed jobs, wait times, quota wait and coalesced chats
+        per provider.
+        """
+        now = time.monotonic()
+        stats = {}
+        for model in {*self.limits, *self._queues, *self._in_flight}:
+            waiting = [job for *_, job in self._queues.get(model, []) if not job.future.done()]
+            completed = self._completed.get(model, 0)
+            stats[model] = {
+                "queued": len(waiting),
+                "in_flight": self._in_flight.get(model, 0),
+                "limit": self._limit(model),
+                "completed": completed,
+                "average_wait": self._total_wait.get(model, 0.0) / completed if completed else 0.0,
+                "oldest_wait": max((now - job.enqueued_at for job in waiting), default=0.0),
+                "quota_wait": self._quota_wait(model),
+                "coalesced": self.aionui.single_flight.coalesced.get(model, 0),
+            }
+        return stats
+
+    async def close(self) -> None:
+        """
+        Cancels the queued jobs and waits for the running ones.
+        """
+        self._closed = True
+        for handle in self._wake_ups.values():
+            handle.cancel()
+        self._wake_ups.clear()
+        for queue in self._queues.values():
+            for *_, job in queue:
+                job.future.cancel()
+            queue.clear()
+        await asyncio.gather(*self._running, return_exceptions=True)
+
+    def _limit(self, model: str) -> int:
+        return self.limits.get(model, 1)
+
+    def _accounts(self) -> list[str]:
+        return [account.name for account in self.aionui.config.get_accounts()] or ["default"]
+
+    def _quota_wait(self, model: str) -> float:
+        if self.quota is None:
+            return 0.0
+        return min(self.quota.wait_time(model, name) for name in self._accounts())
+
+    def _dispatch(self, model: str) -> None:
+        queue = self._queues.get(model, [])
+        while queue and self._in_flight.get(model, 0) < self._limit(model):
+            if queue[0][3].future.done():
+                heapq.heappop(queue)
+                continue
+            account = None
+            if self.quota is not None:
+                waits = {name: self.quota.wait_time(model, name) for name in self._accounts()}
+                available = [name for name, wait in waits.items() if wait <= 0]
+                if not available:
+                    self._wake_up_later(model, min(waits.values()))
+                    return
+                account = self.aionui.pick_account(model, available)
+                self.quota.record(model, account)
+
+            _, tag, _, job = heapq.heappop(queue)
+            job.account = account
+            self._virtual_time[model] = tag
+            self._in_flight[model] = self._in_flight.get(model, 0) + 1
+            job.task = asyncio.create_task(self._run(job))
+            self._running.add(job.task)
+            job.task.add_done_callback(self._running.discard)
+
+    async def _run(self, job: _Job) -> None:
+        wait = time.monotonic() - job.enqueued_at
+        try:
+            async with self.aionui.model_async(job.model, job.account) as instance:
+                response = await instance.chat(job.message, job.expected_result, **job.kwargs)
+            if not job.future.done():
+                job.future.set_result(response)
+        except asyncio.CancelledError:
+            job.future.cancel()
+        except QuotaExceededException as e:
+            if self.quota is None or self._closed:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                self.quota.park(job.model, e.reset_at, job.account or "default")
+                self._requeue(job)
+        except Exception as e:
+            logger.warning(f"{job.model} job of {job.tenant} failed: {e}")
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            self._in_flight[job.model] -= 1
+            if job.future.done():
+                self._completed[job.model] = self._completed.get(job.model, 0) + 1
+                self._total_wait[job.model] = self._total_wait.get(job.model, 0.0) + wait
+            if not self._closed:
+                self._dispatch(job.model)
+
+    def _requeue(self, job: _Job) -> None:
+        job.task = None
+        tag = self._virtual_time.get(job.model, 0.0)
+        heapq.heappush(self._queues.setdefault(job.model, []), (job.priority, tag, next(self._sequence), job))
+
+    def _wake_up_later(self, model: str, delay: float) -> None:
+        handle = self._wake_ups.get(model)
+        if handle is not None and not handle.cancelled() and handle.when() <= asyncio.get_running_loop().time() + delay:
+            return
+        if handle is not None:
+            handle.cancel()
+        self._wake_ups[model] = asyncio.get_running_loop().call_later(delay, self._wake_up, model)
+
+    def _wake_up(self, model: str) -> None:
+        self._wake_ups.pop(model, None)
+        if not self._closed:
+            self._dispatch(model)
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time: calls made while one with the same key is in flight share its outcome.
+
+    The first caller runs the call, the others await it and get the same result or error. If the first caller is
+    cancelled, a waiting caller runs the call itself instead of failing. `coalesced` counts the calls that shared
+    the outcome of another, by group.
+    """
+
+    coalesced: dict[str, int]
+
+    def __init__(self):
+        self.coalesced = {}
+        self._calls: dict[str, asyncio.Future] = {}
+
+    def in_flight(self) -> int:
+        """
+        Gets the number of keys with a call in flight.
+        """
+        return len(self._calls)
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]], group: str = "default") -> T:
+        """
+        Runs `call`, or waits for the call in flight under the same key.
+
+        Args:
+            key (str): Identifies calls that are interchangeable.
+            call (Callable[[], Awaitable[T]]): Starts the work.
+            group (str, optional): What the call is counted under in `coalesced`. Defaults to "default".
+
+        Returns:
+            T: The result of the call.
+        """
+        while (future := self._calls.get(key)) is not None:
+            self.coalesced[group] = self.coalesced.get(group, 0) + 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The caller running the call was cancelled, not this one: take over
+                self.coalesced[group] -= 1
+                if not self.coalesced[group]:
+                    del self.coalesced[group]
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here, so no "exception was never retrieved" is logged when nobody else waited
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
@@ -0,0 +1,3 @@
+from .supervisor import ChromeSupervisor, main
+
+__all__ = ["ChromeSupervisor", "main"]
@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import signal
+import threading
+import time
+from typing import Optional
+
+from ..config import Config
+from ..exceptions import ChromeLaunchException
+from ..launcher import ChromeLauncher
+from ..utils.common import get_process_command_line, is_process_running, read_supervisor_state
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ChromeSupervisor:
+    """
+    Keeps the configured Chrome instances running across Python processes.
+
+    The supervisor launches one Chrome per debug port, restarts instances that crashed or stopped answering and
+    records their ports and PIDs in a state file. `AiOnUi` processes started later simply connect over CDP, and
+    while the supervisor is alive they wait for its restarts instead of launching a competing Chrome.
+    """
+
+    config: Config
+    launcher: ChromeLauncher
+    state_file: str
+    interval: float
+    instances: dict[int, dict]
+
+    def __init__(self, config: Config, state_file: Optional[str] = None, interval: float = 5.0):
+        """
+        Args:
+            config (Config): The config holding the Chrome binary, profile and debug ports.
+            state_file (str, optional): Where to record the instances. Defaults to `config.get_supervisor_state_file()`.
+            interval (float, optional): Seconds between two health checks. Defaults to 5.
+        """
+        self.config = config
+        self.launcher = ChromeLauncher(config)
+        self.state_file = state_file or config.get_supervisor_state_file()
+        self.interval = interval
+        self.instances = {}
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """
+        Launches or adopts every configured instance and writes the state file.
+        """
+        state = read_supervisor_state(self.state_file)
+        if state is not None and state["pid"] != os.getpid():
+            raise RuntimeError(f"Another supervisor (PID {state['pid']}) already owns {self.state_file}")
+
+        previous = self._read_previous_instances()
+        for port in self.config.get_debug_ports():
+            self._ensure(port, previous.get(port))
+        self.write_state()
+
+    def check(self) -> None:
+        """
+        Restarts crashed or unresponsive instances and refreshes the state file.
+        """
+        for port in self.config.get_debug_ports():
+            self._ensure(port)
+        self.write_state()
+
+    def run(self) -> None:
+        """
+        Starts the instances and checks them every `interval` seconds until `stop` is called.
+        """
+        self.start()
+        try:
+            while not self._stopped.wait(self.interval):
+                self.check()
+        finally:
+            self.shutdown()
+
+    def stop(self) -> None:
+        """
+        Asks `run` to return.
+        """
+        self._stopped.set()
+
+    def shutdown(self) -> None:
+        """
+        Terminates the supervised instances and removes the state file.
+
+        Instances adopted from an earlier supervisor are only signalled while their PID still is Chrome on the
+        instance's debug port, so a PID reused by another process is never killed.
+        """
+        adopted = [instance for port, instance in self.instances.items() if port not in self.launcher.processes]
+        self.launcher.terminate()
+        for instance in adopted:
+            if self._is_adopted_chrome(instance):
+                os.kill(instance["pid"], signal.SIGTERM)
+        self.instances = {}
+        if os.path.exists(self.state_file):
+            os.remove(self.state_file)
+
+    def write_state(self) -> None:
+        """
+        Atomically writes the supervisor PID and the instances to the state file.
+        """
+        state = {
+            "pid": os.getpid(),
+            "updated_at": time.time(),
+            "ports": self.config.get_debug_ports(),
+            "instances": list(self.instances.values()),
+        }
+        temp_file = f"{self.state_file}.tmp"
+        with open(temp_file, "w") as file:
+            json.dump(state, file, indent=2)
+        os.replace(temp_file, self.state_file)
+
+    def _ensure(self, port: int, previous: Optional[dict] = None) -> None:
+        instance = self.instances.get(port) or previous
+        process = self.launcher.processes.get(port)
+        alive = process.poll() is None if process is not None else instance is None or self._is_alive(instance)
+        if alive and self.launcher.is_ready(port):
+            if port not in self.instances:
+                if process is not None:
+                    pid = process.pid
+                else:
+                    pid = instance["pid"] if instance is not None and self._is_adopted_chrome(instance) else None
+                self.instances[port] = self._describe(port, pid, (instance or {}).get("restarts", 0))
+            return
+
+        restarts = instance["restarts"] + 1 if instance is not None else 0
+        if instance is not None:
+            logger.warning(f"Chrome on port {port} is down, restarting")
+        self.launcher.terminate(port)
+        if instance is not None and process is None and self._is_adopted_chrome(instance):
+            os.kill(instance["pid"], signal.SIGTERM)
+
+        try:
+            self.launcher.launch(port)
+        except ChromeLaunchException as e:
+            logger.error(f"Could not start Chrome on port {port}: {e}")
+            self.instances.pop(port, None)
+            return
+        self.instances[port] = self._describe(port, self.launcher.processes[port].pid, restarts)
+
+    def _describe(self, port: int, pid: Optional[int], restarts: int) -> dict:
+        return {
+            "port": port,
+            "pid": pid,
+            "user_data_dir": self.config.get_instance_user_data_dir(port),
+            "restarts": restarts,
+        }
+
+    def _is_alive(self, instance: dict) -> bool:
+        # Without a PID to watch, whether the port answers decides
+        return instance.get("pid") is None or is_process_running(instance["pid"])
+
+    def _is_adopted_chrome(self, instance: dict) -> bool:
+        """
+        Checks that the PID recorded for an instance this supervisor did not launch still is Chrome on its port.
+        """
+        command_line = get_process_command_line(instance["pid"]) if instance.get("pid") is not None else None
+        return command_line is not None and f"--remote-debugging-port={instance['port']}" in command_line.split()
+
+    def _read_previous_instances(self) -> dict[int, dict]:
+        """
+        Reads the instances left by a supervisor that did not shut down cleanly, so they can be adopted.
+        """
+        try:
+            with open(self.state_file, "r") as file:
+                instances = json.load(file).get("instances", [])
+        except (OSError, ValueError, AttributeError):
+            return {}
+        return {instance["port"]: instance for instance in instances if "port" in instance}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    Entry point of `python -m aionui.supervisor`.
+    """
+    parser = argparse.ArgumentParser(prog="python -m aionui.supervisor", description=ChromeSupervisor.__doc__)
+    parser.add_argument("--config", help="Path to the YAML config file")
+    parser.add_argument("--state-file", help="Where to record the running Chrome instances")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between two health checks")
+    args = parser.parse_args(argv)
+
+    supervisor = ChromeSupervisor(Config(args.config), args.state_file, args.interval)
+    signal.signal(signal.SIGTERM, lambda *_: supervisor.stop())
+    try:
+        supervisor.run()
+    except KeyboardInterrupt:
+        supervisor.stop()
@@ -0,0 +1,62 @@
+import functools
+import inspect
+from typing import Any, AsyncGenerator, Generator
+
+from .event_loop_thread import EventLoopThread
+from .models_async.base_async import BaseAsyncModel
+
+
+class SyncModel:
+    """
+    Blocking front of an async model whose coroutines run on an `EventLoopThread`.
+
+    Methods are called on the loop thread: coroutine methods such as `chat` block until done, and async generators
+    such as `chat_stream` become regular generators. Other attributes are those of the async model, so `page` is an
+    async `Page`. Since nothing blocks the loop, models used from several threads chat at the same time.
+    """
+
+    model: BaseAsyncModel
+    event_loop: EventLoopThread
+
+    def __init__(self, model: BaseAsyncModel, event_loop: EventLoopThread):
+        """
+        Args:
+            model (BaseAsyncModel): The model to drive.
+            event_loop (EventLoopThread): The loop the model's page belongs to.
+        """
+        self.model = model
+        self.event_loop = event_loop
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.model, name)
+        if not callable(attribute) or inspect.isclass(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            result = self.event_loop.run(self._call(attribute, args, kwargs))
+            if inspect.isasyncgen(result):
+                return self._iterate(result)
+            return result
+
+        return call
+
+    def __repr__(self) -> str:
+        return f"SyncModel({self.model!r})"
+
+    @staticmethod
+    async def _call(function: Any, args: tuple, kwargs: dict) -> Any:
+        result = function(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def _iterate(self, generator: AsyncGenerator[Any, None]) -> Generator[Any, None, None]:
+        try:
+            while True:
+                try:
+                    yield self.event_loop.run(anext(generator))
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.event_loop.run(generator.aclose())
@@ -1,10 +1,33 @@
+from __future__ import annotations
+
+import hashlib
+import importlib
 import os
-import requests
-from typing import Optional
+import json
+import mimetypes
+import uuid
+from typing import TYPE_CHECKING, Any, Optional, Union
 from ..enums.platform import Platform
 import platform
 import re
-import aiohttp
+from datetime import datetime, timedelta
+
+if TYPE_CHECKING:
+    from playwright.sync_api import FilePayload
+
+# Playwright is slow to import and only some helpers need it, so it loads on first access
+_lazy_attributes = {
+    "FilePayload": ("playwright.sync_api", "FilePayload"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _lazy_attributes[name]
+    value = getattr(importlib.import_module(module_name), attribute)
+    globals()[name] = value
+    return value
 
 
 def get_platform() -> Platform:
@@ -80,8 +103,85 @@ def clean_text(text: str):
     return text
 
 
+INSTRUCTIONS = (
+    "For my requests, please proceed as follows:\n"
+    "- Only respond to what is requested, do not add any descriptions or explanations.\n"
+    "- Return in a code block for JSON and code, while text remains in normal format.\n"
+    "- For JSON, use double quotes for keys and values, and ensure the JSON is valid.\n"
+    "- Search for any additional information on the internet if needed.\n"
+)
+"""The instructions a conversation is primed with"""
+
+
+def strip_echo(response: str, echoed: str) -> str:
+    """Remove the lines of `echoed` a response starts with, e.g. instructions the model repeated before answering"""
+
+    def normalize(line: str) -> str:
+        return line.strip().lstrip("-*• ").lower()
+
+    echoed_lines = {"", *(normalize(line) for line in echoed.splitlines())}
+    lines = response.splitlines()
+    start = 0
+    while start < len(lines) and normalize(lines[start]) in echoed_lines:
+        start += 1
+    remainder = "\n".join(lines[start:]).strip()
+    return remainder or response
+
+
+def parse_reset_time(time_str: str, margin: timedelta = timedelta(minutes=5)) -> datetime:
+    """Get the next occurrence of a limit reset time like "4:30 PM", plus a safety margin"""
+    now = datetime.now()
+    reset_time = datetime.strptime(time_str, "%I:%M %p").time()
+    reset_datetime = now.replace(hour=reset_time.hour, minute=reset_time.minute, second=0, microsecond=0)
+    if reset_datetime < now:
+        reset_datetime += timedelta(days=1)
+    return reset_datetime + margin
+
+
+def text_file_payload(text: str, file_name: str = "attachment.txt") -> FilePayload:
+    """Build an in-memory file for `set_input_files`, with a unique name so parallel uploads never collide"""
+    stem, suffix = os.path.splitext(os.path.basename(file_name))
+    name = f"{stem}-{uuid.uuid4().hex[:8]}{suffix}"
+    return {"name": name, "mimeType": mimetypes.guess_type(name)[0] or "text/plain", "buffer": text.encode("utf-8")}
+
+
+def attachment_name(file: Union[str, FilePayload]) -> str:
+    """Get the name a file path or in-memory file is uploaded under"""
+    if isinstance(file, dict):
+        return file["name"]
+    return os.path.basename(file)
+
+
+def chat_key(
+    model: str,
+    message: str,
+    expected_result: str = "text",
+    tools: list[str] = [],
+    attachments: list[Union[str, FilePayload]] = [],
+) -> str:
+    """Get a key identifying a chat by provider, message (whitespace-insensitive), result type, tools and attachment
+    contents"""
+    normalized = re.sub(r"\s+", " ", message).strip()
+    parts = [model, normalized, expected_result, sorted(tools), [hash_file(file) for file in attachments]]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def hash_file(file: Union[str, FilePayload]) -> str:
+    """Get the SHA-256 of the contents of a file path or in-memory file"""
+    digest = hashlib.sha256()
+    if isinstance(file, dict):
+        digest.update(file["buffer"])
+    else:
+        with open(file, "rb") as content:
+            for chunk in iter(lambda: content.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
 def save_image(url: str, file_path: str):
     """Save image to file"""
+    import requests
+
     content = requests.get(url).content
     with open(file_path, "wb") as f:
         f.write(content)
@@ -90,6 +190,8 @@ def save_image(url: str, file_path: str):
 
 async def save_image_async(url: str, file_path: str) -> str:
     """Save image to file asynchronously"""
+    import aiohttp
+
     async with aiohttp.ClientSession() as session:
         async with session.get(url) as response:
             if response.status == 200:
@@ -97,3 +199,65 @@ async def save_image_async(url: str, file_path: str) -> str:
                 with open(file_path, "wb") as f:
                     f.write(content)
     return file_path
+
+
+def is_process_running(pid: int) -> bool:
+    """Check whether a process with the given PID is alive"""
+    if not isinstance(pid, int) or pid <= 0:
+        return False
+    if get_platform() == Platform.WINDOWS:
+        import ctypes
+
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        ctypes.windll.kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return exit_code.value == 259
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get_process_command_line(pid: int) -> Optional[str]:
+    """Get the command line of a running process, None if it cannot be read"""
+    if not is_process_running(pid):
+        return None
+    if os.path.exists(f"/proc/{pid}/cmdline"):
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as file:
+                return file.read().replace(b"\0", b" ").decode(errors="replace").strip()
+        except OSError:
+            return None
+
+    import subprocess
+
+    if get_platform() == Platform.WINDOWS:
+        query = f"(Get-CimInstance Win32_Process -Filter 'ProcessId={pid}').CommandLine"
+        command = ["powershell", "-NoProfile", "-Command", query]
+    else:
+        command = ["ps", "-o", "command=", "-p", str(pid)]
+    try:
+        output = subprocess.run(command, capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output or None
+
+
+def read_supervisor_state(state_file: str) -> Optional[dict]:
+    """Read the state file of a running Chrome supervisor, None if there is no live supervisor"""
+    try:
+        with open(state_file, "r") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(state, dict) or not is_process_running(state.get("pid", -1)):
+        return None
+    return state
@@ -0,0 +1,202 @@
+import json
+
+
+WAIT_FOR_STATE = """
+([timeout, arg]) => new Promise((resolve) => {
+    const check = () => {
+        try {
+            return (%s)(arg);
+        } catch (e) {
+            return null;
+        }
+    };
+    const initial = check();
+    if (initial) {
+        resolve(initial);
+        return;
+    }
+
+    let scheduled = null;
+    let timer = null;
+    const observer = new MutationObserver(() => {
+        if (scheduled === null) {
+            scheduled = setTimeout(run, 100);
+        }
+    });
+    const finish = (state) => {
+        observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(scheduled);
+        resolve(state);
+    };
+    function run() {
+        scheduled = null;
+        const state = check();
+        if (state) {
+            finish(state);
+        }
+    }
+    timer = setTimeout(() => finish(check()), timeout);
+    observer.observe(document.documentElement, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        characterData: true,
+    });
+})
+"""
+
+
+def wait_for_state_script(predicate: str) -> str:
+    """
+    Builds a function for `page.evaluate` that resolves with the first truthy result of `predicate`.
+
+    The predicate is a JavaScript function expression taking one argument and returning a state string, or a falsy
+    value while there is nothing to report. It is re-checked after DOM mutations (at most every 100ms) instead of on
+    a fixed interval. The built function is evaluated with `[timeout_ms, arg]` and resolves with the predicate's
+    last result once the timeout runs out.
+    """
+    return WAIT_FOR_STATE % predicate
+
+
+STREAM_DELTA = """
+([previous, sent]) => {
+    const text = (%s)(previous) || "";
+    const state = (%s)(previous) || null;
+    if (state || text.length > sent) {
+        return {delta: text.slice(sent), state: state};
+    }
+    return null;
+}
+"""
+
+
+def stream_delta_script(text_predicate: str, state_predicate: str) -> str:
+    """
+    Builds a predicate for `wait_for_state_script` that reports the characters rendered since the last read.
+
+    It is called with `[previous_responses, sent]`, where `sent` is the number of characters the caller already
+    has, and returns `{delta, state}` once the response grew or the state predicate reports something.
+    """
+    return STREAM_DELTA % (text_predicate, state_predicate)
+
+
+CAPTURE_CLIPBOARD = """
+() => {
+    if (!window.__aionuiClipboard) {
+        const captured = {text: null};
+        const store = (text) => {
+            if (text) {
+                captured.text = String(text);
+            }
+        };
+        const clipboard = navigator.clipboard;
+        if (clipboard) {
+            clipboard.writeText = async (text) => store(text);
+            clipboard.write = async (items) => {
+                for (const item of items) {
+                    if (item.types.includes("text/plain")) {
+                        store(await (await item.getType("text/plain")).text());
+                        return;
+                    }
+                }
+            };
+        }
+        window.addEventListener("copy", (event) => {
+            const data = event.clipboardData ? event.clipboardData.getData("text/plain") : "";
+            store(data || (event.defaultPrevented ? "" : String(document.getSelection())));
+        });
+        window.__aionuiClipboard = captured;
+    }
+    window.__aionuiClipboard.text = null;
+}
+"""
+"""Keeps what the page copies in `window.__aionuiClipboard` instead of the system clipboard, and clears it"""
+
+COPIED_TEXT = """() => window.__aionuiClipboard && window.__aionuiClipboard.text"""
+"""Predicate for `wait_for_state_script` reporting the text captured by `CAPTURE_CLIPBOARD`"""
+
+
+RUNTIME = """
+(() => {
+    const selectors = %s;
+    const responseState = %s;
+    const responseText = %s;
+    const all = (selector, root = document) => (selector ? [...root.querySelectorAll(selector)] : []);
+    const enabled = (element) =>
+        !!element && !element.disabled && element.getAttribute("aria-disabled") !== "true";
+
+    window.__aionui = window.__aionui || {};
+    window.__aionui[%s] = {
+        snapshot(previous = 0) {
+            const responses = all(selectors.response);
+            const last = responses.length > previous ? responses[responses.length - 1] : null;
+            return {
+                input_ready: enabled(all(selectors.input)[0]),
+                send_found: all(selectors.send).length > 0,
+                send_enabled: enabled(all(selectors.send)[0]),
+                streaming: all(selectors.stop).length > 0,
+                state: responseState(previous) || null,
+                responses: responses.length,
+                last_response: responseText(previous) || null,
+                code_blocks: last ? all("pre code", last).map((block) => block.textContent) : [],
+                attachments: all('input[type="file"]').reduce((count, input) => count + input.files.length, 0),
+            };
+        },
+    };
+})();
+"""
+
+
+SNAPSHOT = """
+([name, previous]) => (window.__aionui && window.__aionui[name] ? window.__aionui[name].snapshot(previous) : null)
+"""
+
+
+def runtime_script(name: str, selectors: dict[str, str], state_predicate: str, text_predicate: str) -> str:
+    """
+    Builds the in-page runtime of a provider, installing `window.__aionui[name].snapshot(previous)`.
+
+    The snapshot gathers everything a chat polls for in one call: whether the input and send button are usable,
+    whether a response is streaming, the response state and text, the code blocks of the last response and the
+    number of attached files. Read it with `SNAPSHOT` evaluated with `[name, previous_responses]`.
+
+    Args:
+        name (str): The key of the runtime in `window.__aionui`.
+        selectors (dict[str, str]): CSS selectors for "input", "send", "stop" and "response", missing ones match
+            nothing.
+        state_predicate (str): The provider's response state predicate, see `wait_for_state_script`.
+        text_predicate (str): The provider's response text predicate, see `stream_delta_script`.
+    """
+    return RUNTIME % (json.dumps(selectors), state_predicate, text_predicate, json.dumps(name))
+
+
+INPUT_READY = """
+(name) => (window.__aionui && window.__aionui[name] && window.__aionui[name].snapshot().input_ready ? "ready" : null)
+"""
+"""Predicate for `wait_for_state_script` reporting "ready" once the runtime `name` finds a usable input field"""
+
+
+PASTE_TEXT = """
+(element, text) => {
+    element.focus();
+    const data = new DataTransfer();
+    data.setData("text/plain", text);
+    const event = new ClipboardEvent("paste", {clipboardData: data, bubbles: true, cancelable: true});
+    return !element.dispatchEvent(event);
+}
+"""
+"""Pastes `text` into an element in one event, returns whether the page's editor handled the paste"""
+
+INPUT_HAS_TEXT = """
+([selector, expected]) => {
+    const input = document.querySelector(selector);
+    if (!input) {
+        return null;
+    }
+    const text = typeof input.value === "string" ? input.value : input.innerText;
+    return text.replace(/\\s+/g, "") === expected.replace(/\\s+/g, "") ? "filled" : null;
+}
+"""
+"""Predicate for `wait_for_state_script` reporting "filled" once the input holds the expected text, ignoring the
+whitespace editors add or drop between paragraphs"""
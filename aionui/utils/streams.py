@@ -0,0 +1,144 @@
+import json
+import re
+from typing import Any, Iterator, Optional
+
+
+def iter_sse_data(body: str) -> Iterator[Any]:
+    """Iterate the JSON payloads of a server-sent events body, skipping anything that is not JSON"""
+    for line in body.splitlines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if not data or data == "[DONE]":
+            continue
+        try:
+            yield json.loads(data)
+        except ValueError:
+            continue
+
+
+def parse_gpt_stream(body: str) -> Optional[str]:
+    """Assemble the assistant message of a ChatGPT conversation stream, full messages and delta patches alike"""
+    text: Optional[str] = None
+    assistant = False
+    path, op = None, None
+
+    def apply(patch: dict) -> None:
+        nonlocal text, assistant, path, op
+        path, op = patch.get("p", path), patch.get("o", op)
+        value = patch.get("v")
+        if isinstance(value, dict) and isinstance(value.get("message"), dict):
+            assistant, message_text = _gpt_message_text(value["message"])
+            if assistant:
+                text = message_text
+        elif op == "patch" and isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    apply(item)
+        elif assistant and path == "/message/content/parts/0" and isinstance(value, str):
+            text = value if op == "replace" else (text or "") + value
+
+    for event in iter_sse_data(body):
+        if not isinstance(event, dict):
+            continue
+        if isinstance(event.get("message"), dict):
+            is_assistant, message_text = _gpt_message_text(event["message"])
+            if is_assistant:
+                text = message_text
+        elif "v" in event:
+            apply(event)
+    return text or None
+
+
+def _gpt_message_text(message: dict) -> tuple[bool, Optional[str]]:
+    author = message.get("author") or {}
+    content = message.get("content") or {}
+    if author.get("role") != "assistant" or content.get("content_type") not in (None, "text"):
+        return False, None
+    parts = content.get("parts") or [""]
+    return True, parts[0] if isinstance(parts[0], str) else ""
+
+
+def parse_claude_stream(body: str) -> Optional[str]:
+    """Assemble the text of a Claude completion stream"""
+    chunks = []
+    for event in iter_sse_data(body):
+        if not isinstance(event, dict):
+            continue
+        if event.get("type") == "content_block_start":
+            block = event.get("content_block") or {}
+            if block.get("type") == "text":
+                chunks.append(block.get("text", ""))
+        elif event.get("type") == "content_block_delta":
+            delta = event.get("delta") or {}
+            if delta.get("type") == "text_delta":
+                chunks.append(delta.get("text", ""))
+        elif isinstance(event.get("completion"), str):
+            chunks.append(event["completion"])
+    return "".join(chunks) or None
+
+
+def parse_gemini_stream(body: str) -> Optional[str]:
+    """Get the last candidate text of a Gemini StreamGenerate response, every chunk holds the text so far"""
+    text = None
+    for line in body.splitlines():
+        if not line.startswith("["):
+            continue
+        try:
+            envelopes = json.loads(line)
+        except ValueError:
+            continue
+        for envelope in envelopes:
+            if not isinstance(envelope, list) or len(envelope) < 3 or envelope[0] != "wrb.fr":
+                continue
+            if not isinstance(envelope[2], str):
+                continue
+            try:
+                candidate = json.loads(envelope[2])[4][0][1][0]
+            except (ValueError, IndexError, KeyError, TypeError):
+                continue
+            if isinstance(candidate, str):
+                text = candidate
+    return text or None
+
+
+def parse_deep_seek_stream(body: str) -> Optional[str]:
+    """Assemble the answer of a DeepSeek completion stream, leaving out the thinking fragments"""
+    chunks = []
+    fragments: list[dict] = []
+    path, op = None, None
+    for event in iter_sse_data(body):
+        if not isinstance(event, dict):
+            continue
+        if isinstance(event.get("choices"), list):
+            for choice in event["choices"]:
+                delta = (choice or {}).get("delta") or {}
+                if delta.get("type", "text") == "text" and isinstance(delta.get("content"), str):
+                    chunks.append(delta["content"])
+            continue
+
+        path, op = event.get("p", path), event.get("o", op)
+        value = event.get("v")
+        if isinstance(value, dict) and isinstance(value.get("response"), dict):
+            fragments = [dict(fragment) for fragment in value["response"].get("fragments") or []]
+        elif path == "response/fragments" and isinstance(value, list):
+            fragments.extend(dict(fragment) for fragment in value if isinstance(fragment, dict))
+        elif path == "response/content" and isinstance(value, str):
+            chunks.append(value)
+        elif isinstance(value, str) and path and (match := re.fullmatch(r"response/fragments/(-?\d+)/content", path)):
+            try:
+                fragment = fragments[int(match.group(1))]
+            except IndexError:
+                continue
+            fragment["content"] = fragment.get("content", "") + value
+
+    answer = "".join(fragment.get("content", "") for fragment in fragments if fragment.get("type") == "RESPONSE")
+    return answer or "".join(chunks) or None
+
+
+def extract_code_block(text: str) -> Optional[str]:
+    """Get the content of the last fenced code block of a markdown text"""
+    blocks = re.findall(r"```[^\n]*\n(.*?)```", text, flags=re.DOTALL)
+    if not blocks:
+        return None
+    return blocks[-1].rstrip("\n")
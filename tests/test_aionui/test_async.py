@@ -1,5 +1,7 @@
+import asyncio
 import pytest
 from aionui.models_async import GPTAsync, ClaudeAsync, GeminiAsync
+from aionui.models_async.base_async import BaseAsyncModel
 from playwright.async_api import (
     Page as AsyncPage,
     Browser as AsyncBrowser,
@@ -8,6 +10,7 @@ from playwright.async_api import (
 )
 from typing import Literal
 from aionui import AiOnUi
+from aionui.config import Account
 from unittest.mock import Mock, AsyncMock, patch
 
 
@@ -52,6 +55,28 @@ class TestAiOnUiAsync:
             elif model_type == "gemini":
                 assert isinstance(model, GeminiAsync)
 
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_response_cache(self, mock_page_async, tmp_path):
+        aionui = AiOnUi(page=mock_page_async)
+        aionui.config.response_cache = True
+        aionui.config.response_cache_file = str(tmp_path / "cache.sqlite3")
+
+        sent = []
+
+        async def chat(self, message, expected_result="text", attachments=[]):
+            sent.append(message)
+            return "Hi!"
+
+        with patch.object(ClaudeAsync, "chat", chat):
+            async with aionui.model_async("claude") as model:
+                assert await model.chat("Hello") == "Hi!"
+            async with aionui.model_async("claude") as model:
+                assert await model.chat("Hello") == "Hi!"
+                await model.init_instructions()
+                await model.init_instructions()
+        assert len(sent) == 3
+        assert aionui.response_cache.hits == 1
+
     @pytest.mark.asyncio(loop_scope="class")
     async def test_clean_up_page(self, mock_page_async):
         aionui = AiOnUi(page=mock_page_async)
@@ -83,7 +108,7 @@ class TestAiOnUiAsync:
             assert model.page == mock_page_async
         assert mock_playwright_async.chromium.connect_over_cdp.await_count == 1
         assert mock_page_async.close.await_count == 1
-        assert mock_context_async.close.await_count == 1
+        assert mock_context_async.close.await_count == 0
         assert mock_browser_async.close.await_count == 1
 
     @pytest.mark.asyncio(loop_scope="class")
@@ -92,6 +117,7 @@ class TestAiOnUiAsync:
     ):
         mock_popen = Mock()
         monkeypatch.setattr("subprocess.Popen", mock_popen)
+        monkeypatch.setattr("aionui.launcher.ChromeLauncher.is_ready_async", AsyncMock(return_value=True))
 
         mock_playwright_async.chromium.connect_over_cdp.side_effect = [ConnectionError, mock_browser_async]
 
@@ -104,5 +130,287 @@ class TestAiOnUiAsync:
 
             assert mock_popen.call_count == 1
             assert mock_page_async.close.await_count == 1
-            assert mock_context_async.close.await_count == 1
+            assert mock_context_async.close.await_count == 0
+            assert mock_browser_async.close.await_count == 1
+
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_session_reuses_connection(
+        self, mock_page_async, mock_context_async, mock_browser_async, mock_playwright_async
+    ):
+        with patch("aionui.aionui.async_playwright") as mock_async_playwright:
+            mock_async_playwright.return_value.start = AsyncMock(return_value=mock_playwright_async)
+
+            async with AiOnUi() as aionui:
+                async with aionui.model_async("gpt") as model:
+                    assert model.page == mock_page_async
+                async with aionui.model_async("claude") as model:
+                    assert model.page == mock_page_async
+                assert mock_browser_async.close.await_count == 0
+
+            assert mock_async_playwright.return_value.start.await_count == 1
+            assert mock_playwright_async.chromium.connect_over_cdp.await_count == 1
+            assert mock_context_async.new_page.await_count == 2
+            assert mock_page_async.close.await_count == 2
+            assert mock_context_async.close.await_count == 0
             assert mock_browser_async.close.await_count == 1
+            assert mock_playwright_async.stop.await_count == 1
+
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_session_primes_conversations(self, mock_page_async, mock_playwright_async):
+        mock_page_async.url = "https://chatgpt.com/c/1"
+        aionui = AiOnUi(playwright=mock_playwright_async)
+        aionui.config.primed_conversations = 1
+        with patch.object(BaseAsyncModel, "wait_until_ready", AsyncMock()), patch.object(
+            BaseAsyncModel, "init_instructions", AsyncMock()
+        ) as init_instructions:
+            await aionui.start_async()
+            await asyncio.gather(*(primed._refill_task for primed in aionui._primed.values()))
+            assert init_instructions.await_count == 4
+
+            async with aionui.model_async("gpt") as model:
+                assert model.primed_conversations is aionui._primed[("default", "gpt")]
+                assert model.primed_conversations.ready() == 1
+                await model.new_conversation()
+                mock_page_async.goto.assert_awaited_with("https://chatgpt.com/c/1")
+                await model.primed_conversations._refill_task
+                assert model.primed_conversations.ready() == 1
+                assert init_instructions.await_count == 5
+
+        await aionui.close_async()
+        assert aionui._primed == {}
+
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_session_closes_page_on_error(self, mock_page_async, mock_context_async, mock_playwright_async):
+        aionui = AiOnUi(playwright=mock_playwright_async)
+        await aionui.start_async()
+        with pytest.raises(ValueError):
+            async with aionui.model_async("gpt"):
+                raise ValueError("chat failed")
+        assert mock_page_async.close.await_count == 1
+
+        await aionui.close_async()
+        assert mock_context_async.close.await_count == 0
+        assert mock_playwright_async.stop.await_count == 0
+
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_session_spreads_pages_across_instances(self, mock_playwright_async):
+        shards = []
+        for _ in range(2):
+            context = AsyncMock(spec=AsyncBrowserContext)
+            context.pages = []
+            context.new_page = AsyncMock(
+                side_effect=lambda context=context: context.pages.append(AsyncMock(spec=AsyncPage)) or context.pages[-1]
+            )
+            browser = AsyncMock(spec=AsyncBrowser)
+            browser.contexts = [context]
+            shards.append(browser)
+        mock_playwright_async.chromium.connect_over_cdp = AsyncMock(side_effect=shards)
+
+        aionui = AiOnUi(playwright=mock_playwright_async)
+        aionui.config.debug_ports = [9300, 9301]
+        async with aionui:
+            async with aionui.model_async("gpt") as first, aionui.model_async("gpt") as second:
+                assert first.page in shards[0].contexts[0].pages
+                assert second.page in shards[1].contexts[0].pages
+
+        assert [call.args[0] for call in mock_playwright_async.chromium.connect_over_cdp.await_args_list] == [
+            "http://localhost:9300",
+            "http://localhost:9301",
+        ]
+        for browser in shards:
+            assert browser.close.await_count == 1
+
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_session_routes_accounts(self, mock_playwright_async):
+        shards = []
+        for _ in range(2):
+            context = AsyncMock(spec=AsyncBrowserContext)
+            context.pages = []
+            context.new_page = AsyncMock(
+                side_effect=lambda context=context: context.pages.append(AsyncMock(spec=AsyncPage)) or context.pages[-1]
+            )
+            browser = AsyncMock(spec=AsyncBrowser)
+            browser.contexts = [context]
+            shards.append(browser)
+        mock_playwright_async.chromium.connect_over_cdp = AsyncMock(side_effect=shards)
+
+        aionui = AiOnUi(playwright=mock_playwright_async)
+        aionui.config.accounts = [
+            Account(name="personal", debug_port=9300),
+            Account(name="work", debug_port=9301, urls={"gemini": "https://gemini.google.com/u/1/app"}),
+        ]
+        async with aionui:
+            for expected in ["personal", "work", "personal"]:
+                async with aionui.model_async("gemini") as model:
+                    index = ["personal", "work"].index(expected)
+                    assert model.page in shards[index].contexts[0].pages
+                    assert model.url == ("https://gemini.google.com/u/1/app" if expected == "work" else GeminiAsync.url)
+
+            async with aionui.model_async("gpt", account="work") as model:
+                assert model.page in shards[1].contexts[0].pages
+
+            with pytest.raises(ValueError):
+                async with aionui.model_async("gpt", account="unknown"):
+                    pass
+
+    def test_pick_account(self):
+        aionui = AiOnUi()
+        assert aionui.pick_account("deep_seek") == "default"
+
+        aionui.config.accounts = [Account(name="a"), Account(name="b"), Account(name="c")]
+        assert [aionui.pick_account("gpt") for _ in range(4)] == ["a", "b", "c", "a"]
+        assert aionui.pick_account("gpt", ["b", "c"]) == "b"
+
+        aionui.config.account_routing = "least_recently_used"
+        assert aionui.pick_account("claude") == "a"
+        assert aionui.pick_account("claude") == "b"
+        assert aionui.pick_account("gpt") == "c"
+        assert aionui.pick_account("gpt") == "a"
+
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_session_persistent_launch_mode(self, mock_playwright_async, mock_context_async, mock_page_async):
+        mock_playwright_async.chromium.launch_persistent_context = AsyncMock(return_value=mock_context_async)
+
+        aionui = AiOnUi(playwright=mock_playwright_async)
+        aionui.config.launch_mode = "persistent"
+        aionui.config.user_data_dir = "profile"
+        async with aionui:
+            async with aionui.model_async("gpt") as model:
+                assert model.page == mock_page_async
+            assert mock_context_async.close.await_count == 0
+
+        options = mock_playwright_async.chromium.launch_persistent_context.await_args.kwargs
+        assert options["user_data_dir"] == "profile"
+        assert options["headless"] is False
+        assert mock_playwright_async.chromium.connect_over_cdp.await_count == 0
+        assert mock_context_async.close.await_count == 1
+
+
+@pytest.fixture
+def mock_pages_context_async():
+    mock = AsyncMock(spec=AsyncBrowserContext)
+    mock.pages = []
+
+    def new_page():
+        page = AsyncMock(spec=AsyncPage)
+        mock.pages.append(page)
+        return page
+
+    mock.new_page = AsyncMock(side_effect=new_page)
+    return mock
+
+
+async def echo_chat(message, expected_result="text", **kwargs):
+    await asyncio.sleep(0.01 if message == "slow" else 0)
+    if message == "fail":
+        raise ValueError(message)
+    return message.upper()
+
+
+class TestAiOnUiChatMany:
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_chat_many(self, mock_pages_context_async):
+        aionui = AiOnUi(context=mock_pages_context_async)
+        with patch.object(GPTAsync, "chat", new=AsyncMock(side_effect=echo_chat)) as chat:
+            results = await aionui.chat_many(["a", "b", "c"], "gpt", "code", concurrency=2, tools=["search_the_web"])
+
+        assert results == ["A", "B", "C"]
+        assert chat.await_args.kwargs == {"tools": ["search_the_web"]}
+        assert len(mock_pages_context_async.pages) == 2
+        assert sum(page.goto.await_count for page in mock_pages_context_async.pages) == 1
+        assert all(page.close.await_count == 1 for page in mock_pages_context_async.pages)
+
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_chat_many_failures(self, mock_pages_context_async):
+        aionui = AiOnUi(context=mock_pages_context_async)
+        with patch.object(GPTAsync, "chat", new=AsyncMock(side_effect=echo_chat)):
+            results = await aionui.chat_many(["a", "fail", "c"], concurrency=3, return_exceptions=True)
+            assert results[0] == "A" and results[2] == "C"
+            assert isinstance(results[1], ValueError)
+
+            with pytest.raises(ValueError):
+                await aionui.chat_many(["a", "fail", "c"], concurrency=3)
+
+        assert all(page.close.await_count == 1 for page in mock_pages_context_async.pages)
+
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_chat_as_completed(self, mock_pages_context_async):
+        aionui = AiOnUi(context=mock_pages_context_async)
+        with patch.object(GPTAsync, "chat", new=AsyncMock(side_effect=echo_chat)):
+            results = [result async for result in aionui.chat_as_completed(["slow", "fail", "c"], concurrency=3)]
+
+        assert [result.prompt for result in results] == ["fail", "c", "slow"]
+        assert not results[0].ok and isinstance(results[0].error, ValueError)
+        assert results[1].index == 2 and results[1].response == "C"
+        assert all(page.close.await_count == 1 for page in mock_pages_context_async.pages)
+
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_reused_page_waits_until_ready(self, mock_pages_context_async):
+        aionui = AiOnUi(context=mock_pages_context_async)
+        events = []
+
+        async def chat(message, expected_result="text", **kwargs):
+            events.append(f"chat {message}")
+            return message.upper()
+
+        async def wait_until_ready(self, timeout=30):
+            events.append("ready")
+
+        with patch.object(GPTAsync, "chat", new=AsyncMock(side_effect=chat)), patch.object(
+            GPTAsync, "wait_until_ready", wait_until_ready
+        ):
+            results = [result async for result in aionui.chat_as_completed(["a", "b"], concurrency=1)]
+
+        assert [result.response for result in results] == ["A", "B"]
+        assert events == ["chat a", "ready", "chat b"]
+        assert len(mock_pages_context_async.pages) == 1
+        mock_pages_context_async.pages[0].goto.assert_awaited_once_with(GPTAsync.url)
+
+
+def delayed_chat(delay, response=None, error=None):
+    async def chat(message, expected_result="text", **kwargs):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return response
+
+    return AsyncMock(side_effect=chat)
+
+
+class TestAiOnUiRace:
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_race_returns_first_response(self, mock_pages_context_async):
+        aionui = AiOnUi(context=mock_pages_context_async)
+        with patch.object(GPTAsync, "chat", new=delayed_chat(1, "gpt")), patch.object(
+            ClaudeAsync, "chat", new=delayed_chat(0, "claude")
+        ), patch.object(GPTAsync, "stop_generation", new=AsyncMock()) as stop:
+            result = await aionui.race("Hello", providers=["gpt", "claude"])
+
+        assert (result.response, result.model, result.index) == ("claude", "claude", 1)
+        assert stop.await_count == 1
+        assert all(page.close.await_count == 1 for page in mock_pages_context_async.pages)
+
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_race_hedge_delay(self, mock_pages_context_async):
+        aionui = AiOnUi(context=mock_pages_context_async)
+        with patch.object(GPTAsync, "chat", new=delayed_chat(0.01, "gpt")), patch.object(
+            ClaudeAsync, "chat", new=delayed_chat(0, "claude")
+        ) as claude_chat:
+            result = await aionui.race("Hello", providers=["gpt", "claude"], hedge_delay=1)
+
+        assert result.model == "gpt"
+        assert claude_chat.await_count == 0
+        assert len(mock_pages_context_async.pages) == 1
+        assert aionui.latency_percentile("gpt", 95) >= 0.01
+
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_race_failure_starts_next_provider(self, mock_pages_context_async):
+        aionui = AiOnUi(context=mock_pages_context_async)
+        with patch.object(GPTAsync, "chat", new=delayed_chat(0, error=ValueError("gpt"))), patch.object(
+            ClaudeAsync, "chat", new=delayed_chat(0, "")
+        ), patch.object(GeminiAsync, "chat", new=delayed_chat(0, "gemini")):
+            result = await aionui.race("Hello", hedge_delay=10, validate=lambda response: response != "")
+            assert result.model == "gemini"
+
+            with pytest.raises(ValueError, match="gpt"):
+                await aionui.race("Hello", providers=["gpt"])
@@ -0,0 +1,59 @@
+import re
+import subprocess
+import sys
+import pytest
+
+HEAVY_MODULES = ["playwright", "requests", "aiohttp", "pyperclip", "nest_asyncio"]
+
+
+def loaded_after(statement: str) -> list[str]:
+    script = f"import sys\n{statement}\nprint(' '.join(sorted(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return output.split()
+
+
+def import_time(module: str) -> float:
+    """Cumulative import time of `module` in seconds, as reported by `-X importtime`"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    ).stderr
+    match = re.search(rf"\|\s*(\d+) \| {re.escape(module)}$", stderr, flags=re.MULTILINE)
+    return int(match.group(1)) / 1_000_000
+
+
+@pytest.mark.parametrize("statement", ["import aionui", "import aionui.models", "import aionui.models_async"])
+def test_import_skips_heavy_modules(statement: str):
+    modules = loaded_after(statement)
+    assert [module for module in HEAVY_MODULES if module in modules] == []
+
+
+def test_utils_common_skips_heavy_modules():
+    modules = loaded_after("from aionui.utils.common import chat_key, get_platform")
+    assert [module for module in HEAVY_MODULES if module in modules] == []
+
+
+def test_provider_import_loads_only_that_provider():
+    modules = loaded_after("from aionui.models_async import ClaudeAsync")
+    assert "aionui.models_async.claude_async" in modules
+    assert "aionui.models_async.gpt_async" not in modules
+    assert "aionui.models" not in modules
+
+
+def test_import_does_not_patch_asyncio():
+    modules = loaded_after("from aionui import AiOnUi")
+    assert "nest_asyncio" not in modules
+
+
+def test_lazy_attributes():
+    import aionui
+    from aionui import models_async
+
+    assert aionui.AiOnUi.__name__ == "AiOnUi"
+    assert models_async.GPTAsync.__module__ == "aionui.models_async.gpt_async"
+    assert "ChatScheduler" in dir(aionui)
+    with pytest.raises(AttributeError):
+        aionui.Missing
+
+
+def test_import_time():
+    assert import_time("aionui") < 0.5
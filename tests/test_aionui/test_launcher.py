@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from aionui.config import Config
+from aionui.exceptions import ChromeLaunchException
+from aionui.launcher import ChromeLauncher
+
+
+@pytest.fixture
+def mock_popen(monkeypatch):
+    mock = Mock()
+    mock.return_value.poll.return_value = None
+    monkeypatch.setattr("subprocess.Popen", mock)
+    return mock
+
+
+@pytest.fixture
+def launcher():
+    return ChromeLauncher(Config(chrome_binary_path="chrome", launch_timeout=1))
+
+
+class TestChromeLauncher:
+    def test_launch_waits_until_ready(self, monkeypatch, mock_popen, launcher):
+        monkeypatch.setattr(launcher, "is_ready", Mock(side_effect=[False, False, True]))
+        monkeypatch.setattr("time.sleep", Mock())
+
+        latency = launcher.launch(9222)
+
+        assert mock_popen.call_args.args[0] == ["chrome", "--remote-debugging-port=9222"]
+        assert launcher.is_ready.call_count == 3
+        assert launcher.startup_latencies[9222] == latency
+        assert launcher.processes[9222] is mock_popen.return_value
+
+    def test_launch_timeout_terminates_process(self, monkeypatch, mock_popen, launcher):
+        monkeypatch.setattr(launcher, "is_ready", Mock(return_value=False))
+        monkeypatch.setattr("time.monotonic", Mock(side_effect=[0, 0.5, 2]))
+        monkeypatch.setattr("time.sleep", Mock())
+
+        with pytest.raises(ChromeLaunchException):
+            launcher.launch(9222)
+
+        assert mock_popen.return_value.terminate.call_count == 1
+        assert 9222 not in launcher.processes
+
+    def test_launch_fails_fast_when_chrome_exits(self, monkeypatch, mock_popen, launcher):
+        monkeypatch.setattr(launcher, "is_ready", Mock(return_value=False))
+        mock_popen.return_value.poll.return_value = 1
+
+        with pytest.raises(ChromeLaunchException):
+            launcher.launch(9222)
+
+        assert 9222 not in launcher.processes
+
+    @pytest.mark.asyncio
+    async def test_launch_async_waits_until_ready(self, monkeypatch, mock_popen, launcher):
+        monkeypatch.setattr(launcher, "is_ready_async", AsyncMock(side_effect=[False, True]))
+
+        latency = await launcher.launch_async(9223)
+
+        assert launcher.is_ready_async.await_count == 2
+        assert launcher.startup_latencies[9223] == latency
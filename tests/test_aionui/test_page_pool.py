@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from playwright.async_api import Page as AsyncPage, BrowserContext as AsyncBrowserContext
+from aionui import AiOnUi, PagePool
+from aionui.config import Config
+from aionui.models_async import GPTAsync
+
+URLS = {"gpt": "https://chatgpt.com", "claude": "https://claude.ai/new"}
+
+
+def make_page():
+    page = AsyncMock(spec=AsyncPage)
+    page.is_closed = Mock(return_value=False)
+    return page
+
+
+@pytest.fixture
+def mock_context_async():
+    mock = AsyncMock(spec=AsyncBrowserContext)
+    mock.new_page = AsyncMock(side_effect=lambda: make_page())
+    return mock
+
+
+async def settle(pool: PagePool):
+    while pool._tasks or any(not task.done() for task in pool._refill_tasks.values()):
+        await asyncio.gather(*pool._tasks, *pool._refill_tasks.values())
+
+
+class TestPagePool:
+    @pytest.mark.asyncio
+    async def test_checkout_reuses_returned_page(self, mock_context_async):
+        pool = PagePool(mock_context_async.new_page, Config(page_pool_min_size=0), URLS)
+        async with pool.page("gpt") as page:
+            page.goto.assert_awaited_once_with(URLS["gpt"])
+        await settle(pool)
+        assert pool.stats()["gpt"] == {"idle": 1, "pending": 0}
+
+        async with pool.page("gpt") as reused:
+            assert reused is page
+        assert mock_context_async.new_page.await_count == 1
+        await pool.close()
+        page.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_refills_to_min_size(self, mock_context_async):
+        pool = PagePool(mock_context_async.new_page, Config(page_pool_min_size=2), URLS)
+        await pool.start(["claude"])
+        await settle(pool)
+        assert pool.stats() == {"gpt": {"idle": 0, "pending": 0}, "claude": {"idle": 2, "pending": 0}}
+
+        await pool.checkout("claude")
+        await settle(pool)
+        assert pool.stats()["claude"]["idle"] == 2
+        assert mock_context_async.new_page.await_count == 3
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_closes_pages_above_max_size(self, mock_context_async):
+        pool = PagePool(mock_context_async.new_page, Config(page_pool_min_size=0, page_pool_max_size=1), URLS)
+        first = await pool.checkout("gpt")
+        second = await pool.checkout("gpt")
+        await pool.checkin("gpt", first)
+        await pool.checkin("gpt", second)
+        await settle(pool)
+        assert pool.stats()["gpt"]["idle"] == 1
+        second.close.assert_awaited_once()
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_evicts_idle_pages(self, mock_context_async):
+        pool = PagePool(mock_context_async.new_page, Config(page_pool_min_size=0, page_pool_idle_ttl=10), URLS)
+        page = await pool.checkout("gpt")
+        await pool.checkin("gpt", page)
+        await settle(pool)
+
+        with patch("aionui.page_pool.time.monotonic", return_value=pool._idle["gpt"][0][1] + 11):
+            pool.evict_idle()
+        await settle(pool)
+        assert pool.stats()["gpt"]["idle"] == 0
+        page.close.assert_awaited_once()
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_waits_until_page_is_ready(self, mock_context_async):
+        instance = Mock(install_runtime=AsyncMock(), wait_until_ready=AsyncMock())
+        new_model = Mock(return_value=instance)
+        pool = PagePool(mock_context_async.new_page, Config(page_pool_min_size=0), URLS, new_model)
+
+        page = await pool.checkout("claude")
+        new_model.assert_called_once_with("claude", page, "https://claude.ai/new")
+        instance.install_runtime.assert_awaited_once()
+        page.goto.assert_awaited_once_with("https://claude.ai/new")
+        instance.wait_until_ready.assert_awaited_once()
+        page.wait_for_timeout.assert_not_awaited()
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_model_async_uses_pool(self, mock_context_async):
+        aionui = AiOnUi(context=mock_context_async)
+        aionui.config.page_pool = True
+        aionui.config.page_pool_min_size = 0
+        with patch.object(GPTAsync, "wait_until_ready", AsyncMock()) as wait_until_ready:
+            async with aionui:
+                async with aionui.model_async("gpt") as model:
+                    first = model.page
+                await settle(aionui._page_pools["default"])
+                async with aionui.model_async("gpt") as model:
+                    assert model.page is first
+            assert wait_until_ready.await_count == 2
+        assert not aionui._page_pools
+        assert mock_context_async.new_page.await_count == 1
+        first.close.assert_awaited_once()
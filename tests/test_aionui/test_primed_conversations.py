@@ -0,0 +1,147 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from playwright.async_api import Page as AsyncPage
+from aionui import PrimedConversations
+from aionui.config import Config
+from aionui.models_async import ClaudeAsync
+from aionui.utils.common import INSTRUCTIONS
+
+
+@pytest.fixture
+def mock_page_async():
+    page = AsyncMock(spec=AsyncPage)
+    page.is_closed = Mock(return_value=False)
+    page.title = AsyncMock(return_value="Claude")
+    page.url = "https://claude.ai/chat/1"
+    return page
+
+
+async def settle(primed: PrimedConversations):
+    if primed._refill_task is not None:
+        await primed._refill_task
+
+
+class TestPrimedConversations:
+    @pytest.mark.asyncio
+    async def test_take_refills_in_background(self):
+        urls = iter(f"https://claude.ai/chat/{i}" for i in range(10))
+        prime = AsyncMock(side_effect=lambda: next(urls))
+        primed = PrimedConversations(prime, 2)
+
+        assert primed.take() is None
+        await settle(primed)
+        assert primed.ready() == 2
+
+        assert primed.take() == "https://claude.ai/chat/0"
+        await settle(primed)
+        assert primed.ready() == 2
+        assert prime.await_count == 3
+        await primed.close()
+        assert primed.ready() == 0
+
+    @pytest.mark.asyncio
+    async def test_start_fills_pool(self):
+        prime = AsyncMock(side_effect=lambda: "https://claude.ai/chat/1")
+        primed = PrimedConversations(prime, 1)
+
+        primed.start()
+        await settle(primed)
+        assert primed.take() == "https://claude.ai/chat/1"
+        await primed.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_priming_stops_refill(self):
+        prime = AsyncMock(side_effect=ValueError("Cloudflare detected"))
+        primed = PrimedConversations(prime, 2)
+
+        assert primed.take() is None
+        await settle(primed)
+        assert primed.ready() == 0
+        prime.assert_awaited_once()
+        await primed.close()
+
+    @pytest.mark.asyncio
+    async def test_close_cancels_refill(self):
+        started = asyncio.Event()
+
+        async def prime():
+            started.set()
+            await asyncio.sleep(60)
+
+        primed = PrimedConversations(prime, 1)
+        primed.take()
+        await started.wait()
+        await primed.close()
+        assert primed._refill_task is None
+
+
+class TestNewConversation:
+    @pytest.mark.asyncio
+    async def test_opens_primed_conversation(self, mock_page_async):
+        model = ClaudeAsync(Config(), mock_page_async)
+        model.primed_conversations = Mock(take=Mock(return_value="https://claude.ai/chat/1"))
+        with patch.object(ClaudeAsync, "wait_until_ready", AsyncMock()), patch.object(
+            ClaudeAsync, "init_instructions", AsyncMock()
+        ) as init_instructions:
+            await model.new_conversation()
+
+        mock_page_async.goto.assert_awaited_once_with("https://claude.ai/chat/1")
+        init_instructions.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_primes_without_ready_conversation(self, mock_page_async):
+        model = ClaudeAsync(Config(), mock_page_async)
+        model.primed_conversations = Mock(take=Mock(return_value=None))
+        with patch.object(ClaudeAsync, "wait_until_ready", AsyncMock()), patch.object(
+            ClaudeAsync, "init_instructions", AsyncMock()
+        ) as init_instructions:
+            await model.new_conversation()
+
+        mock_page_async.goto.assert_awaited_once_with(ClaudeAsync.url)
+        init_instructions.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_prime_returns_conversation_url(self, mock_page_async):
+        with patch.object(ClaudeAsync, "wait_until_ready", AsyncMock()) as wait_until_ready, patch.object(
+            ClaudeAsync, "init_instructions", AsyncMock()
+        ):
+            assert await ClaudeAsync(Config(), mock_page_async).prime() == "https://claude.ai/chat/1"
+
+        wait_until_ready.assert_awaited_once()
+        mock_page_async.wait_for_timeout.assert_not_awaited()
+
+
+class TestLazyPriming:
+    @pytest.mark.asyncio
+    async def test_prepends_instructions_to_first_message(self, mock_page_async):
+        model = ClaudeAsync(Config(), mock_page_async)
+        with patch.object(ClaudeAsync, "wait_until_ready", AsyncMock()):
+            await model.new_conversation(priming="lazy")
+
+        mock_page_async.goto.assert_awaited_once_with(ClaudeAsync.url)
+        message, _ = model.route_message("Hello!")
+        assert message == f"{INSTRUCTIONS}\nHello!"
+        assert model.route_message("Hello again!") == ("Hello again!", [])
+
+    @pytest.mark.asyncio
+    async def test_strips_echo_from_first_response(self, mock_page_async):
+        model = ClaudeAsync(Config(), mock_page_async)
+        with patch.object(ClaudeAsync, "wait_until_ready", AsyncMock()):
+            await model.new_conversation(priming="lazy")
+        model.route_message("Hello!")
+
+        echo = INSTRUCTIONS.splitlines()[0] + "\n" + INSTRUCTIONS.splitlines()[1].replace("-", "*") + "\n\nHi!"
+        assert model.format_captured(echo) == "Hi!"
+        assert model.format_captured(echo) == echo
+
+    @pytest.mark.asyncio
+    async def test_eager_priming_clears_lazy_state(self, mock_page_async):
+        model = ClaudeAsync(Config(), mock_page_async)
+        with patch.object(ClaudeAsync, "wait_until_ready", AsyncMock()), patch.object(
+            ClaudeAsync, "init_instructions", AsyncMock()
+        ):
+            await model.new_conversation(priming="lazy")
+            await model.new_conversation()
+
+        assert model.route_message("Hello!") == ("Hello!", [])
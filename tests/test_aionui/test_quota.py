@@ -0,0 +1,77 @@
+import json
+import time
+import pytest
+from aionui import QuotaManager
+from aionui.config import Config
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(quota_limits={"gpt": 2}, quota_window=60, quota_state_file=str(tmp_path / "quota.json"))
+
+
+class TestQuotaManager:
+    def test_throttles_within_window(self, config):
+        quota = QuotaManager(config)
+        assert quota.available("gpt")
+        quota.record("gpt")
+        quota.record("gpt")
+
+        assert quota.usage("gpt") == 2
+        assert not quota.available("gpt")
+        assert 59 < quota.wait_time("gpt") <= 60
+        assert quota.available("gpt", account="work")
+        assert quota.available("claude")
+
+    def test_window_rolls(self, config, monkeypatch):
+        quota = QuotaManager(config)
+        quota.record("gpt")
+        quota.record("gpt")
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 61)
+        assert quota.usage("gpt") == 0
+        assert quota.available("gpt")
+
+    def test_park(self, config):
+        quota = QuotaManager(config)
+        reset_at = time.time() + 3600
+        quota.park("claude", reset_at)
+
+        assert quota.parked_until("claude") == reset_at
+        assert not quota.available("claude")
+        assert 3599 < quota.wait_time("claude") <= 3600
+        assert quota.parked_until("claude", account="work") is None
+
+    def test_persists_across_runs(self, config):
+        quota = QuotaManager(config)
+        quota.record("gpt")
+        quota.park("gemini", time.time() + 600)
+        quota.park("deep_seek", time.time() - 1)
+
+        state = json.load(open(config.quota_state_file))
+        assert list(state["parked"]) == ["gemini/default"]
+
+        restored = QuotaManager(config)
+        assert restored.usage("gpt") == 1
+        assert not restored.available("gemini")
+        assert restored.available("deep_seek")
+
+    def test_merges_state_of_other_processes(self, config, tmp_path):
+        first = QuotaManager(config)
+        second = QuotaManager(config)
+        first.record("gpt")
+        second.record("gpt")
+        second.park("claude", time.time() + 600)
+        first.record("gemini")
+
+        restored = QuotaManager(config)
+        assert restored.usage("gpt") == 2
+        assert restored.usage("gemini") == 1
+        assert not restored.available("claude")
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["quota.json", "quota.json.lock"]
+
+    def test_ignores_unreadable_state(self, config):
+        with open(config.quota_state_file, "w") as file:
+            file.write("not json")
+        quota = QuotaManager(config)
+        assert quota.usage("gpt") == 0
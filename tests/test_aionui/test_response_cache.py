@@ -0,0 +1,91 @@
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock
+from aionui.config import Config
+from aionui.response_cache import ResponseCache
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(response_cache_file=str(tmp_path / "cache.sqlite3"), response_cache_memory_entries=2)
+
+
+def test_key(config, tmp_path):
+    cache = ResponseCache(config)
+    file = tmp_path / "data.txt"
+    file.write_text("data")
+
+    key = cache.key("gpt", "Hello  world\n", "text", ["search_the_web"], [str(file)])
+    assert key == cache.key("gpt", "Hello world", "text", ["search_the_web"], [str(file)])
+    assert key == cache.key("gpt", "Hello world", "text", ["search_the_web"], [{"name": "x", "buffer": b"data"}])
+    assert key != cache.key("claude", "Hello world", "text", ["search_the_web"], [str(file)])
+    assert key != cache.key("gpt", "Hello world", "json", ["search_the_web"], [str(file)])
+    assert key != cache.key("gpt", "Hello world", "text", [], [str(file)])
+
+    file.write_text("other data")
+    assert key != cache.key("gpt", "Hello world", "text", ["search_the_web"], [str(file)])
+
+
+def test_shared_across_instances(config):
+    ResponseCache(config).set("key", "response")
+
+    cache = ResponseCache(config)
+    assert cache.get("key") == "response"
+    assert cache.get("other") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl(config):
+    config.response_cache_ttl = 0.05
+    cache = ResponseCache(config)
+    cache.set("key", "response")
+    assert cache.get("key") == "response"
+
+    time.sleep(0.06)
+    assert cache.get("key") is None
+    assert ResponseCache(config).get("key") is None
+
+
+def test_evicts_least_recently_used(config):
+    config.response_cache_max_entries = 2
+    cache = ResponseCache(config)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    time.sleep(0.01)
+    ResponseCache(config).get("a")
+    cache.set("c", "3")
+
+    fresh = ResponseCache(config)
+    assert fresh.get("a") == "1"
+    assert fresh.get("b") is None
+    assert fresh.get("c") == "3"
+
+
+@pytest.mark.asyncio
+async def test_wrap_async(config):
+    cache = ResponseCache(config)
+
+    async def chat(message, expected_result="text", tools=[], attachments=[]):
+        return await sent(message)
+
+    sent = AsyncMock(side_effect=lambda message: f"re: {message}")
+    cached = cache.wrap(chat, "gpt")
+
+    assert await cached("Hello") == "re: Hello"
+    assert await cached("Hello", "text") == "re: Hello"
+    assert await cached("Hello", tools=["search_the_web"]) == "re: Hello"
+    assert await cached("Draw", "image") == "re: Draw"
+    assert await cached("Draw", "image") == "re: Draw"
+    assert sent.await_count == 4
+
+
+def test_wrap_sync(config):
+    cache = ResponseCache(config)
+    sent = Mock(return_value="response")
+
+    def chat(message, expected_result="text"):
+        return sent(message)
+
+    cached = cache.wrap(chat, "claude")
+    assert cached("Hello") == cached("Hello") == "response"
+    sent.assert_called_once()
@@ -0,0 +1,175 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+from playwright.async_api import Page as AsyncPage, BrowserContext as AsyncBrowserContext
+from aionui import AiOnUi, ChatScheduler, QuotaManager
+from aionui.config import Account, Config
+from aionui.exceptions import QuotaExceededException
+from aionui.models_async import GPTAsync
+
+
+@pytest.fixture
+def aionui():
+    context = AsyncMock(spec=AsyncBrowserContext)
+    context.new_page = AsyncMock(side_effect=lambda: AsyncMock(spec=AsyncPage))
+    return AiOnUi(context=context)
+
+
+@pytest.fixture
+def gate():
+    return asyncio.Event()
+
+
+@pytest.fixture
+def chats(gate):
+    calls = []
+
+    async def chat(message, expected_result="text", **kwargs):
+        calls.append(message)
+        if message == "blocker":
+            await gate.wait()
+        await asyncio.sleep(0)
+        if message == "fail":
+            raise ValueError(message)
+        if message == "limit":
+            raise QuotaExceededException("gpt", time.time() + 0.05)
+        return message.upper()
+
+    with patch.object(GPTAsync, "chat", new=AsyncMock(side_effect=chat)):
+        yield calls
+
+
+async def wait_until_running(scheduler: ChatScheduler, count: int):
+    while scheduler.stats()["gpt"]["in_flight"] < count:
+        await asyncio.sleep(0)
+
+
+class TestChatScheduler:
+    @pytest.mark.asyncio
+    async def test_limits_in_flight_pages(self, aionui, chats, gate):
+        scheduler = ChatScheduler(aionui, limits={"gpt": 2})
+        jobs = [asyncio.create_task(scheduler.submit("blocker")) for _ in range(5)]
+        await wait_until_running(scheduler, 2)
+        await asyncio.sleep(0)
+
+        stats = scheduler.stats()["gpt"]
+        assert (stats["in_flight"], stats["queued"], stats["limit"]) == (2, 3, 2)
+        gate.set()
+        assert await asyncio.gather(*jobs) == ["BLOCKER"] * 5
+        assert scheduler.stats()["gpt"]["completed"] == 5
+
+    @pytest.mark.asyncio
+    async def test_priority_runs_first(self, aionui, chats, gate):
+        scheduler = ChatScheduler(aionui, limits={"gpt": 1})
+        blocker = asyncio.create_task(scheduler.submit("blocker"))
+        await wait_until_running(scheduler, 1)
+        jobs = [
+            asyncio.create_task(scheduler.submit("low", priority=5)),
+            asyncio.create_task(scheduler.submit("high", priority=0)),
+        ]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(blocker, *jobs)
+        assert chats == ["blocker", "high", "low"]
+
+    @pytest.mark.asyncio
+    async def test_fair_queuing_between_tenants(self, aionui, chats, gate):
+        scheduler = ChatScheduler(aionui, limits={"gpt": 1}, weights={"interactive": 2})
+        blocker = asyncio.create_task(scheduler.submit("blocker", tenant="bulk"))
+        await wait_until_running(scheduler, 1)
+        jobs = [asyncio.create_task(scheduler.submit(f"bulk{i}", tenant="bulk")) for i in range(4)]
+        jobs += [asyncio.create_task(scheduler.submit(f"interactive{i}", tenant="interactive")) for i in range(4)]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(blocker, *jobs)
+        assert chats[1:] == [
+            "interactive0",
+            "bulk0",
+            "interactive1",
+            "interactive2",
+            "bulk1",
+            "interactive3",
+            "bulk2",
+            "bulk3",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failure_and_cancellation(self, aionui, chats, gate):
+        scheduler = ChatScheduler(aionui, limits={"gpt": 1})
+        with pytest.raises(ValueError):
+            await scheduler.submit("fail")
+
+        blocker = asyncio.create_task(scheduler.submit("blocker"))
+        await wait_until_running(scheduler, 1)
+        queued = asyncio.create_task(scheduler.submit("queued"))
+        await asyncio.sleep(0)
+        queued.cancel()
+        gate.set()
+        assert await blocker == "BLOCKER"
+        assert "queued" not in chats
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_quota_throttles_dispatch(self, aionui, chats, tmp_path):
+        config = Config(quota_limits={"gpt": 2}, quota_window=0.1, quota_state_file=str(tmp_path / "quota.json"))
+        quota = QuotaManager(config)
+        scheduler = ChatScheduler(aionui, limits={"gpt": 4}, quota=quota)
+        jobs = [asyncio.create_task(scheduler.submit(f"job{i}")) for i in range(3)]
+        await asyncio.sleep(0.01)
+
+        assert chats == ["job0", "job1"]
+        assert scheduler.stats()["gpt"]["quota_wait"] > 0
+        assert await asyncio.gather(*jobs) == ["JOB0", "JOB1", "JOB2"]
+
+    @pytest.mark.asyncio
+    async def test_quota_parks_and_requeues(self, aionui, tmp_path):
+        attempts = []
+
+        async def chat(message, expected_result="text", **kwargs):
+            attempts.append(message)
+            if len(attempts) == 1:
+                raise QuotaExceededException("gpt", time.time() + 0.05)
+            return message.upper()
+
+        quota = QuotaManager(Config(quota_state_file=str(tmp_path / "quota.json")))
+        scheduler = ChatScheduler(aionui, quota=quota)
+        with patch.object(GPTAsync, "chat", new=AsyncMock(side_effect=chat)):
+            job = asyncio.create_task(scheduler.submit("hello"))
+            await asyncio.sleep(0.01)
+            assert quota.parked_until("gpt") is not None
+            assert not job.done()
+            assert await job == "HELLO"
+        assert attempts == ["hello", "hello"]
+        assert scheduler.stats()["gpt"]["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_quota_exception_without_manager(self, aionui, chats):
+        scheduler = ChatScheduler(aionui)
+        with pytest.raises(QuotaExceededException):
+            await scheduler.submit("limit")
+
+    @pytest.mark.asyncio
+    async def test_quota_skips_parked_account(self, aionui, chats, tmp_path):
+        aionui.config.accounts = [Account(name="personal"), Account(name="work")]
+        quota = QuotaManager(Config(quota_state_file=str(tmp_path / "quota.json")))
+        quota.park("gpt", time.time() + 3600, "personal")
+        scheduler = ChatScheduler(aionui, limits={"gpt": 2}, quota=quota)
+
+        assert await asyncio.gather(scheduler.submit("a"), scheduler.submit("b")) == ["A", "B"]
+        assert quota.usage("gpt", "work") == 2
+        assert quota.usage("gpt", "personal") == 0
+        assert scheduler.stats()["gpt"]["quota_wait"] == 0
+
+    @pytest.mark.asyncio
+    async def test_coalesces_identical_jobs(self, aionui, chats, gate):
+        aionui.config.coalesce_chats = True
+        scheduler = ChatScheduler(aionui, limits={"gpt": 4})
+        jobs = [asyncio.create_task(scheduler.submit("blocker")) for _ in range(3)]
+        jobs.append(asyncio.create_task(scheduler.submit("blocker", expected_result="code")))
+        await wait_until_running(scheduler, 2)
+        gate.set()
+
+        assert await asyncio.gather(*jobs) == ["BLOCKER"] * 4
+        assert chats == ["blocker", "blocker"]
+        assert scheduler.stats()["gpt"]["coalesced"] == 2
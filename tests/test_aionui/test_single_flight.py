@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from aionui.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_shares_result():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(flight.do("key", call, "gpt") for _ in range(3)), flight.do("other", call))
+
+    assert results == ["result"] * 4
+    assert len(calls) == 2
+    assert flight.coalesced == {"gpt": 2}
+    assert flight.in_flight() == 0
+    assert await flight.do("key", call) == "result"
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_shares_error():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(flight.do("key", call), flight.do("key", call), return_exceptions=True)
+    assert [type(result) for result in results] == [ValueError, ValueError]
+
+
+@pytest.mark.asyncio
+async def test_takes_over_when_first_caller_is_cancelled():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def call():
+        started.set()
+        await asyncio.sleep(0.01)
+        return "result"
+
+    first = asyncio.create_task(flight.do("key", call))
+    await started.wait()
+    second = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert flight.coalesced == {}
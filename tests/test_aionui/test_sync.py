@@ -93,12 +93,13 @@ class TestAiOnUiSync:
             assert model.page == mock_page
         assert mock_playwright.chromium.connect_over_cdp.call_count == 1
         assert mock_page.close.call_count == 1
-        assert mock_context.close.call_count == 1
+        assert mock_context.close.call_count == 0
         assert mock_browser.close.call_count == 1
 
     def test_clean_up_no_args(self, monkeypatch, mock_page, mock_context, mock_browser, mock_playwright):
         mock_popen = Mock()
         monkeypatch.setattr("subprocess.Popen", mock_popen)
+        monkeypatch.setattr("aionui.launcher.ChromeLauncher.is_ready", Mock(return_value=True))
 
         mock_playwright.chromium.connect_over_cdp.side_effect = [ConnectionError, mock_browser]
 
@@ -111,5 +112,81 @@ class TestAiOnUiSync:
 
             assert mock_popen.call_count == 1
             assert mock_page.close.call_count == 1
-            assert mock_context.close.call_count == 1
+            assert mock_context.close.call_count == 0
+            assert mock_browser.close.call_count == 1
+
+    def test_session_reuses_connection(self, mock_page, mock_context, mock_browser, mock_playwright):
+        with patch("aionui.aionui.sync_playwright") as mock_sync_playwright:
+            mock_sync_playwright.return_value.start.return_value = mock_playwright
+
+            with AiOnUi() as aionui:
+                with aionui.model_sync("gpt") as model:
+                    assert model.page == mock_page
+                with aionui.model_sync("claude") as model:
+                    assert model.page == mock_page
+                assert mock_browser.close.call_count == 0
+
+            assert mock_sync_playwright.return_value.start.call_count == 1
+            assert mock_playwright.chromium.connect_over_cdp.call_count == 1
+            assert mock_context.new_page.call_count == 2
+            assert mock_page.close.call_count == 2
+            assert mock_context.close.call_count == 0
             assert mock_browser.close.call_count == 1
+            assert mock_playwright.stop.call_count == 1
+
+    def test_session_closes_page_on_error(self, mock_page, mock_context, mock_playwright):
+        aionui = AiOnUi(playwright=mock_playwright)
+        aionui.start()
+        with pytest.raises(ValueError):
+            with aionui.model_sync("gpt"):
+                raise ValueError("chat failed")
+        assert mock_page.close.call_count == 1
+
+        aionui.close()
+        assert mock_context.close.call_count == 0
+        assert mock_playwright.stop.call_count == 0
+
+    def test_session_spreads_pages_across_instances(self, monkeypatch, mock_playwright):
+        mock_popen = Mock()
+        monkeypatch.setattr("subprocess.Popen", mock_popen)
+        monkeypatch.setattr("aionui.launcher.ChromeLauncher.is_ready", Mock(return_value=True))
+
+        shards = []
+        for _ in range(2):
+            context = Mock(spec=BrowserContext)
+            context.pages = []
+            context.new_page.side_effect = (
+                lambda context=context: context.pages.append(Mock(spec=Page)) or context.pages[-1]
+            )
+            browser = Mock(spec=Browser)
+            browser.contexts = [context]
+            shards.append(browser)
+        mock_playwright.chromium.connect_over_cdp.side_effect = [shards[0], ConnectionError, shards[1]]
+
+        aionui = AiOnUi(playwright=mock_playwright)
+        aionui.config.debug_port = 9300
+        aionui.config.instances = 2
+        aionui.config.user_data_dir = "profile"
+        with aionui:
+            with aionui.model_sync("gpt") as first, aionui.model_sync("gpt") as second:
+                assert first.page in shards[0].contexts[0].pages
+                assert second.page in shards[1].contexts[0].pages
+
+        assert mock_popen.call_args.args[0][1:] == ["--remote-debugging-port=9301", "--user-data-dir=profile-9301"]
+        for browser in shards:
+            assert browser.close.call_count == 1
+
+    def test_headless_launch_mode(self, mock_playwright, mock_context, mock_page):
+        mock_playwright.chromium.launch_persistent_context.return_value = mock_context
+
+        aionui = AiOnUi(playwright=mock_playwright)
+        aionui.config.launch_mode = "headless"
+        with aionui.model_sync("gpt") as model:
+            assert model.page == mock_page
+
+        options = mock_playwright.chromium.launch_persistent_context.call_args.kwargs
+        assert options["headless"] is True
+        assert "--disable-dev-shm-usage" in options["args"]
+        assert mock_playwright.chromium.connect_over_cdp.call_count == 0
+        assert mock_page.close.call_count == 1
+        assert mock_context.close.call_count == 1
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, Mock, patch
+from playwright.async_api import Browser as AsyncBrowser, BrowserContext as AsyncBrowserContext, Page as AsyncPage
+from playwright.async_api import Playwright as AsyncPlaywright
+from aionui import AiOnUi, EventLoopThread, SyncModel
+from aionui.chat_chunk import ChatChunk
+from aionui.models_async import GPTAsync
+
+
+@pytest.fixture
+def event_loop_thread():
+    event_loop = EventLoopThread()
+    yield event_loop
+    event_loop.close()
+
+
+@pytest.fixture
+def mock_playwright_async():
+    context = AsyncMock(spec=AsyncBrowserContext)
+    context.new_page = AsyncMock(side_effect=lambda: AsyncMock(spec=AsyncPage))
+    browser = AsyncMock(spec=AsyncBrowser)
+    browser.contexts = [context]
+    playwright = AsyncMock(spec=AsyncPlaywright)
+    playwright.chromium.connect_over_cdp = AsyncMock(return_value=browser)
+    return playwright
+
+
+class TestEventLoopThread:
+    def test_runs_coroutines_from_threads(self, event_loop_thread):
+        async def work(value):
+            await asyncio.sleep(0.2)
+            return value, threading.current_thread().name
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(lambda value: event_loop_thread.run(work(value)), range(4)))
+
+        assert results == [(value, "aionui-event-loop") for value in range(4)]
+        assert time.monotonic() - started < 0.6
+
+    def test_timeout_cancels_coroutine(self, event_loop_thread):
+        cancelled = threading.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(TimeoutError):
+            event_loop_thread.run(work(), timeout=0.1)
+        assert cancelled.wait(1)
+
+    def test_run_from_loop_thread_raises(self, event_loop_thread):
+        async def nested():
+            return event_loop_thread.run(asyncio.sleep(0))
+
+        with pytest.raises(RuntimeError):
+            event_loop_thread.run(nested())
+
+    def test_close_stops_thread(self, event_loop_thread):
+        event_loop_thread.run(asyncio.sleep(0))
+        assert event_loop_thread.is_running()
+        event_loop_thread.close()
+        assert not event_loop_thread.is_running()
+
+
+class TestSyncModel:
+    def test_blocks_on_coroutines_and_iterates_generators(self, event_loop_thread):
+        class Model:
+            url = "https://chatgpt.com"
+
+            async def chat(self, message):
+                return message.upper()
+
+            async def chat_stream(self, message):
+                yield ChatChunk("a", "a")
+                yield ChatChunk("", "a", done=True)
+
+        model = SyncModel(Model(), event_loop_thread)
+        assert model.url == "https://chatgpt.com"
+        assert model.chat("hello") == "HELLO"
+        assert [chunk.done for chunk in model.chat_stream("hello")] == [False, True]
+
+
+class TestSyncBridge:
+    def test_model_sync_drives_async_model(self, mock_playwright_async):
+        aionui = AiOnUi(playwright=mock_playwright_async)
+        aionui.config.sync_bridge = True
+
+        async def chat(self, message, expected_result="text", **kwargs):
+            await asyncio.sleep(0.2)
+            return message
+
+        with patch.object(GPTAsync, "chat", chat), aionui:
+            with aionui.model_sync("gpt") as model:
+                assert isinstance(model, SyncModel)
+                assert isinstance(model.model, GPTAsync)
+
+            started = time.monotonic()
+
+            def run(message):
+                with aionui.model_sync("gpt") as model:
+                    return model.chat(message)
+
+            with ThreadPoolExecutor(3) as executor:
+                assert list(executor.map(run, ["a", "b", "c"])) == ["a", "b", "c"]
+            assert time.monotonic() - started < 0.5
+
+        assert aionui._event_loop is None
+
+    def test_model_sync_closes_page_on_error(self, mock_playwright_async):
+        aionui = AiOnUi(playwright=mock_playwright_async)
+        aionui.config.sync_bridge = True
+        with pytest.raises(ValueError):
+            with aionui.model_sync("gpt") as model:
+                page = model.model.page
+                raise ValueError("chat failed")
+        page.close.assert_awaited_once()
+        aionui.close()
+
+    def test_sync_components_keep_sync_models(self):
+        aionui = AiOnUi(page=Mock())
+        aionui.config.sync_bridge = True
+        assert not aionui._bridged()
@@ -0,0 +1,434 @@
+import asyncio
+import json
+import shutil
+import subprocess
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock, patch
+from playwright.async_api import Error, Page as AsyncPage, TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import Page as SyncPage
+from aionui.config import Config
+from aionui.exceptions import QuotaExceededException
+from aionui.models import Claude
+from aionui.models_async import ClaudeAsync, DeepSeekAsync, GeminiAsync, GPTAsync
+from aionui.models_async.gpt_async import RESPONSE_STATE as GPT_RESPONSE_STATE
+
+
+@pytest.fixture
+def mock_page_async():
+    page = AsyncMock(spec=AsyncPage)
+    page.is_closed = Mock(return_value=False)
+    locator = Mock()
+    locator.first.click = AsyncMock()
+    page.locator = Mock(return_value=locator)
+    page.keyboard = Mock(insert_text=AsyncMock())
+    return page
+
+
+class TestWaitForResponse:
+    @pytest.mark.asyncio
+    async def test_resolves_on_reported_state(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(return_value="done")
+        await ClaudeAsync(Config(), mock_page_async).wait_for_response(2)
+
+        script, (timeout, previous) = mock_page_async.evaluate.await_args.args
+        assert "MutationObserver" in script
+        assert previous == 2
+        assert 0 < timeout <= 30000
+        mock_page_async.wait_for_timeout.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_gpt_continues_generation(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(side_effect=["continue", "done"])
+        await GPTAsync(Config(), mock_page_async).wait_for_response()
+
+        mock_page_async.locator.return_value.first.click.assert_awaited_once()
+        assert mock_page_async.evaluate.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_gpt_limit_raises(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(return_value="limit")
+        mock_page_async.locator.return_value.count = AsyncMock(return_value=0)
+        with pytest.raises(QuotaExceededException):
+            await GPTAsync(Config(), mock_page_async).wait_for_response()
+
+    @pytest.mark.asyncio
+    async def test_survives_navigation(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(side_effect=[Error("Execution context was destroyed"), "done"])
+        await ClaudeAsync(Config(), mock_page_async).wait_for_response()
+        assert mock_page_async.evaluate.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_times_out(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(return_value=None)
+        with pytest.raises(TimeoutError):
+            await ClaudeAsync(Config(response_timeout=0.01), mock_page_async).wait_for_response()
+
+    def test_sync(self):
+        page = Mock(spec=SyncPage)
+        page.evaluate = Mock(side_effect=[None, "done"])
+        Claude(Config(), page).wait_for_response(1)
+        assert page.evaluate.call_count == 2
+        assert page.evaluate.call_args.args[1][1] == 1
+
+
+def mock_stream(page, body: str, url: str = "https://claude.ai/api/organizations/o/chat_conversations/c/completion"):
+    response = Mock()
+    response.url = url
+    response.request.method = "POST"
+    response.text = AsyncMock(return_value=body)
+
+    @asynccontextmanager
+    async def expect_response(predicate, timeout):
+        info = Mock()
+        info.value = asyncio.get_running_loop().create_future()
+        yield info
+        if predicate(response):
+            info.value.set_result(response)
+        else:
+            raise PlaywrightTimeoutError("Timeout")
+
+    page.expect_response = expect_response
+    return response
+
+
+class TestResponseCapture:
+    @pytest.mark.asyncio
+    async def test_captures_stream(self, mock_page_async):
+        body = 'data: {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "```py\\nx = {}\\n```"}}'
+        mock_stream(mock_page_async, body)
+        model = ClaudeAsync(Config(), mock_page_async)
+        button = AsyncMock()
+
+        assert await model.submit_and_capture(button) == "```py\nx = {}\n```"
+        button.click.assert_awaited_once()
+        assert model.format_captured("```py\nx = {}\n```", "code") == "x = {}"
+
+    @pytest.mark.asyncio
+    async def test_no_stream_falls_back(self, mock_page_async):
+        mock_stream(mock_page_async, "", url="https://claude.ai/api/other")
+        button = AsyncMock()
+        assert await ClaudeAsync(Config(), mock_page_async).submit_and_capture(button) is None
+        button.click.assert_awaited_once()
+
+
+class TestChatStream:
+    @pytest.mark.asyncio
+    async def test_yields_deltas_then_final_response(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(
+            side_effect=[
+                {"delta": "Hel", "state": None},
+                {"delta": "lo", "state": None},
+                {"delta": "!", "state": "done"},
+            ]
+        )
+        model = ClaudeAsync(Config(), mock_page_async)
+        model.prepare_message = AsyncMock()
+        model.get_submit_button = AsyncMock()
+        model.count_responses = AsyncMock(return_value=1)
+        model.get_text_response = AsyncMock(return_value="Hello!")
+
+        chunks = [chunk async for chunk in model.chat_stream("Hi")]
+
+        assert [(chunk.delta, chunk.text, chunk.done) for chunk in chunks] == [
+            ("Hel", "Hel", False),
+            ("lo", "Hello", False),
+            ("!", "Hello!", False),
+            ("", "Hello!", True),
+        ]
+        sent = [call.args[1][1] for call in mock_page_async.evaluate.await_args_list]
+        assert sent == [[1, 0], [1, 3], [1, 5]]
+        model.prepare_message.assert_awaited_once_with("Hi", "text")
+
+    @pytest.mark.asyncio
+    async def test_gpt_continues_generation(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(
+            side_effect=[{"delta": "a", "state": "continue"}, {"delta": "b", "state": "done"}]
+        )
+        model = GPTAsync(Config(), mock_page_async)
+        model.prepare_message = AsyncMock()
+        model.get_submit_button = AsyncMock()
+        model.count_responses = AsyncMock(return_value=0)
+        model.get_code_block_response = AsyncMock(return_value="ab")
+
+        chunks = [chunk async for chunk in model.chat_stream("Hi", expected_result="code", tools=["search_the_web"])]
+
+        assert [chunk.delta for chunk in chunks] == ["a", "b", ""]
+        assert chunks[-1].text == "ab"
+        mock_page_async.locator.return_value.first.click.assert_awaited_once()
+        model.prepare_message.assert_awaited_once_with("Hi", "code", tools=["search_the_web"])
+
+    def test_sync(self):
+        page = Mock(spec=SyncPage)
+        page.evaluate = Mock(side_effect=[{"delta": "Hi", "state": None}, {"delta": "", "state": "done"}])
+        model = Claude(Config(), page)
+        model.prepare_message = Mock()
+        model.get_submit_button = Mock()
+        model.count_responses = Mock(return_value=0)
+        model.get_text_response = Mock(return_value="Hi")
+
+        chunks = list(model.chat_stream("Hello"))
+
+        assert [(chunk.delta, chunk.done) for chunk in chunks] == [("Hi", False), ("", True)]
+
+
+class TestReadCopied:
+    @pytest.mark.asyncio
+    async def test_returns_text_copied_in_page(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(side_effect=[None, "```py\nx = 1\n```"])
+        copy = AsyncMock()
+
+        assert await ClaudeAsync(Config(), mock_page_async).read_copied(copy) == "```py\nx = 1\n```"
+        copy.assert_awaited_once()
+        assert "__aionuiClipboard" in mock_page_async.evaluate.await_args_list[0].args[0]
+
+    @pytest.mark.asyncio
+    async def test_nothing_copied(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(return_value=None)
+        with pytest.raises(ValueError):
+            await ClaudeAsync(Config(), mock_page_async).read_copied(AsyncMock(), timeout=0.01)
+
+    def test_sync(self):
+        page = Mock(spec=SyncPage)
+        page.evaluate = Mock(side_effect=[None, "copied"])
+        copy = Mock()
+        assert Claude(Config(), page).read_copied(copy) == "copied"
+        copy.assert_called_once()
+
+
+class TestSnapshot:
+    @pytest.mark.asyncio
+    async def test_single_evaluate(self, mock_page_async):
+        snapshot = {"input_ready": True, "responses": 2, "last_response": "Hello!"}
+        mock_page_async.evaluate = AsyncMock(return_value=snapshot)
+        model = ClaudeAsync(Config(), mock_page_async)
+
+        assert await model.snapshot(1) == snapshot
+        assert await model.get_text_response() == "Hello!"
+
+        mock_page_async.add_init_script.assert_awaited_once()
+        assert "__aionui" in mock_page_async.add_init_script.await_args.args[0]
+        assert mock_page_async.evaluate.await_args_list[0].args[1] == ["ClaudeAsync", 1]
+        assert mock_page_async.evaluate.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_getters_read_snapshot(self, mock_page_async):
+        snapshot = {"input_ready": True, "send_found": True, "responses": 2, "code_blocks": ["a = 1", "b = 2"]}
+        mock_page_async.evaluate = AsyncMock(return_value=snapshot)
+        mock_page_async.locator = Mock()
+        model = DeepSeekAsync(Config(), mock_page_async)
+
+        assert await model.get_input_field() is mock_page_async.locator.return_value.first
+        mock_page_async.locator.assert_called_with('textarea[id="chat-input"]')
+        await model.get_submit_button()
+        mock_page_async.locator.assert_called_with('.f6d670[role="button"]')
+        assert await model.count_responses() == 2
+        assert await model.get_code_block_response() == "b = 2"
+
+        assert mock_page_async.evaluate.await_count == 4
+        mock_page_async.locator.return_value.count.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_getters_raise_without_elements(self, mock_page_async):
+        snapshot = {"input_ready": False, "send_found": False, "responses": 1, "code_blocks": []}
+        mock_page_async.evaluate = AsyncMock(return_value=snapshot)
+        model = ClaudeAsync(Config(), mock_page_async)
+
+        for getter in (model.get_input_field, model.get_submit_button, model.get_code_block_response):
+            with pytest.raises(ValueError):
+                await getter()
+
+    @pytest.mark.asyncio
+    async def test_gpt_getters_read_snapshot(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(return_value={"input_ready": True, "send_found": False})
+        speech_button = Mock(count=AsyncMock(return_value=1))
+        mock_page_async.locator = Mock(return_value=speech_button)
+        model = GPTAsync(Config(), mock_page_async)
+
+        assert await model.get_input_field() is speech_button.first
+        mock_page_async.locator.assert_called_with("#prompt-textarea")
+        assert await model.get_submit_button() is speech_button.first
+        mock_page_async.locator.assert_called_with('[data-testid="composer-speech-button"]')
+        assert mock_page_async.evaluate.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_installs_in_loaded_document(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(side_effect=[None, None, {"last_response": None}])
+        model = ClaudeAsync(Config(), mock_page_async)
+
+        with pytest.raises(ValueError):
+            await model.get_text_response()
+        assert "__aionui" in mock_page_async.evaluate.await_args_list[1].args[0]
+
+    @pytest.mark.asyncio
+    async def test_wait_until_ready(self, mock_page_async):
+        mock_page_async.evaluate = AsyncMock(side_effect=[None, "ready"])
+        await GPTAsync(Config(), mock_page_async).wait_until_ready()
+
+        assert mock_page_async.evaluate.await_args.args[1][1] == "GPTAsync"
+        mock_page_async.add_init_script.assert_awaited_once()
+
+    def test_sync(self):
+        page = Mock(spec=SyncPage)
+        page.evaluate = Mock(return_value={"last_response": "Hi"})
+        model = Claude(Config(), page)
+        assert model.get_text_response() == "Hi"
+        assert model.get_text_response() == "Hi"
+        page.add_init_script.assert_called_once()
+
+
+class TestPasteMessage:
+    @pytest.mark.asyncio
+    async def test_pastes_once(self, mock_page_async):
+        input_field = AsyncMock()
+        input_field.evaluate = AsyncMock(return_value=True)
+        mock_page_async.locator = Mock(return_value=Mock(count=AsyncMock(return_value=1), first=input_field))
+        mock_page_async.evaluate = AsyncMock(return_value="filled")
+        message = "\n".join(f"line {i}" for i in range(1000))
+
+        with patch.object(ClaudeAsync, "snapshot", AsyncMock(return_value={"input_ready": True})):
+            await ClaudeAsync(Config(), mock_page_async).fill_message(message)
+
+        assert input_field.evaluate.await_args.args[1] == message
+        input_field.type.assert_not_awaited()
+        mock_page_async.keyboard.insert_text.assert_not_awaited()
+        assert mock_page_async.evaluate.await_args.args[1][1] == ['[contenteditable="true"]', message]
+        mock_page_async.wait_for_timeout.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_inserts_when_paste_is_ignored(self, mock_page_async):
+        input_field = AsyncMock()
+        input_field.evaluate = AsyncMock(return_value=False)
+        mock_page_async.locator = Mock(return_value=Mock(count=AsyncMock(return_value=1), first=input_field))
+        mock_page_async.evaluate = AsyncMock(return_value="filled")
+
+        with patch.object(DeepSeekAsync, "snapshot", AsyncMock(return_value={"input_ready": True})):
+            await DeepSeekAsync(Config(), mock_page_async).fill_message("a\nb")
+
+        mock_page_async.keyboard.insert_text.assert_awaited_once_with("a\nb")
+
+    @pytest.mark.asyncio
+    async def test_not_filled(self, mock_page_async):
+        input_field = AsyncMock()
+        mock_page_async.locator = Mock(return_value=Mock(count=AsyncMock(return_value=1), first=input_field))
+        mock_page_async.evaluate = AsyncMock(return_value=None)
+
+        with patch.object(GeminiAsync, "snapshot", AsyncMock(return_value={"input_ready": True})):
+            with pytest.raises(ValueError):
+                await GeminiAsync(Config(), mock_page_async).paste_message("a", timeout=0.01)
+
+
+class TestAttachments:
+    @pytest.fixture
+    def file_input(self, mock_page_async):
+        file_input = AsyncMock()
+        file_input.get_attribute = AsyncMock(return_value="")
+        file_input.first = file_input
+        mock_page_async.locator = Mock(return_value=file_input)
+        mock_page_async.evaluate = AsyncMock(return_value="attached")
+        return file_input
+
+    @pytest.mark.asyncio
+    async def test_text_as_file_uploads_from_memory(self, mock_page_async, file_input, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        name = await GPTAsync(Config(), mock_page_async).text_as_file("Xin chào")
+
+        (payload,) = file_input.set_input_files.await_args.args[0]
+        assert name == payload["name"] != "attachment.txt"
+        assert payload["buffer"] == "Xin chào".encode("utf-8")
+        assert mock_page_async.evaluate.await_args.args[1][1] == [name]
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_attaches_all_files_at_once(self, mock_page_async, file_input):
+        await GPTAsync(Config(), mock_page_async).attach_files(["/tmp/a.txt", "/tmp/b.csv"])
+
+        file_input.set_input_files.assert_awaited_once_with(["/tmp/a.txt", "/tmp/b.csv"])
+        assert mock_page_async.evaluate.await_count == 1
+        assert mock_page_async.evaluate.await_args.args[1][1] == ["a.txt", "b.csv"]
+        mock_page_async.wait_for_timeout.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_single_file_input(self, mock_page_async, file_input):
+        file_input.get_attribute = AsyncMock(return_value=None)
+        await ClaudeAsync(Config(), mock_page_async).attach_files(["/tmp/a.txt", "/tmp/b.csv"])
+        assert file_input.set_input_files.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_not_attached(self, mock_page_async, file_input):
+        mock_page_async.evaluate = AsyncMock(return_value=None)
+        with pytest.raises(ValueError):
+            await ClaudeAsync(Config(), mock_page_async).attach_files(["/tmp/a.txt"], timeout=0.01)
+
+    def test_routes_long_messages(self):
+        model = Claude(Config(inline_message_limit=10), Mock(spec=SyncPage))
+
+        assert model.route_message("short", ["/tmp/a.txt"]) == ("short", ["/tmp/a.txt"])
+
+        message, attachments = model.route_message("a long message", ["/tmp/a.txt"])
+        assert attachments[0] == "/tmp/a.txt"
+        assert attachments[1]["buffer"] == b"a long message"
+        assert attachments[1]["name"] in message
+
+        assert Claude(Config(inline_message_limit=0), Mock(spec=SyncPage)).route_message("a long message")[1] == []
+
+
+# A DOM just large enough for the state predicates: elements built from [tag, attributes, ...children]
+FAKE_DOM = r"""
+const matches = (element, selector) =>
+    selector.split(",").some((part) => {
+        const [, tag, className, attribute, operator, value] = part
+            .trim()
+            .match(/^([a-z]*)(?:\.([\w-]+))?(?:\[([\w-]+)(?:(\*?=)"([^"]*)")?\])?$/);
+        if (tag && element.tag !== tag) return false;
+        if (className && !(element.attributes.class || "").split(" ").includes(className)) return false;
+        if (!attribute) return true;
+        const actual = element.attributes[attribute];
+        if (actual === undefined) return false;
+        if (operator === "=") return actual === value;
+        if (operator === "*=") return actual.includes(value);
+        return true;
+    });
+class Element {
+    constructor([tag, attributes, ...children], parent = null) {
+        Object.assign(this, {tag, attributes, parent});
+        this.children = children.map((child) => (typeof child === "string" ? child : new Element(child, this)));
+    }
+    get textContent() {
+        return this.children.map((child) => (typeof child === "string" ? child : child.textContent)).join("");
+    }
+    querySelectorAll(selector) {
+        const elements = this.children.filter((child) => typeof child !== "string");
+        return elements.flatMap((child) => [
+            ...(matches(child, selector) ? [child] : []),
+            ...child.querySelectorAll(selector),
+        ]);
+    }
+    closest(selector) {
+        return matches(this, selector) ? this : this.parent && this.parent.closest(selector);
+    }
+}
+globalThis.document = new Element(["html", {}, ...%s]);
+console.log(JSON.stringify((%s)(0)));
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+class TestGptLimitState:
+    def evaluate(self, *body):
+        script = FAKE_DOM % (json.dumps(body), GPT_RESPONSE_STATE)
+        return json.loads(subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout)
+
+    def test_limit_banner(self):
+        banner = ["div", {"class": "text-token-banner"}, "You've hit your limit. Please try again later."]
+        assert self.evaluate(banner, ["form", {}, ["div", {"contenteditable": "true"}, ""]]) == "limit"
+
+    def test_limit_phrase_in_assistant_message(self):
+        answer = ["div", {"data-message-author-role": "assistant"}, "Retry once you reached the rate limit reset."]
+        assert self.evaluate(["main", {}, ["article", {}, answer]], ["form", {}]) is None
+
+    def test_limit_phrase_in_user_message_and_draft(self):
+        question = ["div", {"data-message-author-role": "user"}, "What happens when I hit your usage cap?"]
+        draft = ["div", {"contenteditable": "true"}, "What if I reached the daily limit?"]
+        assert self.evaluate(["article", {}, question], ["form", {}, draft]) is None
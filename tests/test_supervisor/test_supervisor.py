@@ -0,0 +1,123 @@
+import json
+import os
+import signal
+import pytest
+from unittest.mock import Mock
+from aionui import AiOnUi
+from aionui.config import Config
+from aionui.supervisor import ChromeSupervisor
+from aionui.utils.common import read_supervisor_state
+
+
+@pytest.fixture
+def mock_popen(monkeypatch):
+    processes = []
+
+    def popen(command):
+        process = Mock(pid=1000 + len(processes))
+        process.poll.return_value = None
+        processes.append(process)
+        return process
+
+    mock = Mock(side_effect=popen, processes=processes)
+    monkeypatch.setattr("subprocess.Popen", mock)
+    return mock
+
+
+@pytest.fixture
+def supervisor(tmp_path):
+    config = Config(chrome_binary_path="chrome", debug_port=9300, instances=2, user_data_dir="profile")
+    supervisor = ChromeSupervisor(config, str(tmp_path / "state.json"))
+    supervisor.launcher.wait_until_ready = Mock(return_value=0.1)
+    return supervisor
+
+
+def test_start_launches_instances_and_writes_state(monkeypatch, mock_popen, supervisor):
+    supervisor.launcher.is_ready = Mock(return_value=False)
+    supervisor.start()
+
+    state = read_supervisor_state(supervisor.state_file)
+    assert state["pid"] == os.getpid()
+    assert state["ports"] == [9300, 9301]
+    assert [(i["port"], i["pid"], i["user_data_dir"]) for i in state["instances"]] == [
+        (9300, 1000, "profile-9300"),
+        (9301, 1001, "profile-9301"),
+    ]
+
+
+def test_check_restarts_crashed_instance(mock_popen, supervisor):
+    supervisor.launcher.is_ready = Mock(return_value=False)
+    supervisor.start()
+    supervisor.launcher.is_ready = Mock(return_value=True)
+    mock_popen.processes[0].poll.return_value = -9
+
+    supervisor.check()
+
+    assert mock_popen.call_count == 3
+    assert supervisor.instances[9300] == {
+        "port": 9300,
+        "pid": 1002,
+        "user_data_dir": "profile-9300",
+        "restarts": 1,
+    }
+    assert supervisor.instances[9301]["restarts"] == 0
+
+
+def test_start_adopts_running_instances(monkeypatch, mock_popen, supervisor):
+    with open(supervisor.state_file, "w") as file:
+        json.dump({"pid": -1, "instances": [{"port": 9300, "pid": os.getpid(), "restarts": 2}]}, file)
+    supervisor.launcher.is_ready = Mock(return_value=True)
+    command_line = "chrome --remote-debugging-port=9300 --user-data-dir=profile-9300"
+    monkeypatch.setattr("aionui.supervisor.supervisor.get_process_command_line", Mock(return_value=command_line))
+
+    supervisor.start()
+
+    assert mock_popen.call_count == 0
+    assert supervisor.instances[9300]["pid"] == os.getpid()
+    assert supervisor.instances[9300]["restarts"] == 2
+    assert supervisor.instances[9301]["pid"] is None
+
+
+def test_does_not_adopt_or_signal_other_processes(monkeypatch, mock_popen, supervisor):
+    with open(supervisor.state_file, "w") as file:
+        json.dump({"pid": -1, "instances": [{"port": 9300, "pid": os.getpid(), "restarts": 0}]}, file)
+    supervisor.launcher.is_ready = Mock(return_value=True)
+    kill = Mock()
+    monkeypatch.setattr("os.kill", kill)
+
+    supervisor.start()
+    supervisor.check()
+    assert supervisor.instances[9300]["pid"] is None
+    assert mock_popen.call_count == 0
+
+    supervisor.launcher.is_ready = Mock(return_value=False)
+    supervisor.check()
+    supervisor.shutdown()
+    assert mock_popen.call_count == 2
+    assert [call for call in kill.call_args_list if call.args[1] == signal.SIGTERM] == []
+
+
+def test_shutdown_terminates_instances(mock_popen, supervisor):
+    supervisor.launcher.is_ready = Mock(return_value=False)
+    supervisor.start()
+    supervisor.shutdown()
+
+    assert all(process.terminate.call_count == 1 for process in mock_popen.processes)
+    assert not os.path.exists(supervisor.state_file)
+    assert read_supervisor_state(supervisor.state_file) is None
+
+
+def test_aionui_waits_for_supervised_instance(monkeypatch, mock_popen, supervisor):
+    supervisor.launcher.is_ready = Mock(return_value=False)
+    supervisor.start()
+
+    playwright = Mock()
+    playwright.chromium.connect_over_cdp.side_effect = [ConnectionError, Mock()]
+    aionui = AiOnUi(playwright=playwright)
+    aionui.config.supervisor_state_file = supervisor.state_file
+    aionui.launcher.wait_until_ready = Mock(return_value=0.1)
+
+    aionui._connect_sync(playwright, 9301)
+
+    assert mock_popen.call_count == 2
+    assert aionui.launcher.wait_until_ready.call_count == 1
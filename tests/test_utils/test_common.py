@@ -6,9 +6,15 @@ from aionui.utils.common import (
     save_image_async,
     get_user_data_dir,
     get_chrome_binary_path,
+    parse_reset_time,
+    text_file_payload,
+    attachment_name,
+    strip_echo,
+    get_process_command_line,
 )
 from aionui.enums import Platform
 import os
+from datetime import datetime, timedelta
 from unittest.mock import patch
 
 
@@ -23,6 +29,16 @@ def test_clean_text():
     assert cleaned == "Test"
 
 
+def test_parse_reset_time():
+    now = datetime.now()
+    later = (now + timedelta(hours=1)).strftime("%I:%M %p")
+    earlier = (now - timedelta(hours=1)).strftime("%I:%M %p")
+
+    assert timedelta(minutes=64) < parse_reset_time(later) - now <= timedelta(minutes=65)
+    assert timedelta(hours=23, minutes=4) < parse_reset_time(earlier) - now <= timedelta(hours=23, minutes=5)
+    assert parse_reset_time(later, margin=timedelta(0)) - now <= timedelta(hours=1)
+
+
 def test_save_image():
     url = "https://interactive-examples.mdn.mozilla.net/media/cc0-images/grapefruit-slice-332-332.jpg"
     file_path = "test.jpg"
@@ -124,3 +140,27 @@ def test_get_chrome_binary_path(platform: Platform, expected_paths: list[str] |
         result = get_chrome_binary_path(platform)
         assert result == expected_paths[-1]
         assert mock_exists.call_count == len(expected_paths)
+
+
+def test_text_file_payload():
+    first = text_file_payload("Xin chào", "notes/data.txt")
+    second = text_file_payload("Xin chào", "notes/data.txt")
+
+    assert first["name"].startswith("data-") and first["name"].endswith(".txt")
+    assert first["name"] != second["name"]
+    assert first["mimeType"] == "text/plain"
+    assert first["buffer"] == "Xin chào".encode("utf-8")
+    assert attachment_name(first) == first["name"]
+    assert attachment_name("/tmp/data.csv") == "data.csv"
+
+
+def test_strip_echo():
+    echoed = "Follow these rules:\n- Be brief.\n- Use JSON.\n"
+    assert strip_echo("Follow these rules:\n* be brief.\n\nDone", echoed) == "Done"
+    assert strip_echo("Done\n- Be brief.", echoed) == "Done\n- Be brief."
+    assert strip_echo("- Be brief.", echoed) == "- Be brief."
+
+
+def test_get_process_command_line():
+    assert "python" in get_process_command_line(os.getpid()).lower()
+    assert get_process_command_line(-1) is None
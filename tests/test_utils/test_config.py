@@ -25,3 +25,45 @@ debug_port: 9222
 def test_config_platform_detection():
     config = Config()
     assert isinstance(config.platform, Platform)
+
+
+def test_config_debug_ports():
+    config = Config(debug_port=9300, instances=3, user_data_dir="profile")
+    assert config.get_debug_ports() == [9300, 9301, 9302]
+    assert config.get_instance_user_data_dir(9301) == "profile-9301"
+
+    config = Config(debug_ports=[9400, 9500], instances=3)
+    assert config.get_debug_ports() == [9400, 9500]
+
+    config = Config(debug_port=9222)
+    assert config.get_debug_ports() == [9222]
+    assert config.get_instance_user_data_dir(9222) is None
+
+
+def test_config_accounts(tmp_path):
+    config_path = os.path.join(tmp_path, "accounts.yaml")
+    with open(config_path, "w") as f:
+        f.write(
+            """
+debug_port: 9300
+user_data_dir: "profile"
+accounts:
+  - name: personal
+  - name: work
+    user_data_dir: "work-profile"
+    urls:
+      gemini: "https://gemini.google.com/u/1/app"
+  - name: spare
+    debug_port: 9500
+"""
+        )
+    config = Config(config_path)
+
+    assert [account.name for account in config.get_accounts()] == ["personal", "work", "spare"]
+    assert config.get_debug_ports() == [9300, 9301, 9500]
+    assert config.get_instance_user_data_dir(9300) == "profile-9300"
+    assert config.get_instance_user_data_dir(9301) == "work-profile"
+    assert config.get_account("work").urls == {"gemini": "https://gemini.google.com/u/1/app"}
+    assert config.get_account_by_port(9500).name == "spare"
+    with pytest.raises(ValueError):
+        config.get_account("unknown")
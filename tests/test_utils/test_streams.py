@@ -0,0 +1,74 @@
+import json
+from aionui.utils.streams import (
+    extract_code_block,
+    parse_claude_stream,
+    parse_deep_seek_stream,
+    parse_gemini_stream,
+    parse_gpt_stream,
+)
+
+
+def sse(*events):
+    return "\n\n".join(f"data: {json.dumps(event)}" for event in events) + "\n\ndata: [DONE]\n"
+
+
+def test_parse_gpt_stream_messages():
+    message = lambda text: {"message": {"author": {"role": "assistant"}, "content": {"parts": [text]}}}
+    user = {"message": {"author": {"role": "user"}, "content": {"parts": ["Hi"]}}}
+    assert parse_gpt_stream(sse(user, message("Hel"), message("Hello {x}"))) == "Hello {x}"
+
+
+def test_parse_gpt_stream_deltas():
+    body = sse(
+        {"p": "", "o": "add", "v": {"message": {"author": {"role": "tool"}, "content": {"parts": [""]}}}},
+        {"p": "/message/content/parts/0", "o": "append", "v": "ignored"},
+        {"p": "", "o": "add", "v": {"message": {"author": {"role": "assistant"}, "content": {"parts": [""]}}}},
+        {"p": "/message/content/parts/0", "o": "append", "v": "Hello"},
+        {"v": " world"},
+        {"p": "", "o": "patch", "v": [{"p": "/message/content/parts/0", "o": "append", "v": "!"}]},
+    )
+    assert parse_gpt_stream(body) == "Hello world!"
+    assert parse_gpt_stream("") is None
+
+
+def test_parse_claude_stream():
+    body = "event: message_start\n" + sse(
+        {"type": "message_start"},
+        {"type": "content_block_start", "content_block": {"type": "text", "text": ""}},
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "<b>Hi</b>"}},
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": " there"}},
+    )
+    assert parse_claude_stream(body) == "<b>Hi</b> there"
+    assert parse_claude_stream(sse({"completion": "Legacy"}, {"completion": " format"})) == "Legacy format"
+
+
+def test_parse_gemini_stream():
+    def chunk(text):
+        inner = [None, None, None, None, [["rc_1", [text]]]]
+        return json.dumps([["wrb.fr", None, json.dumps(inner)]])
+
+    body = ")]}'\n\n120\n" + chunk("Hel") + "\n130\n" + chunk("Hello") + '\n25\n[["e",4,null,null,140]]\n'
+    assert parse_gemini_stream(body) == "Hello"
+    assert parse_gemini_stream(")]}'\n") is None
+
+
+def test_parse_deep_seek_stream():
+    body = sse(
+        {"v": {"response": {"fragments": [{"type": "THINK", "content": "Hmm"}]}}},
+        {"p": "response/fragments/-1/content", "o": "APPEND", "v": "..."},
+        {"p": "response/fragments", "o": "APPEND", "v": [{"type": "RESPONSE", "content": "Hi"}]},
+        {"p": "response/fragments/-1/content", "o": "APPEND", "v": " there"},
+        {"v": "!"},
+    )
+    assert parse_deep_seek_stream(body) == "Hi there!"
+
+    legacy = sse(
+        {"choices": [{"delta": {"content": "Hi", "type": "text"}}]}, {"choices": [{"delta": {"content": "!"}}]}
+    )
+    assert parse_deep_seek_stream(legacy) == "Hi!"
+
+
+def test_extract_code_block():
+    text = 'Here:\n```json\n{"a": 1}\n```\nand\n```python\nprint(1)\n```'
+    assert extract_code_block(text) == "print(1)"
+    assert extract_code_block("no code") is None